@@ -0,0 +1,78 @@
+"""
+Throughput / latency report for batched facial emotion inference.
+
+Runs emotion_analyzer.analyze_batch in-process for a range of batch sizes and
+prints frames/sec plus per-batch latency percentiles. Needs DeepFace installed.
+
+    cd backend
+    python -m benchmarks.emotion_batching --frames 256 --sizes 1,2,4,8,16,32
+    python -m benchmarks.emotion_batching --images ./sample_faces
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import emotion_analyzer  # noqa: E402
+
+
+def _load_frames(image_dir: str | None, count: int) -> list[bytes]:
+    """Return `count` JPEG frames, from a folder or synthesized 320x240 noise."""
+    encoded = []
+    if image_dir:
+        for path in sorted(glob.glob(os.path.join(image_dir, "*.jp*g"))):
+            with open(path, "rb") as f:
+                encoded.append(f.read())
+    if not encoded:
+        rng = np.random.default_rng(0)
+        for _ in range(min(count, 16)):
+            img = rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+            ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 60])
+            encoded.append(buf.tobytes())
+    return [encoded[i % len(encoded)] for i in range(count)]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(frames: list[bytes], sizes: list[int]):
+    emotion_analyzer.warm_up()
+    emotion_analyzer.analyze_batch(frames[:1])  # load the raw model outside the timing
+
+    print(f"{'batch':>6} {'frames/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'ms/frame':>9}")
+    for size in sizes:
+        latencies = []
+        started = time.perf_counter()
+        for i in range(0, len(frames), size):
+            t0 = time.perf_counter()
+            emotion_analyzer.analyze_batch(frames[i:i + size])
+            latencies.append((time.perf_counter() - t0) * 1000)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{size:>6} {len(frames) / elapsed:>10.1f} {_percentile(latencies, 50):>9.1f} "
+            f"{_percentile(latencies, 99):>9.1f} {statistics.mean(latencies) / size:>9.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=256, help="frames per batch size")
+    parser.add_argument("--sizes", default="1,2,4,8,16,32", help="comma-separated batch sizes")
+    parser.add_argument("--images", default=None, help="directory of JPEG face images")
+    args = parser.parse_args()
+
+    frames = _load_frames(args.images, args.frames)
+    run(frames, [int(s) for s in args.sizes.split(",")])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Read/write comparison of the two emotion snapshot storage layouts.
+
+"rows" is one emotion_snapshots row per frame with a JSON probability dict;
+"columnar" is the per-session float32 record file from services.emotion_series.
+Everything runs against a throwaway SQLite database and directory.
+
+    cd backend
+    python -m benchmarks.emotion_storage --snapshots 1000,10000,100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base  # noqa: E402
+from models import EmotionSnapshot, InterviewSession  # noqa: E402
+from services import emotion_series  # noqa: E402
+from services.emotion_analyzer import EMOTION_LABELS  # noqa: E402
+
+
+def _make_rows(session_id: int, n: int) -> list[dict]:
+    rng = np.random.default_rng(0)
+    probs = rng.dirichlet(np.ones(len(EMOTION_LABELS)), size=n)
+    scores = rng.random((n, 2))
+    return [
+        {
+            "session_id": session_id,
+            "timestamp": i * 0.5,
+            "source": "face",
+            "emotions": dict(zip(EMOTION_LABELS, probs[i].round(4).tolist())),
+            "dominant_emotion": EMOTION_LABELS[int(np.argmax(probs[i]))],
+            "stress_score": float(scores[i, 0]),
+            "confidence_score": float(scores[i, 1]),
+        }
+        for i in range(n)
+    ]
+
+
+def _timed(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def bench(n: int, batch: int, workdir: str) -> list[tuple]:
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, f'bench_{n}.db')}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    series_dir = os.path.join(workdir, f"series_{n}")
+
+    db = Session()
+    db.add(InterviewSession(id=1, session_type="topic"))
+    db.commit()
+    rows = _make_rows(1, n)
+
+    def write_rows():
+        for start in range(0, n, batch):
+            db.execute(insert(EmotionSnapshot), rows[start:start + batch])
+            db.commit()
+
+    def write_columnar():
+        for start in range(0, n, batch):
+            emotion_series.append_rows(1, rows[start:start + batch], series_dir)
+
+    def read_rows():
+        snapshots = db.query(EmotionSnapshot).filter(EmotionSnapshot.session_id == 1).order_by(EmotionSnapshot.timestamp).all()
+        return [(s.timestamp, s.emotions, s.stress_score, s.confidence_score) for s in snapshots]
+
+    def read_columnar():
+        return emotion_series.read_series(1, series_dir)
+
+    def mean_rows():
+        stress = [s for (s,) in db.query(EmotionSnapshot.stress_score).filter(EmotionSnapshot.session_id == 1)]
+        return sum(stress) / len(stress)
+
+    def mean_columnar():
+        return float(emotion_series.read_series(1, series_dir)[:, emotion_series.STRESS_COL].mean())
+
+    def happy_rows():
+        return [s.emotions["happy"] for s in db.query(EmotionSnapshot).filter(EmotionSnapshot.session_id == 1)]
+
+    def happy_columnar():
+        return np.asarray(emotion_series.read_series(1, series_dir)[:, 1 + EMOTION_LABELS.index("happy")])
+
+    results = []
+    for name, rows_fn, col_fn in [
+        ("write (batched)", write_rows, write_columnar),
+        ("read all", read_rows, read_columnar),
+        ("mean stress", mean_rows, mean_columnar),
+        ("one emotion column", happy_rows, happy_columnar),
+    ]:
+        rows_ms, _ = _timed(rows_fn)
+        col_ms, _ = _timed(col_fn)
+        results.append((n, name, rows_ms, col_ms))
+
+    db_size = os.path.getsize(os.path.join(workdir, f"bench_{n}.db"))
+    file_size = os.path.getsize(emotion_series.series_path(1, series_dir))
+    results.append((n, "size (KB)", db_size / 1024, file_size / 1024))
+    db.close()
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emotion snapshot storage benchmark")
+    parser.add_argument("--snapshots", default="1000,10000,100000", help="comma-separated series lengths")
+    parser.add_argument("--batch", type=int, default=200, help="rows per write batch (as the snapshot writer)")
+    args = parser.parse_args()
+
+    print(f"{'snapshots':>10} {'operation':<20} {'rows (ms)':>12} {'columnar (ms)':>14} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in [int(x) for x in args.snapshots.split(",")]:
+            for size, name, rows_ms, col_ms in bench(n, args.batch, workdir):
+                speedup = rows_ms / col_ms if col_ms else float("inf")
+                print(f"{size:>10} {name:<20} {rows_ms:>12.2f} {col_ms:>14.2f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
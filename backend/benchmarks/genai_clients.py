@@ -0,0 +1,103 @@
+"""
+Per-session Gemini setup cost: a genai.Client per interview vs the shared registry.
+
+For each mode, opens `--sessions` interview sessions one after another and keeps
+them alive (as concurrent interviews would), then prints per-session setup latency
+percentiles and the Python heap retained per session (tracemalloc).
+
+Without --connect only the client is set up (credential lookup, transport), so no
+network is needed. With --connect each session also opens and holds a Gemini Live
+connection, which needs ADC credentials and GOOGLE_CLOUD_PROJECT.
+
+    cd backend
+    python -m benchmarks.genai_clients --sessions 50
+    python -m benchmarks.genai_clients --sessions 10 --connect
+"""
+import argparse
+import asyncio
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from google import genai
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import GOOGLE_CLOUD_PROJECT, GOOGLE_CLOUD_LOCATION  # noqa: E402
+from services.gemini_live import GeminiLiveSession  # noqa: E402
+from services.genai_clients import genai_clients  # noqa: E402
+
+PROMPT = "You are a friendly technical interviewer. Greet the candidate."
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _per_session_client() -> genai.Client:
+    """What GeminiLiveSession did before the registry: a new client per interview."""
+    return genai.Client(vertexai=True, project=GOOGLE_CLOUD_PROJECT, location=GOOGLE_CLOUD_LOCATION)
+
+
+async def _open(mode: str, connect: bool) -> GeminiLiveSession:
+    live = GeminiLiveSession(PROMPT)
+    if mode == "per-session":
+        live.client = _per_session_client()
+    if connect:
+        await live.connect()
+    return live
+
+
+async def run_mode(mode: str, sessions: int, connect: bool) -> dict:
+    await genai_clients.close()
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    latencies = []
+    opened = []
+    for _ in range(sessions):
+        started = time.perf_counter()
+        opened.append(await _open(mode, connect))
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    for live in opened:
+        await live.disconnect()
+    return {
+        "first": latencies[0],
+        "p50": statistics.median(latencies),
+        "p99": _percentile(latencies, 99),
+        "kb_per_session": retained / sessions / 1024,
+        "clients": len({id(live.client) for live in opened}),
+    }
+
+
+async def run(sessions: int, connect: bool):
+    print(f"{'mode':<12} {'clients':>8} {'first ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'KB/session':>11}")
+    for mode in ("per-session", "shared"):
+        r = await run_mode(mode, sessions, connect)
+        print(
+            f"{mode:<12} {r['clients']:>8} {r['first']:>9.2f} {r['p50']:>9.2f} "
+            f"{r['p99']:>9.2f} {r['kb_per_session']:>11.1f}"
+        )
+    await genai_clients.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared vs per-session genai client benchmark")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--connect", action="store_true", help="also open a Gemini Live connection per session")
+    args = parser.parse_args()
+    asyncio.run(run(args.sessions, args.connect))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Concurrent-interview load test for the WebSocket relay, against the fake Gemini Live server.
+
+Starts tools/fake_live_server and one uvicorn worker, then for each --sessions step
+drives that many simulated browser clients through /ws/interview/{session_id} for
+--duration seconds. The worker runs on a temporary copy of the database with turn
+scoring off, so nothing is written to the real DB and no Vertex calls are made.
+Each client:
+- streams 16kHz PCM in 85ms chunks (what the page's ScriptProcessor sends from a
+  48kHz mic). It speaks for --speak-s after every interviewer turn and is silent otherwise
+- sends a 320x240 JPEG webcam frame every --frame-interval seconds
+- timestamps every downlink audio chunk
+
+Reported per step:
+- relay p50/p99: fake server send → browser receive, per audio chunk (the fake
+  stamps each chunk with its send time)
+- reply p50/p99: end of the candidate's speech → first interviewer audio. This
+  includes the VAD hangover and the fake's --latency-ms
+- CPU per session: worker CPU time (with its emotion worker processes) / wall time / sessions.
+  Loop CPU is the worker process alone, whose event loop is bound to one core
+The max sessions per worker is the largest step where every session completed,
+relay p99 stayed within --p99-budget-ms and loop CPU stayed under one core.
+
+    cd backend
+    python -m benchmarks.live_load --sessions 1,5,10,20,40 --duration 20
+    python -m benchmarks.live_load --sessions 10 --go-away-after 5   # with mid-interview reconnects
+    python -m benchmarks.live_load --url http://127.0.0.1:8000 --server-pid 1234   # running backend
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+import websockets
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from config import AUDIO_SAMPLE_RATE_INPUT  # noqa: E402
+from tools.fake_live_server import (  # noqa: E402
+    AUDIO_STAMP, AUDIO_STAMP_MAGIC, synthesize_speech, write_self_signed_cert,
+)
+from ws_protocol import DOWNLINK_HEADER_SIZE, UPLINK_AUDIO, UPLINK_FRAME  # noqa: E402
+
+CHUNK_SAMPLES = 1365  # 4096 samples at 48kHz, resampled to 16kHz
+CHUNK_S = CHUNK_SAMPLES / AUDIO_SAMPLE_RATE_INPUT
+THINK_S = 0.3  # pause between the interviewer finishing and the candidate answering
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _uplink(kind: int, payload: bytes) -> bytes:
+    return bytes((kind, 0, 0, 0)) + payload
+
+
+def _audio_chunks() -> tuple[list[bytes], bytes]:
+    """(speech chunks covering one second, a near-silent chunk) as tagged uplink messages."""
+    speech = synthesize_speech(1000, AUDIO_SAMPLE_RATE_INPUT)
+    size = CHUNK_SAMPLES * 2
+    chunks = [_uplink(UPLINK_AUDIO, speech[i:i + size]) for i in range(0, len(speech) - size + 1, size)]
+    noise = np.random.default_rng(0).normal(0, 20, CHUNK_SAMPLES).astype("<i2").tobytes()
+    return chunks, _uplink(UPLINK_AUDIO, noise)
+
+
+def _jpeg_frame() -> bytes:
+    img = np.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 60])
+    return _uplink(UPLINK_FRAME, buf.tobytes())
+
+
+def _create_interview(base_url: str) -> int:
+    request = urllib.request.Request(
+        f"{base_url}/api/interviews",
+        data=json.dumps({"session_type": "topic", "topic_id": 1}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.load(response)["id"]
+
+
+def _cpu_seconds(pid: int) -> tuple[float, float] | None:
+    """(process, process + live children) user+system CPU seconds from /proc; None off Linux."""
+    if not os.path.isdir("/proc"):
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    own = children = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        used = int(fields[11]) + int(fields[12])
+        if int(entry) == pid:
+            own += used
+        elif int(fields[1]) == pid:
+            children += used
+    return own / ticks, (own + children) / ticks
+
+
+class SimulatedClient:
+    """One browser running an interview."""
+
+    def __init__(self, base_url: str, speak_s: float, frame_interval: float, speech, silence, frame):
+        self.base_url = base_url
+        self.speak_s = speak_s
+        self.frame_interval = frame_interval
+        self.speech = speech
+        self.silence = silence
+        self.frame = frame
+        self.relay_ms: list[float] = []
+        self.reply_ms: list[float] = []
+        self.turns = 0
+        self.error: str | None = None
+        self._speak_from = self._speak_until = 0.0
+        self._speech_ended_at: float | None = None
+
+    async def run(self, start_delay: float, deadline: float):
+        await asyncio.sleep(start_delay)
+        try:
+            session_id = await asyncio.to_thread(_create_interview, self.base_url)
+            ws_url = self.base_url.replace("http", "ws", 1)
+            async with websockets.connect(f"{ws_url}/ws/interview/{session_id}?caps=frames,audio", max_size=None) as ws:
+                while True:
+                    message = json.loads(await ws.recv())
+                    if message["type"] == "ready":
+                        break
+                    if message["type"] == "error":
+                        raise RuntimeError(message["message"])
+                receiver = asyncio.create_task(self._receive(ws))
+                try:
+                    await self._send(ws, deadline)
+                finally:
+                    receiver.cancel()
+                await ws.send(json.dumps({"type": "end"}))
+        except Exception as e:
+            self.error = self.error or repr(e)
+
+    async def _send(self, ws, deadline: float):
+        """Mic audio on a fixed 85ms schedule, plus a webcam frame now and then."""
+        next_chunk = next_frame = time.monotonic()
+        spoken = 0
+        while time.monotonic() < deadline and self.error is None:
+            now = time.monotonic()
+            if self._speak_from <= now < self._speak_until:
+                await ws.send(self.speech[spoken % len(self.speech)])
+                spoken += 1
+            else:
+                if spoken:
+                    self._speech_ended_at = time.time()
+                    spoken = 0
+                await ws.send(self.silence)
+            if now >= next_frame:
+                await ws.send(self.frame)
+                next_frame = now + self.frame_interval
+            next_chunk += CHUNK_S
+            await asyncio.sleep(max(0.0, next_chunk - time.monotonic()))
+
+    async def _receive(self, ws):
+        async for message in ws:
+            received = time.time()
+            if isinstance(message, bytes):
+                payload = message[DOWNLINK_HEADER_SIZE:]
+                if payload[:len(AUDIO_STAMP_MAGIC)] == AUDIO_STAMP_MAGIC:
+                    _, sent = AUDIO_STAMP.unpack_from(payload)
+                    self.relay_ms.append((received - sent) * 1000)
+                if self._speech_ended_at is not None:
+                    self.reply_ms.append((received - self._speech_ended_at) * 1000)
+                    self._speech_ended_at = None
+                continue
+            data = json.loads(message)
+            if data["type"] == "error":
+                self.error = data["message"]
+            elif data["type"] == "turn_complete" and data.get("role") == "interviewer":
+                self.turns += 1
+                self._speak_from = time.monotonic() + THINK_S
+                self._speak_until = self._speak_from + self.speak_s
+
+
+async def run_step(sessions: int, args, base_url: str, pid: int | None, audio, frame) -> dict:
+    speech, silence = audio
+    clients = [
+        SimulatedClient(base_url, args.speak_s, args.frame_interval, speech, silence, frame)
+        for _ in range(sessions)
+    ]
+    cpu_before = _cpu_seconds(pid) if pid else None
+    started = time.monotonic()
+    deadline = started + args.ramp_s + args.duration
+    await asyncio.gather(*(
+        c.run(i * args.ramp_s / sessions, deadline) for i, c in enumerate(clients)
+    ))
+    wall = time.monotonic() - started
+    cpu_after = _cpu_seconds(pid) if pid else None
+
+    relay = [v for c in clients for v in c.relay_ms]
+    reply = [v for c in clients for v in c.reply_ms]
+    result = {
+        "sessions": sessions,
+        "ok": sum(1 for c in clients if c.error is None and c.turns),
+        "turns": sum(c.turns for c in clients),
+        "relay_p50": _percentile(relay, 50),
+        "relay_p99": _percentile(relay, 99),
+        "reply_p50": statistics.median(reply) if reply else float("nan"),
+        "reply_p99": _percentile(reply, 99),
+        "loop_cpu": None,
+        "cpu_per_session": None,
+        "errors": sorted({c.error or "no interviewer turn completed" for c in clients if c.error or not c.turns}),
+    }
+    if cpu_before and cpu_after:
+        result["loop_cpu"] = (cpu_after[0] - cpu_before[0]) / wall
+        result["cpu_per_session"] = (cpu_after[1] - cpu_before[1]) / wall / sessions
+    return result
+
+
+def _wait_for(url: str, timeout_s: float):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/api/topics", timeout=2):
+                return
+        except OSError:
+            time.sleep(0.3)
+    raise RuntimeError(f"Backend at {url} did not come up in {timeout_s}s")
+
+
+@contextmanager
+def local_stack(args):
+    """Fake Live server + one uvicorn worker on a temporary copy of the database."""
+    workdir = tempfile.mkdtemp(prefix="live_load_")
+    shutil.copy(os.path.join(BACKEND, "interview_platform.db"), workdir)
+    cert_path = os.path.join(workdir, "fake_live_cert.pem")
+    key_path = os.path.join(workdir, "fake_live_key.pem")
+    write_self_signed_cert(cert_path, key_path)
+    env = {
+        **os.environ,
+        "GEMINI_LIVE_BASE_URL": f"wss://127.0.0.1:{args.fake_port}",
+        "GEMINI_LIVE_CA_FILE": cert_path,
+        "TURN_SCORING_ENABLED": "false",
+    }
+    # Text generation isn't exercised; a project id lets its client start without ADC
+    env["GOOGLE_CLOUD_PROJECT"] = env.get("GOOGLE_CLOUD_PROJECT") or "live-load-test"
+    fake = subprocess.Popen(
+        [sys.executable, "-m", "tools.fake_live_server", "--port", str(args.fake_port),
+         "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+         "--go-away-after", str(args.go_away_after), "--cert", cert_path, "--key", key_path],
+        cwd=BACKEND, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    log = open(os.path.join(workdir, "backend.log"), "w")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND,
+         "--port", str(args.port), "--workers", "1"],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        _wait_for(url, 120)
+        yield url, server.pid
+    finally:
+        for process in (server, fake):
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        log.close()
+        for name in os.listdir(workdir):
+            if name.startswith("interview_platform.db"):
+                os.remove(os.path.join(workdir, name))
+        print(f"backend log: {os.path.join(workdir, 'backend.log')}")
+
+
+def _fmt(value: float | None, pattern: str) -> str:
+    return "n/a" if value is None else pattern.format(value)
+
+
+async def run(args, base_url: str, pid: int | None):
+    audio = _audio_chunks()
+    frame = _jpeg_frame()
+    print(
+        f"{'sessions':>8} {'ok':>5} {'turns':>6} {'relay p50':>10} {'relay p99':>10} "
+        f"{'reply p50':>10} {'reply p99':>10} {'cpu/session':>12} {'loop cpu':>9}"
+    )
+    best = 0
+    for sessions in args.sessions:
+        r = await run_step(sessions, args, base_url, pid, audio, frame)
+        print(
+            f"{r['sessions']:>8} {r['ok']:>5} {r['turns']:>6} {r['relay_p50']:>8.1f}ms {r['relay_p99']:>8.1f}ms "
+            f"{r['reply_p50']:>8.0f}ms {r['reply_p99']:>8.0f}ms "
+            f"{_fmt(r['cpu_per_session'] and r['cpu_per_session'] * 100, '{:>11.1f}%')} "
+            f"{_fmt(r['loop_cpu'] and r['loop_cpu'] * 100, '{:>8.0f}%')}"
+        )
+        for error in r["errors"][:3]:
+            print(f"{'':>8} error: {error}")
+        within = r["ok"] == sessions and r["relay_p99"] <= args.p99_budget_ms
+        if within and (r["loop_cpu"] is None or r["loop_cpu"] < 1.0):
+            best = max(best, sessions)
+        await asyncio.sleep(1)  # let the worker finish closing the previous step's sessions
+    print(f"max sessions per worker (relay p99 <= {args.p99_budget_ms:.0f}ms): {best or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent interview relay load test")
+    parser.add_argument("--sessions", default="1,5,10,20", help="comma-separated concurrency steps")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per step, after ramp-up")
+    parser.add_argument("--ramp-s", type=float, default=2.0, help="client starts are spread over this")
+    parser.add_argument("--speak-s", type=float, default=2.0, help="length of each candidate answer")
+    parser.add_argument("--frame-interval", type=float, default=5.0)
+    parser.add_argument("--p99-budget-ms", type=float, default=150.0)
+    parser.add_argument("--url", help="use a running backend instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="with --url: backend worker pid, for CPU figures")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="fake server reply latency")
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--go-away-after", type=float, default=0.0, help="fake server sends goAway (reconnect test)")
+    args = parser.parse_args()
+    args.sessions = [int(n) for n in args.sessions.split(",")]
+
+    if args.url:
+        asyncio.run(run(args, args.url.rstrip("/"), args.server_pid))
+        return
+    with local_stack(args) as (url, pid):
+        asyncio.run(run(args, url, pid))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Query latency with the default SQLite engine vs the tuned profile in database.py.
+
+Builds a throwaway database per size with that many emotion_snapshots rows
+(plus interview sessions), then times the app's hot queries against two copies:
+"default" (plain engine, single-column indexes only) and "tuned"
+(SQLITE_PRAGMAS on connect plus the composite indexes declared in models.py).
+
+    cd backend
+    python -m benchmarks.sqlite_profile --snapshots 10000,100000,1000000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, apply_sqlite_pragmas  # noqa: E402
+from models import EmotionSnapshot, InterviewSession  # noqa: E402
+from services.emotion_scoring import EMOTION_LABELS  # noqa: E402
+
+SNAPSHOTS_PER_SESSION = 2000
+STATUSES = ["completed"] * 8 + ["created", "active"]
+
+
+def _build(path: str, snapshots: int, sessions: int):
+    """Create the schema without composite indexes and bulk-load synthetic data."""
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        for index in _composite_indexes():
+            index.drop(bind=conn)
+    engine.dispose()
+
+    rng = random.Random(0)
+    conn = sqlite3.connect(path)
+    start = datetime(2026, 1, 1)
+    conn.executemany(
+        "INSERT INTO interview_sessions (id, session_type, topic_id, difficulty, job_title, status, created_at, "
+        "duration_seconds, overall_score, transcript, feedback, resume_text, job_description, resume_structured) "
+        "VALUES (?, 'topic', ?, 'intermediate', '', ?, ?, 600, ?, '[]', '{}', '', '', '{}')",
+        [
+            (i, rng.randint(1, 10), rng.choice(STATUSES), (start + timedelta(minutes=i)).isoformat(sep=" "), rng.randint(40, 95))
+            for i in range(1, sessions + 1)
+        ],
+    )
+    with_snapshots = max(1, snapshots // SNAPSHOTS_PER_SESSION)
+    batch = []
+    for n in range(snapshots):
+        probs = [rng.random() for _ in EMOTION_LABELS]
+        total = sum(probs)
+        emotions = {label: round(p / total, 4) for label, p in zip(EMOTION_LABELS, probs)}
+        batch.append((
+            n % with_snapshots + 1, n // with_snapshots * 0.5, "face", json.dumps(emotions),
+            max(emotions, key=emotions.get), rng.random(), rng.random(), 1,
+        ))
+        if len(batch) == 50000 or n == snapshots - 1:
+            conn.executemany(
+                "INSERT INTO emotion_snapshots (session_id, timestamp, source, emotions, dominant_emotion, "
+                "stress_score, confidence_score, scoring_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+            batch = []
+    conn.commit()
+    conn.close()
+    return with_snapshots
+
+
+def _composite_indexes() -> list:
+    return [index for table in Base.metadata.sorted_tables for index in table.indexes if len(index.columns) > 1]
+
+
+def _median_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def _run_queries(path: str, tuned: bool, sessions_with_snapshots: int, repeat: int) -> dict:
+    engine = create_engine(f"sqlite:///{path}")
+    if tuned:
+        apply_sqlite_pragmas(engine)
+        with engine.begin() as conn:
+            for index in _composite_indexes():
+                index.create(bind=conn)
+            conn.exec_driver_sql("ANALYZE")
+    Session = sessionmaker(bind=engine)
+    rng = random.Random(1)
+    db = Session()
+
+    def timeline():
+        session_id = rng.randint(1, sessions_with_snapshots)
+        db.execute(select(
+            EmotionSnapshot.timestamp, EmotionSnapshot.stress_score,
+            EmotionSnapshot.confidence_score, EmotionSnapshot.dominant_emotion,
+        ).where(EmotionSnapshot.session_id == session_id).order_by(EmotionSnapshot.timestamp)).all()
+
+    def session_count():
+        session_id = rng.randint(1, sessions_with_snapshots)
+        db.execute(select(func.count(EmotionSnapshot.id)).where(EmotionSnapshot.session_id == session_id)).scalar()
+
+    def list_completed():
+        db.execute(select(InterviewSession.id, InterviewSession.created_at).where(
+            InterviewSession.status == "completed",
+        ).order_by(InterviewSession.created_at.desc(), InterviewSession.id.desc()).limit(51)).all()
+
+    def count_completed():
+        db.execute(select(
+            func.count(InterviewSession.id),
+            func.avg(InterviewSession.overall_score),
+            func.coalesce(func.sum(InterviewSession.duration_seconds), 0),
+        ).where(InterviewSession.status == "completed")).one()
+
+    write_session = sessions_with_snapshots + 1
+
+    def write_batch():
+        rows = [
+            {"session_id": write_session, "timestamp": i * 0.5, "source": "face", "emotions": {},
+             "dominant_emotion": "neutral", "stress_score": 0.1, "confidence_score": 0.9}
+            for i in range(200)
+        ]
+        db.execute(insert(EmotionSnapshot), rows)
+        db.commit()
+
+    results = {
+        "session timeline": _median_ms(timeline, repeat),
+        "session snapshot count": _median_ms(session_count, repeat),
+        "list page (status)": _median_ms(list_completed, repeat),
+        "count (status)": _median_ms(count_completed, repeat),
+        "write 200 + commit": _median_ms(write_batch, repeat),
+    }
+    db.close()
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite engine profile benchmark")
+    parser.add_argument("--snapshots", default="10000,100000,1000000", help="comma-separated emotion_snapshots row counts")
+    parser.add_argument("--sessions", type=int, default=20000, help="interview_sessions rows")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per query (median reported)")
+    args = parser.parse_args()
+
+    print(f"{'snapshots':>10} {'query':<24} {'default (ms)':>13} {'tuned (ms)':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in [int(x) for x in args.snapshots.split(",")]:
+            base = os.path.join(workdir, f"default_{n}.db")
+            with_snapshots = _build(base, n, args.sessions)
+            tuned = os.path.join(workdir, f"tuned_{n}.db")
+            shutil.copy(base, tuned)
+
+            default_ms = _run_queries(base, False, with_snapshots, args.repeat)
+            tuned_ms = _run_queries(tuned, True, with_snapshots, args.repeat)
+            for name, before in default_ms.items():
+                after = tuned_ms[name]
+                print(f"{n:>10} {name:<24} {before:>13.2f} {after:>11.2f} {before / after if after else 0:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
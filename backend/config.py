@@ -15,13 +15,112 @@ os.environ.setdefault("GOOGLE_CLOUD_LOCATION", GOOGLE_CLOUD_LOCATION)
 GEMINI_MODEL = "gemini-live-2.5-flash-native-audio"
 GEMINI_TEXT_MODEL = "gemini-2.5-flash"
 
-DATABASE_URL = "sqlite:///./interview_platform.db"
+# Send Live sessions to another endpoint instead of Vertex AI, e.g. the local stand-in
+# started by `python -m tools.fake_live_server` (wss://127.0.0.1:9100). No credentials are sent.
+GEMINI_LIVE_BASE_URL = os.getenv("GEMINI_LIVE_BASE_URL", "")
+# Extra CA certificate (PEM) trusted for that endpoint only, e.g. the fake server's self-signed one
+GEMINI_LIVE_CA_FILE = os.getenv("GEMINI_LIVE_CA_FILE", "")
+
+# Live sessions are opened speculatively when an interview is created, so the
+# WebSocket handler can take over a connected session instead of waiting on the handshake
+LIVE_PREWARM_ENABLED = os.getenv("LIVE_PREWARM_ENABLED", "true").lower() == "true"
+LIVE_PREWARM_TTL_S = float(os.getenv("LIVE_PREWARM_TTL_S", "60"))  # unclaimed sessions are closed after this
+LIVE_PREWARM_MAX_SESSIONS = int(os.getenv("LIVE_PREWARM_MAX_SESSIONS", "16"))  # oldest is evicted past this
+
+# A dropped or expiring Live connection is reopened mid-interview (see services/resilient_live).
+# Client audio waits in the upstream ring buffer (AUDIO_UPSTREAM_BUFFER_MS) during the gap.
+LIVE_RECONNECT_ENABLED = os.getenv("LIVE_RECONNECT_ENABLED", "true").lower() == "true"
+LIVE_RECONNECT_MAX_ATTEMPTS = 5
+LIVE_RECONNECT_BACKOFF_BASE_S = 0.1
+LIVE_RECONNECT_BACKOFF_MAX_S = 2.0
+# Resumption handles let a new connection continue the server-side session;
+# sliding-window compression lifts the session length limit on long interviews
+LIVE_SESSION_RESUMPTION = os.getenv("LIVE_SESSION_RESUMPTION", "true").lower() == "true"
+LIVE_CONTEXT_COMPRESSION = os.getenv("LIVE_CONTEXT_COMPRESSION", "true").lower() == "true"
+LIVE_RESUME_CONTEXT_CHARS = 6000  # transcript carried into a fresh session when no handle is usable
+
+# Text generation (resume parsing, feedback) — limits keep LLM load off live interviews
+TEXT_GEN_MAX_CONCURRENCY = int(os.getenv("TEXT_GEN_MAX_CONCURRENCY", "8"))
+TEXT_GEN_ROUTE_CONCURRENCY = {"resume": 4, "feedback": 4}  # per-route caps, others share the global one
+TEXT_GEN_TIMEOUT_S = float(os.getenv("TEXT_GEN_TIMEOUT_S", "60"))
+TEXT_GEN_MAX_RETRIES = 3
+TEXT_GEN_BACKOFF_BASE_S = 0.5
+TEXT_GEN_BACKOFF_MAX_S = 8.0
+
+# AI resume parse cache (in-memory LRU in front of a DB table)
+RESUME_CACHE_MEMORY_ENTRIES = 256
+RESUME_CACHE_MAX_ROWS = int(os.getenv("RESUME_CACHE_MAX_ROWS", "5000"))
+RESUME_CACHE_MAX_AGE_DAYS = int(os.getenv("RESUME_CACHE_MAX_AGE_DAYS", "30"))
+RESUME_CACHE_TOUCH_INTERVAL_S = 3600  # memory hits refresh the row's last_used_at at most this often
+
+# Background feedback generation jobs
+FEEDBACK_JOB_WORKERS = int(os.getenv("FEEDBACK_JOB_WORKERS", "2"))
+FEEDBACK_WAIT_TIMEOUT_S = float(os.getenv("FEEDBACK_WAIT_TIMEOUT_S", "300"))  # POST /api/feedback/{id} gives up after this
+FEEDBACK_WAIT_POLL_S = 2.0  # waiters re-read the job status this often (it may finish in another process)
+# Transcripts up to this size are evaluated in one call; longer ones are split into
+# question/answer segments, evaluated in parallel chunks, then reduced into one report
+FEEDBACK_SINGLE_PASS_CHARS = 8000
+FEEDBACK_CHUNK_CHARS = 6000
+FEEDBACK_MAP_CONCURRENCY = 4
+# Score each question/answer in the background as the live interview moves on
+TURN_SCORING_ENABLED = os.getenv("TURN_SCORING_ENABLED", "true").lower() == "true"
+TURN_SCORING_CONCURRENCY = 4
+
+DATABASE_URL = "sqlite:///./interview_platform.db"  # sync engine: background threads and tools
+# Async engine for request handlers and the WebSocket handler (e.g. postgresql+asyncpg://...)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///./interview_platform.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))  # per engine
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_S = 30
+# Applied to every new SQLite connection (see database.SQLITE_PRAGMAS)
+SQLITE_WAL = os.getenv("SQLITE_WAL", "true").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))  # page cache per connection
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "uploads")
 
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Resume PDF ingestion
+RESUME_MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # 10MB
+RESUME_MULTIPART_OVERHEAD_BYTES = 64 * 1024  # allowance for multipart boundaries and headers in Content-Length
+RESUME_UPLOAD_CHUNK_BYTES = 256 * 1024
+RESUME_UPLOAD_EVICT_INTERVAL_S = 3600  # stored uploads are pruned at startup and then this often
+RESUME_EXTRACT_WORKERS = int(os.getenv("RESUME_EXTRACT_WORKERS", "2"))
+RESUME_PAGES_PER_TASK = 4  # longer PDFs are split into page ranges extracted in parallel
+
 # Audio settings for Gemini Live API
 AUDIO_SAMPLE_RATE_INPUT = 16000   # 16kHz PCM input
 AUDIO_SAMPLE_RATE_OUTPUT = 24000  # 24kHz PCM output
 AUDIO_CHANNELS = 1
 AUDIO_SAMPLE_WIDTH = 2  # 16-bit
+
+# Upstream (client → Gemini) audio pipeline
+AUDIO_UPSTREAM_FRAME_MS = int(os.getenv("AUDIO_UPSTREAM_FRAME_MS", "60"))  # coalesced frame size, 40-100ms
+AUDIO_UPSTREAM_BUFFER_MS = int(os.getenv("AUDIO_UPSTREAM_BUFFER_MS", "2000"))  # ring buffer capacity
+AUDIO_UPSTREAM_FLUSH_TIMEOUT_S = 1.0  # time allowed to send the buffered tail when a session ends
+
+# Server-side voice activity detection in front of Gemini
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_FRAME_MS = 20
+VAD_ENERGY_THRESHOLD = float(os.getenv("VAD_ENERGY_THRESHOLD", "300"))  # int16 RMS floor
+VAD_ZCR_MAX = 0.3  # low-energy frames above this zero-crossing rate are treated as noise
+VAD_PREROLL_MS = 300  # silence kept before a speech onset
+VAD_HANGOVER_MS = 800  # silence kept after speech; must exceed Gemini's silence_duration_ms
+
+# Facial emotion inference (DeepFace runs in a separate process pool)
+EMOTION_WORKERS = int(os.getenv("EMOTION_WORKERS", "2"))
+EMOTION_QUEUE_SIZE = int(os.getenv("EMOTION_QUEUE_SIZE", "2"))  # pending frames per session
+EMOTION_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "8"))  # frames per forward pass, across sessions
+EMOTION_BATCH_MAX_WAIT_MS = int(os.getenv("EMOTION_BATCH_MAX_WAIT_MS", "50"))
+EMOTION_FRAME_MAX_SIDE = 240  # frames are downscaled to this before face detection
+# Weight set used for stress/confidence scores (see services/emotion_scoring.WEIGHT_SETS)
+EMOTION_SCORING_VERSION = int(os.getenv("EMOTION_SCORING_VERSION", "1"))
+# Emotion snapshots are buffered and bulk-inserted by one writer per process
+EMOTION_WRITE_BATCH_SIZE = int(os.getenv("EMOTION_WRITE_BATCH_SIZE", "200"))  # flush early at this many rows
+EMOTION_WRITE_FLUSH_MS = int(os.getenv("EMOTION_WRITE_FLUSH_MS", "1000"))
+EMOTION_WRITE_MAX_BUFFER = 20000  # oldest rows are dropped past this if the DB falls behind
+# "rows": one emotion_snapshots row per frame. "columnar": fixed-width float32
+# records in a per-session file under EMOTION_SERIES_DIR (aggregates stay in the DB)
+EMOTION_STORAGE_MODE = os.getenv("EMOTION_STORAGE_MODE", "rows")
+EMOTION_SERIES_DIR = os.getenv("EMOTION_SERIES_DIR", os.path.join(os.path.dirname(__file__), "emotion_series"))
@@ -1,19 +1,113 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from config import DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from config import (
+    DATABASE_URL, ASYNC_DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT_S,
+    SQLITE_WAL, SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE,
+)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# WAL lets readers run alongside the writer, and with synchronous=NORMAL commits
+# don't fsync (a power loss can drop the last transactions, never corrupt the file)
+SQLITE_PRAGMAS = [
+    f"journal_mode={'WAL' if SQLITE_WAL else 'DELETE'}",
+    f"synchronous={'NORMAL' if SQLITE_WAL else 'FULL'}",
+    f"busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+    f"cache_size=-{SQLITE_CACHE_SIZE_KB}",
+    f"mmap_size={SQLITE_MMAP_SIZE}",
+    "temp_store=MEMORY",
+]
+
+
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+    finally:
+        cursor.close()
+
+
+def apply_sqlite_pragmas(engine: Engine):
+    """Run SQLITE_PRAGMAS on every new connection the engine opens."""
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+
+
+def _is_file_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    """Pool sizing (and SQLite connect args) shared by both engines."""
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_S,
+        # A request cancelled mid-checkin can leave a closed connection behind; replace it on checkout
+        "pool_pre_ping": True,
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        if not _is_file_sqlite(url):
+            return {}  # in-memory databases use a single static connection
+        if is_async:
+            # aiosqlite defaults to NullPool, which opens a connection (and thread) per session
+            options["poolclass"] = AsyncAdaptedQueuePool
+        else:
+            options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+# Sync engine for work that already runs off the event loop (to_thread, tools)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine for routers and the WebSocket handler. Objects stay usable after
+# commit (no expire), since lazy refreshes aren't possible from async code.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL, is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+if _is_file_sqlite(DATABASE_URL):
+    apply_sqlite_pragmas(engine)
+if _is_file_sqlite(ASYNC_DATABASE_URL):
+    apply_sqlite_pragmas(async_engine.sync_engine)
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        _create_schema(conn)
+
+
+async def init_db_async():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(_create_schema)
+
+
+def _create_schema(conn):
+    Base.metadata.create_all(bind=conn)
+    # create_all skips tables that already exist, so add any indexes declared since
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+    _add_missing_columns(conn)
+
+
+def _add_missing_columns(conn):
+    """create_all doesn't alter existing tables; add nullable columns declared since they were created."""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}"
+                ))
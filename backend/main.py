@@ -5,10 +5,18 @@ import logging
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 
-from database import init_db, SessionLocal
+from database import init_db_async, AsyncSessionLocal, async_engine
 from routers import topics, resume, interviews, feedback
 from routers.topics import seed_topics
 from websocket_handler import InterviewWebSocketHandler
+from ws_protocol import parse_caps
+from services.emotion_executor import emotion_executor
+from services import resume_ingest
+from services.job_queue import feedback_jobs
+from services.turn_scoring import turn_scorer
+from services.snapshot_writer import snapshot_writer
+from services.live_prewarm import live_prewarm
+from services.genai_clients import genai_clients
 
 logging.basicConfig(level=logging.INFO)
 
@@ -25,6 +33,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # ── Routers ─────────────────────────────────────────
@@ -36,13 +45,28 @@ app.include_router(feedback.router)
 
 # ── Startup ─────────────────────────────────────────
 @app.on_event("startup")
-def on_startup():
-    init_db()
-    db = SessionLocal()
-    try:
-        seed_topics(db)
-    finally:
-        db.close()
+async def on_startup():
+    await init_db_async()
+    async with AsyncSessionLocal() as db:
+        await seed_topics(db)
+    emotion_executor.start()
+    await genai_clients.start()
+    await snapshot_writer.start()
+    await feedback_jobs.start()
+    await live_prewarm.start()
+    await resume_ingest.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await live_prewarm.stop()
+    await feedback_jobs.stop()
+    turn_scorer.shutdown()
+    await snapshot_writer.stop()
+    emotion_executor.shutdown()
+    await genai_clients.close()
+    await resume_ingest.shutdown()
+    await async_engine.dispose()
 
 
 # ── Health Check ────────────────────────────────────
@@ -55,8 +79,24 @@ def health_check():
     }
 
 
+# ── Metrics ─────────────────────────────────────────
+@app.get("/api/metrics")
+def get_metrics():
+    from services import gemini_text
+    from services.resume_cache import resume_cache
+    return {
+        "text_generation": gemini_text.metrics.snapshot(),
+        "resume_cache": resume_cache.stats(),
+        "feedback_jobs": feedback_jobs.stats(),
+        "turn_scoring": turn_scorer.stats(),
+        "emotion_writes": snapshot_writer.stats(),
+        "live_prewarm": live_prewarm.stats(),
+        "genai_clients": genai_clients.stats(),
+    }
+
+
 # ── WebSocket Endpoint ──────────────────────────────
 @app.websocket("/ws/interview/{session_id}")
-async def interview_websocket(websocket: WebSocket, session_id: int):
-    handler = InterviewWebSocketHandler(websocket, session_id)
+async def interview_websocket(websocket: WebSocket, session_id: int, caps: str = ""):
+    handler = InterviewWebSocketHandler(websocket, session_id, parse_caps(caps))
     await handler.run()
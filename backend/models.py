@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Float, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from database import Base
@@ -40,16 +40,39 @@ class InterviewSession(Base):
     duration_seconds = Column(Integer, default=0)
 
     # Results
-    transcript = Column(JSON, default=list)  # [{role, content, timestamp}]
+    transcript = Column(JSON, default=list)  # legacy [{role, content, timestamp}]; new sessions use transcript_turns
     overall_score = Column(Float, nullable=True)
     feedback = Column(JSON, default=dict)
 
     topic = relationship("InterviewTopic", back_populates="sessions")
     emotion_snapshots = relationship("EmotionSnapshot", back_populates="session", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination of the interview list, unfiltered and filtered by status or topic
+        Index("ix_interview_sessions_created_at_id", "created_at", "id"),
+        Index("ix_interview_sessions_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_interview_sessions_topic_created_at_id", "topic_id", "created_at", "id"),
+        # Covers /count by status: the count, score average and duration total read only the index
+        Index("ix_interview_sessions_status_score_duration", "status", "overall_score", "duration_seconds"),
+    )
+
+
+class TranscriptTurn(Base):
+    __tablename__ = "transcript_turns"
+    __table_args__ = (UniqueConstraint("session_id", "seq"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), nullable=False, index=True)
+    seq = Column(Integer, nullable=False)  # position in the transcript
+    role = Column(String(20), nullable=False)  # interviewer, candidate
+    content = Column(Text, default="")
+    timestamp = Column(Float, default=0.0)  # seconds from interview start
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
 
 class EmotionSnapshot(Base):
     __tablename__ = "emotion_snapshots"
+    __table_args__ = (Index("ix_emotion_snapshots_session_timestamp", "session_id", "timestamp"),)
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("interview_sessions.id"), nullable=False)
@@ -61,5 +84,63 @@ class EmotionSnapshot(Base):
     dominant_emotion = Column(String(20), default="neutral")
     stress_score = Column(Float, default=0.0)  # 0-1, computed from emotions
     confidence_score = Column(Float, default=0.0)  # 0-1
+    scoring_version = Column(Integer, nullable=True)  # weight set the scores came from; NULL = 1
 
     session = relationship("InterviewSession", back_populates="emotion_snapshots")
+
+
+class EmotionAggregate(Base):
+    """Running summary of a session's emotion snapshots, updated as they are written."""
+    __tablename__ = "emotion_aggregates"
+
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), primary_key=True)
+    count = Column(Integer, default=0)
+    stress_mean = Column(Float, default=0.0)
+    stress_m2 = Column(Float, default=0.0)  # sum of squared deviations (Welford)
+    confidence_mean = Column(Float, default=0.0)
+    confidence_m2 = Column(Float, default=0.0)
+    emotion_counts = Column(JSON, default=dict)  # dominant emotion -> snapshots
+    first_timestamp = Column(Float, nullable=True)
+    first_stress = Column(Float, nullable=True)
+    first_confidence = Column(Float, nullable=True)
+    last_timestamp = Column(Float, nullable=True)
+    last_stress = Column(Float, nullable=True)
+    last_confidence = Column(Float, nullable=True)
+
+
+class ResumeParseCache(Base):
+    __tablename__ = "resume_parse_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 of prompt version + normalized resume text
+    prompt_version = Column(String(20), nullable=False)
+    result = Column(JSON, default=dict)
+    size_bytes = Column(Integer, default=0)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    last_used_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+
+class FeedbackJob(Base):
+    __tablename__ = "feedback_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), nullable=False, index=True)
+    transcript_version = Column(String(64), nullable=False)  # hash of the transcript being evaluated
+    status = Column(String(20), default="queued")  # queued, running, completed, failed
+    result = Column(JSON, nullable=True)
+    error = Column(Text, default="")
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class TurnEvaluation(Base):
+    __tablename__ = "turn_evaluations"
+    __table_args__ = (UniqueConstraint("session_id", "segment_index"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), nullable=False, index=True)
+    segment_index = Column(Integer, nullable=False)  # position of the question/answer segment
+    segment_key = Column(String(64), nullable=False)  # hash of the segment text it was scored on
+    evaluation = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
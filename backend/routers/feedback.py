@@ -1,72 +1,109 @@
 """
 Feedback generation router.
 """
+import json
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
-from models import InterviewSession, InterviewTopic, EmotionSnapshot
-from services.gemini_text import generate_feedback
+from models import FeedbackJob, InterviewSession
+from services.feedback_service import FeedbackError
+from services.job_queue import ACTIVE_STATUSES, feedback_jobs, job_to_dict
 
 router = APIRouter(prefix="/api/feedback", tags=["feedback"])
 
 
+@router.post("/{session_id}/jobs", status_code=202)
+async def enqueue_feedback(session_id: int):
+    """Queue feedback generation and return the job immediately (duplicates are coalesced)."""
+    try:
+        return await feedback_jobs.submit(session_id)
+    except FeedbackError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/{session_id}/stream")
+async def stream_feedback(session_id: int):
+    """
+    Stream feedback as Server-Sent Events. Attaches to the session's feedback job
+    (queuing one if needed), so generation continues and is saved even if the client leaves.
+    Events: job, field {key, value}, item {key, index, value}, done (full report), failed {detail},
+    timeout (the job as it stands, if it hasn't finished within FEEDBACK_WAIT_TIMEOUT_S).
+    """
+    try:
+        job = await feedback_jobs.submit(session_id)
+    except FeedbackError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    async def events():
+        yield _sse("job", job)
+        async for event in feedback_jobs.subscribe(job["job_id"]):
+            kind = event[0]
+            if kind == "field":
+                yield _sse("field", {"key": event[1], "value": event[2]})
+            elif kind == "item":
+                yield _sse("item", {"key": event[1], "index": event[2], "value": event[3]})
+            elif kind == "done":
+                yield _sse("done", event[1])
+            elif kind == "timeout":
+                yield _sse("timeout", event[1])
+            else:
+                yield _sse("failed", {"detail": event[1]})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def get_feedback_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the status of a feedback job."""
+    job = await db.get(FeedbackJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_feedback_job_result(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the feedback produced by a completed job."""
+    job = await db.get(FeedbackJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job = job_to_dict(job, with_result=True)
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"] or "Feedback generation failed")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
+
+
 @router.post("/{session_id}")
-async def create_feedback(session_id: int, db: Session = Depends(get_db)):
-    """Generate AI feedback for a completed interview session."""
-    session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+async def create_feedback(session_id: int):
+    """Generate AI feedback for a completed interview session and wait for it."""
+    try:
+        job = await feedback_jobs.submit(session_id)
+    except FeedbackError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
 
-    if not session.transcript:
-        raise HTTPException(status_code=400, detail="No transcript available")
-
-    # Build context string
-    context_parts = []
-    if session.session_type == "topic" and session.topic_id:
-        topic = db.query(InterviewTopic).filter(InterviewTopic.id == session.topic_id).first()
-        if topic:
-            context_parts.append(f"Topic: {topic.name} ({topic.category})")
-            context_parts.append(f"Subtopics: {', '.join(topic.subtopics)}")
-    elif session.session_type == "custom":
-        context_parts.append(f"Custom interview for: {session.job_title}")
-        if session.job_description:
-            context_parts.append(f"Job description: {session.job_description[:500]}")
-
-    context_parts.append(f"Difficulty: {session.difficulty}")
-    context_parts.append(f"Duration: {session.duration_seconds}s")
-    interview_context = "\n".join(context_parts)
-
-    # Get emotion data
-    snapshots = db.query(EmotionSnapshot).filter(
-        EmotionSnapshot.session_id == session_id
-    ).order_by(EmotionSnapshot.timestamp).all()
-
-    emotion_data = [
-        {
-            "timestamp": s.timestamp,
-            "emotions": s.emotions,
-            "dominant_emotion": s.dominant_emotion,
-            "stress_score": s.stress_score,
-            "confidence_score": s.confidence_score,
-        }
-        for s in snapshots
-    ]
-
-    # Generate feedback
-    feedback = await generate_feedback(session.transcript, emotion_data, interview_context)
-
-    # Save feedback to session
-    session.feedback = feedback
-    session.overall_score = feedback.get("overall_score", 0)
-    db.commit()
-
-    return feedback
+    job = await feedback_jobs.wait(job["job_id"])
+    if job["status"] in ACTIVE_STATUSES:
+        raise HTTPException(status_code=504, detail=f"Feedback is still being generated (job {job['job_id']})")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=500, detail=job["error"] or "Feedback generation failed")
+    return job["result"]
 
 
 @router.get("/{session_id}")
-def get_feedback(session_id: int, db: Session = Depends(get_db)):
+async def get_feedback(session_id: int, db: AsyncSession = Depends(get_db)):
     """Get stored feedback for a session."""
-    session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+    session = await db.get(InterviewSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     if not session.feedback:
@@ -1,18 +1,28 @@
 """
 Interview session management router.
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import base64
+from typing import Optional
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
 from database import get_db
 from models import InterviewSession, InterviewTopic, EmotionSnapshot
 from schemas import InterviewCreate, InterviewOut, InterviewListItem
+from services.transcript_store import load_transcript, replace_transcript
+from services.emotion_aggregates import load_emotion_summary
+from services.timeline import lttb_indices
+from services.live_prewarm import prewarm_session
+from services import emotion_series
 
 router = APIRouter(prefix="/api/interviews", tags=["interviews"])
 
 
 @router.post("", response_model=InterviewOut)
-def create_interview(data: InterviewCreate, db: Session = Depends(get_db)):
+async def create_interview(data: InterviewCreate, db: AsyncSession = Depends(get_db)):
     """Create a new interview session."""
     session = InterviewSession(
         session_type=data.session_type,
@@ -24,49 +34,117 @@ def create_interview(data: InterviewCreate, db: Session = Depends(get_db)):
         status="created",
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
+    # Custom sessions get their parsed resume in a follow-up PATCH, then call /prewarm
+    if session.session_type == "topic":
+        await prewarm_session(session, db)
     return session
 
 
+def _encode_cursor(created_at: datetime, session_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{session_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(session_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _apply_filters(query, status: Optional[str], topic_id: Optional[int], session_type: Optional[str]):
+    if status:
+        query = query.filter(InterviewSession.status == status)
+    if topic_id is not None:
+        query = query.filter(InterviewSession.topic_id == topic_id)
+    if session_type:
+        query = query.filter(InterviewSession.session_type == session_type)
+    return query
+
+
 @router.get("", response_model=list[InterviewListItem])
-def list_interviews(db: Session = Depends(get_db)):
-    """List all interview sessions, most recent first."""
-    sessions = db.query(InterviewSession).order_by(InterviewSession.created_at.desc()).all()
-    result = []
-    for s in sessions:
-        topic_name = None
-        if s.topic_id:
-            topic = db.query(InterviewTopic).filter(InterviewTopic.id == s.topic_id).first()
-            topic_name = topic.name if topic else None
-        result.append(InterviewListItem(
-            id=s.id,
-            session_type=s.session_type,
-            topic_id=s.topic_id,
-            topic_name=topic_name,
-            difficulty=s.difficulty,
-            job_title=s.job_title,
-            status=s.status,
-            created_at=s.created_at,
-            duration_seconds=s.duration_seconds,
-            overall_score=s.overall_score,
+async def list_interviews(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    topic_id: Optional[int] = None,
+    session_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List interview sessions, most recent first.
+    Only the list columns are loaded (no transcript/feedback JSON). When more rows
+    remain, the X-Next-Cursor response header holds the cursor for the next page.
+    """
+    query = select(
+        InterviewSession.id,
+        InterviewSession.session_type,
+        InterviewSession.topic_id,
+        InterviewTopic.name.label("topic_name"),
+        InterviewSession.difficulty,
+        InterviewSession.job_title,
+        InterviewSession.status,
+        InterviewSession.created_at,
+        InterviewSession.duration_seconds,
+        InterviewSession.overall_score,
+    ).outerjoin(InterviewTopic, InterviewTopic.id == InterviewSession.topic_id)
+    query = _apply_filters(query, status, topic_id, session_type)
+
+    if cursor:
+        created_at, last_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            InterviewSession.created_at < created_at,
+            and_(InterviewSession.created_at == created_at, InterviewSession.id < last_id),
         ))
-    return result
+
+    query = query.order_by(InterviewSession.created_at.desc(), InterviewSession.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [InterviewListItem.model_validate(row) for row in rows]
+
+
+@router.get("/count")
+async def count_interviews(
+    status: Optional[str] = None,
+    topic_id: Optional[int] = None,
+    session_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Count sessions matching the list filters, with score and practice-time totals."""
+    query = select(
+        func.count(InterviewSession.id),
+        func.avg(InterviewSession.overall_score),
+        func.coalesce(func.sum(InterviewSession.duration_seconds), 0),
+    )
+    query = _apply_filters(query, status, topic_id, session_type)
+    count, avg_score, total_duration = (await db.execute(query)).one()
+    return {
+        "count": count,
+        "avg_score": round(avg_score, 1) if avg_score is not None else None,
+        "total_duration_seconds": total_duration,
+    }
 
 
 @router.get("/{session_id}", response_model=InterviewOut)
-def get_interview(session_id: int, db: Session = Depends(get_db)):
+async def get_interview(session_id: int, db: AsyncSession = Depends(get_db)):
     """Get full interview session details."""
-    session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+    session = await db.get(InterviewSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    return session
+    out = InterviewOut.model_validate(session)
+    out.transcript = await db.run_sync(lambda sync_db: load_transcript(session, sync_db))
+    return out
 
 
 @router.patch("/{session_id}")
-def update_interview(session_id: int, updates: dict, db: Session = Depends(get_db)):
+async def update_interview(session_id: int, updates: dict, db: AsyncSession = Depends(get_db)):
     """Update interview session (status, transcript, etc.)."""
-    session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+    session = await db.get(InterviewSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -75,7 +153,7 @@ def update_interview(session_id: int, updates: dict, db: Session = Depends(get_d
         if updates["status"] == "completed":
             session.ended_at = datetime.now(timezone.utc)
     if "transcript" in updates:
-        session.transcript = updates["transcript"]
+        await db.run_sync(lambda sync_db: replace_transcript(session, updates["transcript"], sync_db))
     if "duration_seconds" in updates:
         session.duration_seconds = updates["duration_seconds"]
     if "overall_score" in updates:
@@ -85,17 +163,31 @@ def update_interview(session_id: int, updates: dict, db: Session = Depends(get_d
     if "resume_structured" in updates:
         session.resume_structured = updates["resume_structured"]
 
-    db.commit()
-    db.refresh(session)
+    await db.commit()
     return {"status": "updated", "id": session.id}
 
 
+@router.post("/{session_id}/prewarm", status_code=202)
+async def prewarm_interview(session_id: int, db: AsyncSession = Depends(get_db)):
+    """Start connecting the AI interviewer ahead of the WebSocket (no-op if already warm)."""
+    session = await db.get(InterviewSession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    await prewarm_session(session, db)
+    return {"status": "warming", "id": session.id}
+
+
 @router.get("/{session_id}/emotions")
-def get_session_emotions(session_id: int, db: Session = Depends(get_db)):
+async def get_session_emotions(session_id: int, db: AsyncSession = Depends(get_db)):
     """Get all emotion snapshots for a session."""
-    snapshots = db.query(EmotionSnapshot).filter(
-        EmotionSnapshot.session_id == session_id
-    ).order_by(EmotionSnapshot.timestamp).all()
+    # The series file is read off the event loop
+    records = await asyncio.to_thread(emotion_series.read_series, session_id)
+    if records is not None:
+        return await asyncio.to_thread(emotion_series.records_to_snapshots, records)
+
+    snapshots = (await db.scalars(
+        select(EmotionSnapshot).filter(EmotionSnapshot.session_id == session_id).order_by(EmotionSnapshot.timestamp)
+    )).all()
     return [
         {
             "timestamp": s.timestamp,
@@ -107,3 +199,65 @@ def get_session_emotions(session_id: int, db: Session = Depends(get_db)):
         }
         for s in snapshots
     ]
+
+
+def _series_timeline(records: np.ndarray, points: int) -> list[dict]:
+    """Columnar storage: LTTB runs on memory-mapped columns; only kept points become objects."""
+    keep = lttb_indices(
+        records[:, emotion_series.TIMESTAMP_COL],
+        records[:, [emotion_series.STRESS_COL, emotion_series.CONFIDENCE_COL]],
+        points,
+    ) if len(records) else []
+    kept = records[keep]
+    return [
+        {
+            "timestamp": float(r[emotion_series.TIMESTAMP_COL]),
+            "stress_score": float(r[emotion_series.STRESS_COL]),
+            "confidence_score": float(r[emotion_series.CONFIDENCE_COL]),
+            "dominant_emotion": dominant,
+        }
+        for r, dominant in zip(kept, emotion_series.dominant_emotions(kept))
+    ]
+
+
+@router.get("/{session_id}/emotions/timeline")
+async def get_emotion_timeline(
+    session_id: int, points: int = Query(120, ge=3, le=2000), db: AsyncSession = Depends(get_db),
+):
+    """
+    Emotion summary plus a timeline downsampled (LTTB) to at most `points` samples.
+    The summary comes from the session's running aggregates.
+    """
+    summary = await db.run_sync(lambda sync_db: load_emotion_summary(session_id, sync_db))
+    records = await asyncio.to_thread(emotion_series.read_series, session_id)
+    if records is not None:
+        # Reading the memory-mapped columns is file I/O, so it stays off the event loop too
+        points_out = await asyncio.to_thread(_series_timeline, records, points)
+        return {"summary": summary, "points": points_out}
+
+    rows = (await db.execute(select(
+        EmotionSnapshot.timestamp,
+        EmotionSnapshot.stress_score,
+        EmotionSnapshot.confidence_score,
+        EmotionSnapshot.dominant_emotion,
+    ).filter(EmotionSnapshot.session_id == session_id).order_by(EmotionSnapshot.timestamp))).all()
+
+    if rows:
+        t = np.array([r[0] for r in rows], dtype=np.float64)
+        values = np.array([(r[1] or 0.0, r[2] or 0.0) for r in rows], dtype=np.float64)
+        keep = lttb_indices(t, values, points)
+    else:
+        keep = []
+
+    return {
+        "summary": summary,
+        "points": [
+            {
+                "timestamp": rows[i][0],
+                "stress_score": rows[i][1],
+                "confidence_score": rows[i][2],
+                "dominant_emotion": rows[i][3],
+            }
+            for i in keep
+        ],
+    }
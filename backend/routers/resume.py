@@ -1,34 +1,48 @@
 """
 Resume upload and parsing router.
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from starlette.datastructures import UploadFile
 from schemas import ResumeAnalysis, CustomInterviewConfig
-from services.resume_parser import extract_text_from_pdf
-from services.gemini_text import parse_resume_with_ai
+from services.resume_ingest import check_upload_length, ingest_pdf
+from services.resume_cache import resume_cache
 
 router = APIRouter(prefix="/api/resume", tags=["resume"])
 
 
 @router.post("/upload", response_model=ResumeAnalysis)
-async def upload_resume(file: UploadFile = File(...)):
-    """Upload a PDF resume, extract text, and return structured analysis."""
-    if not file.filename or not file.filename.lower().endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Only PDF files are accepted")
-
-    contents = await file.read()
-    if len(contents) > 10 * 1024 * 1024:  # 10MB limit
-        raise HTTPException(status_code=400, detail="File too large (max 10MB)")
-
+async def upload_resume(request: Request):
+    """Upload a PDF resume (multipart field "file"), extract text, and return structured analysis."""
+    # The form is parsed here rather than through an UploadFile parameter, which would
+    # receive and spool the whole body before the size limit could be checked
     try:
-        raw_text = extract_text_from_pdf(contents)
+        check_upload_length(request.headers.get("content-length"))
+    except LookupError as e:
+        raise HTTPException(status_code=411, detail=str(e))
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=413, detail=str(e))
+
+    form = await request.form()
+    try:
+        file = form.get("file")
+        if not isinstance(file, UploadFile):
+            raise HTTPException(status_code=400, detail="A PDF file is required")
+        if not file.filename or not file.filename.lower().endswith(".pdf"):
+            raise HTTPException(status_code=400, detail="Only PDF files are accepted")
+
+        # Copied to disk in chunks; extraction runs off the event loop
+        try:
+            raw_text = await ingest_pdf(file)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        await form.close()
 
     if not raw_text.strip():
         raise HTTPException(status_code=400, detail="Could not extract text from PDF")
 
-    # Use AI to structure the resume
-    structured = await parse_resume_with_ai(raw_text)
+    # Use AI to structure the resume (cached by content hash)
+    structured = await resume_cache.get_or_parse(raw_text)
 
     return ResumeAnalysis(raw_text=raw_text, structured=structured)
 
@@ -41,7 +55,7 @@ async def analyze_for_interview(config: CustomInterviewConfig):
     if not config.job_description.strip():
         raise HTTPException(status_code=400, detail="Job description is required")
 
-    structured = await parse_resume_with_ai(config.resume_text)
+    structured = await resume_cache.get_or_parse(config.resume_text)
 
     return {
         "resume_structured": structured,
@@ -2,7 +2,8 @@
 Interview topics router — CRUD and pre-seeded topics.
 """
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from models import InterviewTopic
 from schemas import TopicOut
@@ -84,9 +85,9 @@ SEED_TOPICS = [
 ]
 
 
-def seed_topics(db: Session):
+async def seed_topics(db: AsyncSession):
     """Seed the database with default interview topics if empty."""
-    existing = db.query(InterviewTopic).count()
+    existing = await db.scalar(select(func.count(InterviewTopic.id)))
     if existing > 0:
         return
 
@@ -100,17 +101,17 @@ def seed_topics(db: Session):
             system_prompt_template="",
         )
         db.add(topic)
-    db.commit()
+    await db.commit()
 
 
 @router.get("", response_model=list[TopicOut])
-def list_topics(db: Session = Depends(get_db)):
-    return db.query(InterviewTopic).all()
+async def list_topics(db: AsyncSession = Depends(get_db)):
+    return (await db.scalars(select(InterviewTopic))).all()
 
 
 @router.get("/{topic_id}", response_model=TopicOut)
-def get_topic(topic_id: int, db: Session = Depends(get_db)):
-    topic = db.query(InterviewTopic).filter(InterviewTopic.id == topic_id).first()
+async def get_topic(topic_id: int, db: AsyncSession = Depends(get_db)):
+    topic = await db.get(InterviewTopic, topic_id)
     if not topic:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Topic not found")
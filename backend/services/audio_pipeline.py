@@ -0,0 +1,151 @@
+"""
+Upstream audio pipeline between the client WebSocket and Gemini Live.
+Client PCM is written into a bounded ring buffer without awaiting anything, and a
+separate sender task drains it to Gemini in fixed-duration frames. A slow upstream
+fills the buffer (oldest audio is overwritten) instead of stalling the client.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+from config import (
+    AUDIO_SAMPLE_RATE_INPUT, AUDIO_SAMPLE_WIDTH, AUDIO_CHANNELS,
+    AUDIO_UPSTREAM_FRAME_MS, AUDIO_UPSTREAM_BUFFER_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_MS = AUDIO_SAMPLE_RATE_INPUT * AUDIO_SAMPLE_WIDTH * AUDIO_CHANNELS // 1000
+
+
+class PcmRingBuffer:
+    """Fixed-capacity byte ring buffer that overwrites the oldest data when full."""
+
+    def __init__(self, capacity: int):
+        # Keep capacity sample-aligned so overwrites never split a sample
+        self.capacity = capacity - capacity % AUDIO_SAMPLE_WIDTH
+        self._buf = bytearray(self.capacity)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, data: bytes | memoryview) -> int:
+        """Append data; returns the number of old bytes overwritten."""
+        n = len(data)
+        dropped = 0
+        if n >= self.capacity:
+            dropped = self._size + n - self.capacity
+            data = data[n - self.capacity:]
+            n = self.capacity
+            self._start = 0
+            self._size = 0
+        overflow = self._size + n - self.capacity
+        if overflow > 0:
+            self._start = (self._start + overflow) % self.capacity
+            self._size -= overflow
+            dropped += overflow
+
+        end = (self._start + self._size) % self.capacity
+        first = min(n, self.capacity - end)
+        self._buf[end:end + first] = data[:first]
+        if first < n:
+            self._buf[:n - first] = data[first:]
+        self._size += n
+        return dropped
+
+    def read(self, n: int) -> bytes:
+        """Remove and return up to n bytes from the front."""
+        n = min(n, self._size)
+        first = min(n, self.capacity - self._start)
+        out = bytes(self._buf[self._start:self._start + first])
+        if first < n:
+            out += bytes(self._buf[:n - first])
+        self._start = (self._start + n) % self.capacity
+        self._size -= n
+        return out
+
+
+class UpstreamAudioPipeline:
+    """Coalesces client PCM into fixed-duration frames and relays them from its own task."""
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[None]],
+        frame_ms: int = AUDIO_UPSTREAM_FRAME_MS,
+        buffer_ms: int = AUDIO_UPSTREAM_BUFFER_MS,
+    ):
+        self._send = send
+        self.frame_ms = frame_ms
+        self.frame_bytes = frame_ms * BYTES_PER_MS
+        self._ring = PcmRingBuffer(max(buffer_ms, frame_ms) * BYTES_PER_MS)
+        self._data_ready = asyncio.Event()
+
+        # Metrics
+        self.bytes_in = 0
+        self.bytes_dropped = 0
+        self.frames_sent = 0
+        self.high_water_bytes = 0
+        self.send_time_total = 0.0
+        self.send_time_max = 0.0
+
+    def push(self, pcm: bytes | memoryview):
+        """Queue client audio. Never blocks; overwrites the oldest audio when full."""
+        self.bytes_in += len(pcm)
+        dropped = self._ring.write(pcm)
+        if dropped:
+            self.bytes_dropped += dropped
+        if len(self._ring) > self.high_water_bytes:
+            self.high_water_bytes = len(self._ring)
+        self._data_ready.set()
+
+    async def run(self):
+        """Sender loop — run as a background task for the life of the session."""
+        while True:
+            if not len(self._ring):
+                self._data_ready.clear()
+                await self._data_ready.wait()
+
+            # Wait up to one frame duration for a full frame, then flush what we have
+            # so the tail of an utterance isn't held back
+            deadline = time.monotonic() + self.frame_ms / 1000
+            while len(self._ring) < self.frame_bytes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._data_ready.clear()
+                try:
+                    await asyncio.wait_for(self._data_ready.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            await self._send_frame(self._ring.read(self.frame_bytes))
+
+    async def flush(self):
+        """Send whatever is still buffered."""
+        while len(self._ring):
+            await self._send_frame(self._ring.read(self.frame_bytes))
+
+    async def _send_frame(self, frame: bytes):
+        started = time.monotonic()
+        await self._send(frame)
+        elapsed = time.monotonic() - started
+        self.frames_sent += 1
+        self.send_time_total += elapsed
+        self.send_time_max = max(self.send_time_max, elapsed)
+
+    def stats(self) -> dict:
+        """Snapshot of pipeline metrics."""
+        return {
+            "frame_ms": self.frame_ms,
+            "bytes_in": self.bytes_in,
+            "bytes_dropped": self.bytes_dropped,
+            "frames_sent": self.frames_sent,
+            "buffered_bytes": len(self._ring),
+            "high_water_bytes": self.high_water_bytes,
+            "high_water_ms": self.high_water_bytes // BYTES_PER_MS,
+            "capacity_ms": self._ring.capacity // BYTES_PER_MS,
+            "avg_send_ms": round(self.send_time_total / self.frames_sent * 1000, 2) if self.frames_sent else 0.0,
+            "max_send_ms": round(self.send_time_max * 1000, 2),
+        }
@@ -0,0 +1,150 @@
+"""
+Running per-session emotion aggregates.
+Updated from each batch the snapshot writer inserts (in the same transaction), so
+reading a session's summary is a single-row lookup instead of a scan of its
+snapshots. Means and variances use Welford/Chan merges, so batches combine exactly.
+"""
+from collections import Counter
+from sqlalchemy.orm import Session
+from models import EmotionAggregate, EmotionSnapshot
+
+
+def _batch_moments(values: list[float]) -> tuple[int, float, float]:
+    """(count, mean, sum of squared deviations) of a batch, via Welford's update."""
+    n, mean, m2 = 0, 0.0, 0.0
+    for v in values:
+        n += 1
+        delta = v - mean
+        mean += delta / n
+        m2 += delta * (v - mean)
+    return n, mean, m2
+
+
+def _merge_moments(a: tuple[int, float, float], b: tuple[int, float, float]) -> tuple[int, float, float]:
+    """Combine two (count, mean, m2) summaries (Chan et al.)."""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return n, mean, m2
+
+
+def _fold(aggregate: EmotionAggregate, rows: list[dict]):
+    """Fold snapshot rows (EmotionSnapshot column dicts) into an aggregate."""
+    count = aggregate.count or 0
+    _, aggregate.stress_mean, aggregate.stress_m2 = _merge_moments(
+        (count, aggregate.stress_mean or 0.0, aggregate.stress_m2 or 0.0),
+        _batch_moments([r["stress_score"] for r in rows]),
+    )
+    _, aggregate.confidence_mean, aggregate.confidence_m2 = _merge_moments(
+        (count, aggregate.confidence_mean or 0.0, aggregate.confidence_m2 or 0.0),
+        _batch_moments([r["confidence_score"] for r in rows]),
+    )
+    aggregate.count = count + len(rows)
+
+    histogram = Counter(aggregate.emotion_counts or {})
+    histogram.update(r["dominant_emotion"] for r in rows)
+    aggregate.emotion_counts = dict(histogram)
+
+    first = min(rows, key=lambda r: r["timestamp"])
+    last = max(rows, key=lambda r: r["timestamp"])
+    if aggregate.first_timestamp is None or first["timestamp"] < aggregate.first_timestamp:
+        aggregate.first_timestamp = first["timestamp"]
+        aggregate.first_stress = first["stress_score"]
+        aggregate.first_confidence = first["confidence_score"]
+    if aggregate.last_timestamp is None or last["timestamp"] >= aggregate.last_timestamp:
+        aggregate.last_timestamp = last["timestamp"]
+        aggregate.last_stress = last["stress_score"]
+        aggregate.last_confidence = last["confidence_score"]
+
+
+def _existing_rows(session_id: int, db: Session) -> list[dict]:
+    columns = (
+        EmotionSnapshot.timestamp, EmotionSnapshot.dominant_emotion,
+        EmotionSnapshot.stress_score, EmotionSnapshot.confidence_score,
+    )
+    return [
+        {"timestamp": t, "dominant_emotion": d, "stress_score": s or 0.0, "confidence_score": c or 0.0}
+        for t, d, s, c in db.query(*columns).filter(EmotionSnapshot.session_id == session_id)
+    ]
+
+
+def ensure_aggregate(session_id: int, db: Session) -> EmotionAggregate:
+    """The session's aggregate row, built from its stored snapshots if it doesn't exist yet."""
+    aggregate = db.get(EmotionAggregate, session_id)
+    if aggregate is None:
+        # Sessions recorded before aggregates existed start from their stored snapshots
+        aggregate = EmotionAggregate(session_id=session_id, count=0, emotion_counts={})
+        existing = _existing_rows(session_id, db)
+        if existing:
+            _fold(aggregate, existing)
+        db.add(aggregate)
+    return aggregate
+
+
+def apply_snapshot_rows(db: Session, rows: list[dict]):
+    """Update aggregates for a batch of new snapshot rows. Call before inserting them; caller commits."""
+    by_session: dict[int, list[dict]] = {}
+    for row in rows:
+        by_session.setdefault(row["session_id"], []).append(row)
+    for session_id, session_rows in by_session.items():
+        _fold(ensure_aggregate(session_id, db), session_rows)
+
+
+def rebuild_aggregate(session_id: int, db: Session, rows: list[dict] | None = None) -> EmotionAggregate:
+    """
+    Recompute a session's aggregate from scratch, e.g. after its scores were rewritten.
+    `rows` defaults to the session's stored snapshots; caller commits.
+    """
+    aggregate = db.get(EmotionAggregate, session_id)
+    if aggregate is None:
+        aggregate = EmotionAggregate(session_id=session_id)
+        db.add(aggregate)
+    aggregate.count = 0
+    aggregate.stress_mean = aggregate.stress_m2 = 0.0
+    aggregate.confidence_mean = aggregate.confidence_m2 = 0.0
+    aggregate.emotion_counts = {}
+    aggregate.first_timestamp = aggregate.first_stress = aggregate.first_confidence = None
+    aggregate.last_timestamp = aggregate.last_stress = aggregate.last_confidence = None
+    rows = _existing_rows(session_id, db) if rows is None else rows
+    if rows:
+        _fold(aggregate, rows)
+    return aggregate
+
+
+def load_emotion_summary(session_id: int, db: Session) -> dict | None:
+    """Summary statistics for a session's emotion data, or None if there is none."""
+    aggregate = db.get(EmotionAggregate, session_id)
+    if aggregate is None:
+        # Older session without an aggregate row: summarize its snapshots once, unsaved
+        existing = _existing_rows(session_id, db)
+        if not existing:
+            return None
+        aggregate = EmotionAggregate(session_id=session_id, count=0, emotion_counts={})
+        _fold(aggregate, existing)
+    if not aggregate.count:
+        return None
+
+    n = aggregate.count
+    return {
+        "count": n,
+        "avg_stress": aggregate.stress_mean,
+        "avg_confidence": aggregate.confidence_mean,
+        "stress_std": (aggregate.stress_m2 / n) ** 0.5,
+        "confidence_std": (aggregate.confidence_m2 / n) ** 0.5,
+        "emotion_counts": aggregate.emotion_counts or {},
+        "first": {
+            "timestamp": aggregate.first_timestamp,
+            "stress_score": aggregate.first_stress,
+            "confidence_score": aggregate.first_confidence,
+        },
+        "last": {
+            "timestamp": aggregate.last_timestamp,
+            "stress_score": aggregate.last_stress,
+            "confidence_score": aggregate.last_confidence,
+        },
+    }
@@ -1,17 +1,18 @@
 """
 Facial emotion analysis using DeepFace.
-Processes base64-encoded webcam frames and returns emotion breakdown + stress score.
+Processes JPEG webcam frames and returns emotion breakdown + stress score.
 """
-import base64
-import io
+import cv2
 import numpy as np
-from PIL import Image
 import logging
+from config import EMOTION_FRAME_MAX_SIDE, EMOTION_SCORING_VERSION
+from services.emotion_scoring import EMOTION_LABELS, score_emotions, score_matrix
 
 logger = logging.getLogger(__name__)
 
 # Lazy-load DeepFace to avoid slow startup
 _deepface = None
+_emotion_model = None
 
 def _get_deepface():
     global _deepface
@@ -26,9 +27,26 @@ def _get_deepface():
     return _deepface
 
 
-def analyze_frame(base64_image: str) -> dict | None:
+def warm_up():
+    """Load DeepFace and its emotion model so the first real frame isn't slow."""
+    deepface = _get_deepface()
+    if not deepface:
+        return
+    try:
+        deepface.analyze(
+            img_path=np.zeros((48, 48, 3), dtype=np.uint8),
+            actions=["emotion"],
+            enforce_detection=False,
+            silent=True,
+        )
+        logger.info("Emotion model warmed up")
+    except Exception as e:
+        logger.warning(f"Emotion model warm-up failed: {e}")
+
+
+def analyze_frame(image: bytes) -> dict | None:
     """
-    Analyze a base64-encoded image for facial emotions.
+    Analyze a JPEG-encoded image for facial emotions.
     Returns emotion breakdown, dominant emotion, stress/confidence scores.
     """
     deepface = _get_deepface()
@@ -36,13 +54,7 @@ def analyze_frame(base64_image: str) -> dict | None:
         return _generate_fallback()
 
     try:
-        # Decode base64 → numpy array
-        if "," in base64_image:
-            base64_image = base64_image.split(",")[1]
-
-        image_bytes = base64.b64decode(base64_image)
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-        img_array = np.array(image)
+        img_array = _decode_image(image)
 
         # Analyze with DeepFace
         results = deepface.analyze(
@@ -62,51 +74,119 @@ def analyze_frame(base64_image: str) -> dict | None:
         # Normalize to 0-1 range (DeepFace returns percentages)
         # Convert np.float32 → Python float to avoid JSON serialization errors
         emotions_normalized = {k: round(float(v) / 100, 4) for k, v in emotions.items()}
-
-        # Compute stress & confidence scores
-        stress_score = _compute_stress(emotions_normalized)
-        confidence_score = _compute_confidence(emotions_normalized)
-
-        return {
-            "emotions": emotions_normalized,
-            "dominant_emotion": str(dominant),
-            "stress_score": round(float(stress_score), 4),
-            "confidence_score": round(float(confidence_score), 4),
-        }
+        return _build_result(emotions_normalized, str(dominant))
 
     except Exception as e:
         logger.error(f"Emotion analysis error: {e}")
         return _generate_fallback()
 
 
-def _compute_stress(emotions: dict) -> float:
-    """Compute stress score from emotion probabilities."""
-    stress_emotions = {
-        "fear": 1.0,
-        "angry": 0.8,
-        "sad": 0.6,
-        "disgust": 0.5,
-        "surprise": 0.3,
-    }
-    score = sum(emotions.get(e, 0) * w for e, w in stress_emotions.items())
-    return min(1.0, max(0.0, score))
+def analyze_batch(images: list[bytes]) -> list[dict]:
+    """
+    Analyze several frames with a single batched forward pass of the emotion model.
+    Face detection is still per frame; only the emotion CNN is batched.
+    Falls back to per-frame analysis if the raw model can't be loaded.
+    """
+    deepface = _get_deepface()
+    if not deepface:
+        return [_generate_fallback() for _ in images]
 
+    model = _get_emotion_model()
+    if not model:
+        return [analyze_frame(img) for img in images]
 
-def _compute_confidence(emotions: dict) -> float:
-    """Compute confidence score from emotion probabilities."""
-    confidence_emotions = {
-        "happy": 0.8,
-        "neutral": 1.0,
-        "surprise": 0.3,
-    }
-    stress_penalty = {
-        "fear": -0.8,
-        "sad": -0.5,
-        "angry": -0.3,
+    results: list[dict | None] = [None] * len(images)
+    faces, indices = [], []
+    for i, image in enumerate(images):
+        try:
+            faces.append(_prepare_face(deepface, _decode_image(image)))
+            indices.append(i)
+        except Exception as e:
+            logger.error(f"Emotion preprocessing error: {e}")
+            results[i] = _generate_fallback()
+
+    if faces:
+        try:
+            predictions = model.predict(np.stack(faces), verbose=0)
+            predictions = predictions / np.maximum(predictions.sum(axis=1, keepdims=True), 1e-8)
+            # Score the whole batch in one matmul
+            scores = score_matrix(predictions)
+            for i, probs, (stress, confidence) in zip(indices, predictions, scores):
+                emotions_normalized = {
+                    label: round(float(p), 4) for label, p in zip(EMOTION_LABELS, probs)
+                }
+                dominant = EMOTION_LABELS[int(np.argmax(probs))]
+                results[i] = _build_result(emotions_normalized, dominant, (stress, confidence))
+        except Exception as e:
+            logger.error(f"Batched emotion inference error: {e}")
+            for i in indices:
+                results[i] = _generate_fallback()
+
+    return results
+
+
+def _get_emotion_model():
+    """Load the raw Keras emotion model behind DeepFace, or False if unavailable."""
+    global _emotion_model
+    if _emotion_model is None:
+        model = None
+        try:
+            from deepface.modules import modeling
+            model = modeling.build_model(task="facial_attribute", model_name="Emotion")
+        except Exception:
+            try:
+                model = _get_deepface().build_model("Emotion")
+            except Exception as e:
+                logger.warning(f"Raw emotion model unavailable, batching disabled: {e}")
+        # DeepFace wraps the Keras model in a client object in newer releases
+        _emotion_model = getattr(model, "model", model) or False
+    return _emotion_model
+
+
+def _decode_image(image: bytes | memoryview) -> np.ndarray:
+    """
+    Decode a JPEG straight from its buffer into a BGR array (DeepFace's layout),
+    downscaled so the longest side is at most EMOTION_FRAME_MAX_SIDE.
+    """
+    img = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode image")
+    h, w = img.shape[:2]
+    scale = EMOTION_FRAME_MAX_SIDE / max(h, w)
+    if scale < 1:
+        img = cv2.resize(img, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+    return img
+
+
+def _prepare_face(deepface, img_array: np.ndarray) -> np.ndarray:
+    """Detect the face and turn it into the emotion model's 48x48x1 input."""
+    faces = deepface.extract_faces(
+        img_path=img_array,
+        detector_backend="opencv",
+        enforce_detection=False,
+        align=True,
+    )
+    if faces:
+        # Detected faces come back as RGB floats in [0, 1]
+        face = (np.clip(faces[0]["face"], 0, 1) * 255).astype(np.uint8)
+        gray = cv2.cvtColor(face, cv2.COLOR_RGB2GRAY)
+    else:
+        gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
+    gray = cv2.resize(gray, (48, 48))
+    return (gray.astype(np.float32) / 255.0)[:, :, np.newaxis]
+
+
+def _build_result(emotions_normalized: dict, dominant: str, scores: tuple | None = None) -> dict:
+    """Attach stress & confidence scores (computed here unless given) to normalized emotion probabilities."""
+    stress_score, confidence_score = scores if scores is not None else score_emotions(emotions_normalized)
+
+    return {
+        "emotions": emotions_normalized,
+        "dominant_emotion": dominant,
+        "stress_score": round(float(stress_score), 4),
+        "confidence_score": round(float(confidence_score), 4),
+        "scoring_version": EMOTION_SCORING_VERSION,
     }
-    score = sum(emotions.get(e, 0) * w for e, w in confidence_emotions.items())
-    score += sum(emotions.get(e, 0) * w for e, w in stress_penalty.items())
-    return min(1.0, max(0.0, score))
 
 
 def _generate_fallback() -> dict:
@@ -120,4 +200,5 @@ def _generate_fallback() -> dict:
         "dominant_emotion": "neutral",
         "stress_score": 0.0,
         "confidence_score": 0.5,
+        "scoring_version": EMOTION_SCORING_VERSION,
     }
@@ -0,0 +1,201 @@
+"""
+Off-event-loop executor for facial emotion inference.
+DeepFace runs in a process pool (model loaded once per worker) so TensorFlow never
+blocks the audio relay. Each interview session gets a small bounded frame queue;
+when analysis falls behind, the oldest pending frame is dropped.
+Frames from all live sessions are micro-batched into one forward pass per batch.
+"""
+import asyncio
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from config import EMOTION_WORKERS, EMOTION_QUEUE_SIZE, EMOTION_BATCH_SIZE, EMOTION_BATCH_MAX_WAIT_MS
+from services import emotion_analyzer
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    """Process pool initializer — load the emotion model once per worker."""
+    emotion_analyzer.warm_up()
+
+
+class _SessionQueue:
+    """Pending frames for one session plus the task draining them."""
+
+    def __init__(self):
+        self.frames: deque = deque()  # (jpeg_bytes, future)
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.dropped = 0
+
+
+class EmotionInferenceExecutor:
+    """Async front-end to a process pool running emotion analysis."""
+
+    def __init__(
+        self,
+        workers: int = EMOTION_WORKERS,
+        queue_size: int = EMOTION_QUEUE_SIZE,
+        batch_size: int = EMOTION_BATCH_SIZE,
+        batch_max_wait_ms: int = EMOTION_BATCH_MAX_WAIT_MS,
+    ):
+        self.workers = workers
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.batch_max_wait = batch_max_wait_ms / 1000
+        self._pool: ProcessPoolExecutor | None = None
+        self._queues: dict[int, _SessionQueue] = {}
+
+        # Cross-session batch collector
+        self._pending: list[tuple[bytes, asyncio.Future]] = []
+        self._pending_event: asyncio.Event | None = None
+        self._collector: asyncio.Task | None = None
+        self._batch_slots: asyncio.Semaphore | None = None
+
+    def start(self):
+        """Spin up the worker pool. Safe to call more than once."""
+        if self._pool is not None:
+            return
+        # TensorFlow is not fork-safe, so always spawn fresh interpreters
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        logger.info(
+            f"Emotion executor started with {self.workers} worker(s), "
+            f"batch size {self.batch_size}, max wait {int(self.batch_max_wait * 1000)}ms"
+        )
+
+    def shutdown(self):
+        """Stop all session queues, the batch collector and the worker pool."""
+        for session_id in list(self._queues):
+            self.close_session(session_id)
+        if self._collector and not self._collector.done():
+            self._collector.cancel()
+        self._collector = None
+        for _, future in self._pending:
+            if not future.done():
+                future.set_result(None)
+        self._pending.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        logger.info("Emotion executor stopped")
+
+    async def analyze(self, session_id: int, image_data: bytes) -> dict | None:
+        """
+        Queue a JPEG frame for analysis and wait for its result.
+        Returns None if the frame was dropped in favour of a newer one.
+        """
+        self.start()
+        queue = self._queues.get(session_id)
+        if queue is None:
+            queue = _SessionQueue()
+            queue.task = asyncio.create_task(self._drain(queue))
+            self._queues[session_id] = queue
+
+        # Drop-oldest: a stale frame is worth less than a fresh one
+        while len(queue.frames) >= self.queue_size:
+            _, stale = queue.frames.popleft()
+            queue.dropped += 1
+            if not stale.done():
+                stale.set_result(None)
+
+        future = asyncio.get_running_loop().create_future()
+        queue.frames.append((image_data, future))
+        queue.wakeup.set()
+        return await future
+
+    def close_session(self, session_id: int):
+        """Cancel a session's queue and release anyone waiting on it."""
+        queue = self._queues.pop(session_id, None)
+        if queue is None:
+            return
+        if queue.task and not queue.task.done():
+            queue.task.cancel()
+        while queue.frames:
+            _, future = queue.frames.popleft()
+            if not future.done():
+                future.set_result(None)
+        if queue.dropped:
+            logger.info(f"Session {session_id}: dropped {queue.dropped} stale emotion frame(s)")
+
+    async def _drain(self, queue: _SessionQueue):
+        """Hand one frame at a time per session to the batch collector."""
+        while True:
+            if not queue.frames:
+                queue.wakeup.clear()
+                await queue.wakeup.wait()
+                continue
+
+            image_data, future = queue.frames.popleft()
+            if future.done():
+                continue
+            try:
+                result = await self._submit(image_data)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.set_result(None)
+                raise
+            if not future.done():
+                future.set_result(result)
+
+    async def _submit(self, image_data: bytes) -> dict | None:
+        """Add a frame to the current cross-session batch and wait for its result."""
+        if self._collector is None or self._collector.done():
+            self._pending_event = asyncio.Event()
+            self._batch_slots = asyncio.Semaphore(self.workers)
+            self._collector = asyncio.create_task(self._collect())
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((image_data, future))
+        self._pending_event.set()
+        return await future
+
+    async def _collect(self):
+        """Close a batch when it is full or the oldest frame has waited long enough."""
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                self._pending_event.clear()
+                await self._pending_event.wait()
+                continue
+
+            deadline = loop.time() + self.batch_max_wait
+            while len(self._pending) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._pending_event.clear()
+                try:
+                    await asyncio.wait_for(self._pending_event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            # Keep at most one batch in flight per worker
+            await self._batch_slots.acquire()
+            asyncio.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: list[tuple[bytes, asyncio.Future]]):
+        """Run one batched forward pass in the pool and fan results back out."""
+        loop = asyncio.get_running_loop()
+        try:
+            images = [image_data for image_data, _ in batch]
+            results = await loop.run_in_executor(self._pool, emotion_analyzer.analyze_batch, images)
+        except Exception as e:
+            logger.error(f"Emotion worker error: {e}")
+            results = [None] * len(batch)
+        finally:
+            self._batch_slots.release()
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+emotion_executor = EmotionInferenceExecutor()
@@ -0,0 +1,60 @@
+"""
+Stress and confidence scoring from emotion probabilities.
+Each weight set is a (7, 2) matrix over EMOTION_LABELS, so N frames are scored
+with one (N, 7) @ (7, 2) product. Weight sets are versioned and never edited in
+place: add a new version, point EMOTION_SCORING_VERSION at it and re-score stored
+snapshots with tools/rescore_emotions.py so historical scores stay comparable.
+"""
+from functools import lru_cache
+import numpy as np
+from config import EMOTION_SCORING_VERSION
+
+# Output order of DeepFace's emotion model
+EMOTION_LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+
+# version -> score -> {emotion: weight}; emotions not listed weigh 0
+WEIGHT_SETS = {
+    1: {
+        "stress": {"fear": 1.0, "angry": 0.8, "sad": 0.6, "disgust": 0.5, "surprise": 0.3},
+        "confidence": {
+            "happy": 0.8, "neutral": 1.0, "surprise": 0.3,
+            "fear": -0.8, "sad": -0.5, "angry": -0.3,
+        },
+    },
+}
+SCORES = ("stress", "confidence")
+
+
+@lru_cache(maxsize=None)
+def weight_matrix(version: int = EMOTION_SCORING_VERSION) -> np.ndarray:
+    """The (len(EMOTION_LABELS), 2) weight matrix of a version; columns are stress, confidence."""
+    if version not in WEIGHT_SETS:
+        raise ValueError(f"Unknown emotion scoring version {version} (known: {sorted(WEIGHT_SETS)})")
+    weights = WEIGHT_SETS[version]
+    matrix = np.zeros((len(EMOTION_LABELS), len(SCORES)), dtype=np.float32)
+    for j, score in enumerate(SCORES):
+        for label, w in weights[score].items():
+            matrix[EMOTION_LABELS.index(label), j] = w
+    matrix.setflags(write=False)
+    return matrix
+
+
+def emotions_matrix(emotions: list[dict]) -> np.ndarray:
+    """Probability dicts as an (N, 7) float32 array in EMOTION_LABELS order."""
+    out = np.zeros((len(emotions), len(EMOTION_LABELS)), dtype=np.float32)
+    for i, probs in enumerate(emotions):
+        if probs:
+            out[i] = [probs.get(label, 0.0) for label in EMOTION_LABELS]
+    return out
+
+
+def score_matrix(probs: np.ndarray, version: int = EMOTION_SCORING_VERSION) -> np.ndarray:
+    """Score an (N, 7) probability array; returns (N, 2) stress/confidence clipped to [0, 1]."""
+    scores = np.asarray(probs, dtype=np.float32) @ weight_matrix(version)
+    return np.clip(scores, 0.0, 1.0, out=scores)
+
+
+def score_emotions(emotions: dict, version: int = EMOTION_SCORING_VERSION) -> tuple[float, float]:
+    """(stress, confidence) for a single frame's probability dict."""
+    stress, confidence = score_matrix(emotions_matrix([emotions]), version)[0]
+    return float(stress), float(confidence)
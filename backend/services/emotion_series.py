@@ -0,0 +1,156 @@
+"""
+Array-backed storage for emotion time series.
+Each session's snapshots live in one file of fixed-width float32 records:
+
+    timestamp, angry, disgust, fear, happy, sad, surprise, neutral, stress, confidence
+
+after a 16-byte header (which also records the scoring version of the stress and
+confidence columns). Files are appended as batches arrive and read back with
+numpy.memmap, so columns are strided views with no per-row objects or JSON decoding.
+The dominant emotion is the argmax of the seven probabilities; source is always "face".
+"""
+import os
+import struct
+import numpy as np
+from config import EMOTION_SERIES_DIR
+from services.emotion_scoring import EMOTION_LABELS, score_emotions
+
+MAGIC = b"EMOS"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI4x")  # magic, version, column count, scoring version (0 = 1)
+COLUMNS = ("timestamp", *EMOTION_LABELS, "stress_score", "confidence_score")
+TIMESTAMP_COL = 0
+EMOTION_COLS = slice(1, 1 + len(EMOTION_LABELS))
+STRESS_COL = COLUMNS.index("stress_score")
+CONFIDENCE_COL = COLUMNS.index("confidence_score")
+
+
+def series_path(session_id: int, directory: str = EMOTION_SERIES_DIR) -> str:
+    return os.path.join(directory, f"{session_id}.f32")
+
+
+def pack_rows(rows: list[dict]) -> np.ndarray:
+    """Snapshot rows (EmotionSnapshot column dicts) as an (n, 10) float32 array."""
+    out = np.empty((len(rows), len(COLUMNS)), dtype=np.float32)
+    for i, row in enumerate(rows):
+        emotions = row.get("emotions") or {}
+        out[i, TIMESTAMP_COL] = row["timestamp"]
+        out[i, EMOTION_COLS] = [emotions.get(label, 0.0) for label in EMOTION_LABELS]
+        out[i, STRESS_COL] = row.get("stress_score") or 0.0
+        out[i, CONFIDENCE_COL] = row.get("confidence_score") or 0.0
+    return out
+
+
+def conform_rows(
+    session_id: int, rows: list[dict], directory: str = EMOTION_SERIES_DIR, version: int | None = None,
+) -> list[dict]:
+    """
+    The rows with stress/confidence re-scored, where needed, to the given scoring version
+    or else that of the session's file (or of the first row, for a new file), so one
+    header version stays true for every record. Re-score the whole file with
+    tools/rescore_emotions.py.
+    """
+    version = version or series_scoring_version(session_id, directory) or rows[0].get("scoring_version") or 1
+    out = []
+    for row in rows:
+        if (row.get("scoring_version") or 1) != version:
+            stress, confidence = score_emotions(row.get("emotions") or {}, version)
+            row = {
+                **row, "stress_score": round(stress, 4), "confidence_score": round(confidence, 4),
+                "scoring_version": version,
+            }
+        out.append(row)
+    return out
+
+
+def append_rows(session_id: int, rows: list[dict], directory: str = EMOTION_SERIES_DIR):
+    """
+    Append snapshot rows to the session's file, creating it if needed. All rows must
+    carry the file's scoring version (see conform_rows).
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = series_path(session_id, directory)
+    with open(path, "a+b") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            version = rows[0].get("scoring_version") or 1
+            f.write(HEADER.pack(MAGIC, VERSION, len(COLUMNS), version))
+        else:
+            f.seek(0)
+            version = HEADER.unpack(f.read(HEADER.size))[3] or 1
+        mismatched = {row.get("scoring_version") or 1 for row in rows} - {version}
+        if mismatched:
+            raise ValueError(
+                f"Session {session_id} series is scored with version {version}, "
+                f"got rows scored with {sorted(mismatched)}"
+            )
+        f.write(pack_rows(rows).tobytes())
+
+
+def write_series(
+    session_id: int, records: np.ndarray, directory: str = EMOTION_SERIES_DIR, scoring_version: int = 1,
+):
+    """Write a whole series at once (atomically replacing any existing file)."""
+    os.makedirs(directory, exist_ok=True)
+    path = series_path(session_id, directory)
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(COLUMNS), scoring_version))
+        f.write(np.ascontiguousarray(records, dtype=np.float32).tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_series(session_id: int, directory: str = EMOTION_SERIES_DIR) -> np.ndarray | None:
+    """Memory-map a session's series as an (n, 10) float32 array, or None if it has no file."""
+    path = series_path(session_id, directory)
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return None
+    with open(path, "rb") as f:
+        magic, version, ncols, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or ncols != len(COLUMNS):
+        raise ValueError(f"{path} is not a v{VERSION} emotion series file")
+
+    row_bytes = ncols * 4
+    # Ignore a trailing partial record from an interrupted append
+    n = (size - HEADER.size) // row_bytes
+    if n == 0:
+        return np.empty((0, ncols), dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode="r", offset=HEADER.size, shape=(n, ncols))
+
+
+def series_scoring_version(session_id: int, directory: str = EMOTION_SERIES_DIR) -> int | None:
+    """Scoring version of a session's file, or None if it has no file."""
+    try:
+        with open(series_path(session_id, directory), "rb") as f:
+            return HEADER.unpack(f.read(HEADER.size))[3] or 1
+    except FileNotFoundError:
+        return None
+
+
+def delete_series(session_id: int, directory: str = EMOTION_SERIES_DIR):
+    try:
+        os.remove(series_path(session_id, directory))
+    except FileNotFoundError:
+        pass
+
+
+def dominant_emotions(records: np.ndarray) -> list[str]:
+    return [EMOTION_LABELS[i] for i in np.argmax(records[:, EMOTION_COLS], axis=1)]
+
+
+def records_to_snapshots(records: np.ndarray) -> list[dict]:
+    """Expand records into the /emotions API shape (allocates per row; for full exports)."""
+    dominants = dominant_emotions(records)
+    return [
+        {
+            "timestamp": float(r[TIMESTAMP_COL]),
+            "source": "face",
+            "emotions": dict(zip(EMOTION_LABELS, r[EMOTION_COLS].tolist())),
+            "dominant_emotion": dominant,
+            "stress_score": float(r[STRESS_COL]),
+            "confidence_score": float(r[CONFIDENCE_COL]),
+        }
+        for r, dominant in zip(records, dominants)
+    ]
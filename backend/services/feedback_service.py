@@ -0,0 +1,164 @@
+"""
+Feedback generation for completed interview sessions.
+Shared by the synchronous feedback endpoint and the background job queue.
+Short transcripts are evaluated in one call. Long ones are split into question/answer
+segments that are evaluated concurrently in chunks (map), then combined into the
+report (reduce), so nothing is truncated. Segments already scored during the live
+interview (see turn_scoring) are reused, so usually only the reduce step remains.
+"""
+import asyncio
+import hashlib
+import json
+from typing import AsyncIterator, Callable
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import InterviewSession, InterviewTopic
+from config import FEEDBACK_SINGLE_PASS_CHARS, FEEDBACK_CHUNK_CHARS, FEEDBACK_MAP_CONCURRENCY
+from services.gemini_text import (
+    stream_feedback, stream_feedback_reduce, evaluate_segments, parse_feedback_output,
+)
+from services.json_stream import IncrementalJSONObjectParser
+from services.transcript_segments import segment_transcript, segment_key, format_segment, pack_segments
+from services.transcript_store import load_transcript
+from services.emotion_aggregates import load_emotion_summary
+from services.turn_scoring import turn_scorer, load_turn_evaluations, store_turn_evaluations
+
+
+class FeedbackError(Exception):
+    """Feedback can't be generated for this session (missing session or transcript)."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def transcript_version(transcript: list) -> str:
+    """Stable hash of a transcript, used to tell whether feedback is stale."""
+    return hashlib.sha256(json.dumps(transcript or [], sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def build_interview_context(session: InterviewSession, db: Session, with_duration: bool = True) -> str:
+    """Describe the interview (topic or role, difficulty, duration) for the feedback prompt."""
+    context_parts = []
+    if session.session_type == "topic" and session.topic_id:
+        topic = db.query(InterviewTopic).filter(InterviewTopic.id == session.topic_id).first()
+        if topic:
+            context_parts.append(f"Topic: {topic.name} ({topic.category})")
+            context_parts.append(f"Subtopics: {', '.join(topic.subtopics)}")
+    elif session.session_type == "custom":
+        context_parts.append(f"Custom interview for: {session.job_title}")
+        if session.job_description:
+            context_parts.append(f"Job description: {session.job_description[:500]}")
+
+    context_parts.append(f"Difficulty: {session.difficulty}")
+    if with_duration:
+        context_parts.append(f"Duration: {session.duration_seconds}s")
+    return "\n".join(context_parts)
+
+
+def load_feedback_inputs(session_id: int) -> tuple[list, dict | None, str]:
+    """Gather (transcript, emotion_summary, interview_context) for a session."""
+    db = SessionLocal()
+    try:
+        session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+        if not session:
+            raise FeedbackError("Session not found", status_code=404)
+        transcript = load_transcript(session, db)
+        if not transcript:
+            raise FeedbackError("No transcript available")
+        return transcript, load_emotion_summary(session_id, db), build_interview_context(session, db)
+    finally:
+        db.close()
+
+
+def save_feedback(session_id: int, feedback: dict):
+    db = SessionLocal()
+    try:
+        session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+        if session:
+            session.feedback = feedback
+            session.overall_score = feedback.get("overall_score", 0)
+            db.commit()
+    finally:
+        db.close()
+
+
+def breakdown_item(evaluation: dict) -> dict:
+    """Shape a segment evaluation as a question_breakdown entry."""
+    return {
+        "question": evaluation.get("question", ""),
+        "response_quality": evaluation.get("response_quality", "unrated"),
+        "score": evaluation.get("score"),
+        "notes": evaluation.get("notes", ""),
+    }
+
+
+async def evaluate_transcript_segments(
+    segments: list[dict],
+    interview_context: str,
+    on_event: Callable[[tuple], None] | None = None,
+) -> list[dict]:
+    """Map step: evaluate segments in chunks, at most FEEDBACK_MAP_CONCURRENCY at a time."""
+    slots = asyncio.Semaphore(FEEDBACK_MAP_CONCURRENCY)
+
+    async def run(chunk: list[dict]) -> list[dict]:
+        async with slots:
+            evaluations = await evaluate_segments(chunk, interview_context)
+        if on_event:
+            for evaluation in evaluations:
+                on_event(("item", "question_breakdown", evaluation["segment"], breakdown_item(evaluation)))
+        return evaluations
+
+    results = await asyncio.gather(*[run(chunk) for chunk in pack_segments(segments, FEEDBACK_CHUNK_CHARS)])
+    return [evaluation for chunk in results for evaluation in chunk]
+
+
+async def _stream_parsed(chunks: AsyncIterator[str], on_event: Callable[[tuple], None] | None) -> dict:
+    parser = IncrementalJSONObjectParser()
+    text = []
+    async for chunk in chunks:
+        text.append(chunk)
+        events = parser.feed(chunk)
+        if on_event:
+            for event in events:
+                on_event(event)
+    return parse_feedback_output("".join(text))
+
+
+async def generate_session_feedback(session_id: int, on_event: Callable[[tuple], None] | None = None) -> dict:
+    """
+    Generate and persist feedback. No DB connection is held during the LLM calls.
+    The report is streamed; on_event receives each section as it completes
+    (see IncrementalJSONObjectParser for the event shapes).
+    """
+    transcript, emotion_summary, interview_context = await asyncio.to_thread(load_feedback_inputs, session_id)
+    segments = segment_transcript(transcript)
+
+    await turn_scorer.wait_for_session(session_id)
+    stored = await asyncio.to_thread(load_turn_evaluations, session_id)
+    precomputed = {
+        s["index"]: stored[s["index"]][1] for s in segments
+        if s["index"] in stored and stored[s["index"]][0] == segment_key(s)
+    }
+
+    short = sum(len(format_segment(segment)) for segment in segments) <= FEEDBACK_SINGLE_PASS_CHARS
+    if short and not precomputed:
+        feedback = await _stream_parsed(stream_feedback(transcript, emotion_summary, interview_context), on_event)
+    else:
+        if on_event:
+            for index, evaluation in sorted(precomputed.items()):
+                on_event(("item", "question_breakdown", index, breakdown_item(evaluation)))
+        missing = [s for s in segments if s["index"] not in precomputed]
+        fresh = await evaluate_transcript_segments(missing, interview_context, on_event) if missing else []
+        if fresh:
+            await asyncio.to_thread(store_turn_evaluations, session_id, missing, fresh)
+        by_index = {**precomputed, **{e["segment"]: e for e in fresh}}
+        evaluations = [by_index[s["index"]] for s in segments]
+
+        feedback = await _stream_parsed(stream_feedback_reduce(evaluations, emotion_summary, interview_context), on_event)
+        feedback["question_breakdown"] = [breakdown_item(e) for e in evaluations]
+        if on_event:
+            on_event(("field", "question_breakdown", feedback["question_breakdown"]))
+
+    await asyncio.to_thread(save_feedback, session_id, feedback)
+    return feedback
@@ -6,9 +6,9 @@ Configured for gemini-live-2.5-flash-native-audio model.
 """
 import asyncio
 import logging
-from google import genai
 from google.genai import types
-from config import GEMINI_MODEL, GOOGLE_CLOUD_PROJECT, GOOGLE_CLOUD_LOCATION
+from config import GEMINI_MODEL, GEMINI_LIVE_BASE_URL, LIVE_SESSION_RESUMPTION, LIVE_CONTEXT_COMPRESSION
+from services.genai_clients import genai_clients
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +16,13 @@ logger = logging.getLogger(__name__)
 class GeminiLiveSession:
     """Manages a single Gemini Live API session for an interview."""
 
-    def __init__(self, system_prompt: str):
+    def __init__(self, system_prompt: str, resumption_handle: str | None = None):
         self.system_prompt = system_prompt
-        self.client = genai.Client(
-            vertexai=True,
-            project=GOOGLE_CLOUD_PROJECT,
-            location=GOOGLE_CLOUD_LOCATION,
-        )
+        # Latest handle the server issued; passing it to a new session continues this one
+        self.resumption_handle = resumption_handle
+        self.go_away = False  # server announced it will close this connection soon
+        # Shared: credentials and transport are per process
+        self.client = genai_clients.get(base_url=GEMINI_LIVE_BASE_URL)
         self.session = None
         self.is_active = False
         self._context_manager = None
@@ -55,6 +55,14 @@ class GeminiLiveSession:
                         silence_duration_ms=500,
                     ),
                 ),
+                session_resumption=(
+                    types.SessionResumptionConfig(handle=self.resumption_handle)
+                    if LIVE_SESSION_RESUMPTION else None
+                ),
+                context_window_compression=(
+                    types.ContextWindowCompressionConfig(sliding_window=types.SlidingWindow())
+                    if LIVE_CONTEXT_COMPRESSION else None
+                ),
             )
 
             # live.connect() returns an async context manager
@@ -64,7 +72,7 @@ class GeminiLiveSession:
             )
             self.session = await self._context_manager.__aenter__()
             self.is_active = True
-            logger.info("Gemini Live session connected")
+            logger.info(f"Gemini Live session connected{' (resumed)' if self.resumption_handle else ''}")
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Gemini Live API: {e}")
@@ -109,6 +117,7 @@ class GeminiLiveSession:
             )
         except Exception as e:
             logger.error(f"Error sending text: {e}")
+            self.is_active = False
 
     async def receive_responses(self, on_audio=None, on_text=None, on_turn_complete=None, on_input_transcription=None):
         """
@@ -116,6 +125,7 @@ class GeminiLiveSession:
         For native audio models, text comes via output_transcription, not model_turn.parts.text.
         Re-enters the receive loop after each turn since session.receive() yields
         responses for a single turn and then the iterator ends.
+        Returns when the connection ends or fails, or after a go-away message.
         """
         if not self.session or not self.is_active:
             return
@@ -127,6 +137,16 @@ class GeminiLiveSession:
                     if not self.is_active:
                         return
 
+                    update = response.session_resumption_update
+                    if update and update.resumable and update.new_handle:
+                        self.resumption_handle = update.new_handle
+
+                    if response.go_away:
+                        # Connection lifetime is nearly up; hand back so the caller can move on
+                        logger.info(f"Gemini Live go-away received (time left: {response.go_away.time_left})")
+                        self.go_away = True
+                        return
+
                     server_content = response.server_content
                     if server_content:
                         # Audio data from model turn
@@ -163,6 +183,7 @@ class GeminiLiveSession:
 
         except asyncio.CancelledError:
             logger.info("Receive task cancelled")
+            raise
         except Exception as e:
             logger.error(f"Error receiving from Gemini: {e}")
 
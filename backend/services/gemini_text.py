@@ -1,30 +1,198 @@
 """
 Gemini text generation wrapper for resume parsing, feedback generation, etc.
 Uses Vertex AI with Application Default Credentials (ADC).
+Calls go through the process-wide async client (see genai_clients) behind
+global and per-route concurrency limits, with timeouts and jittered retries.
 """
+import asyncio
+import bisect
 import json
-from google import genai
-from config import GEMINI_TEXT_MODEL, GOOGLE_CLOUD_PROJECT, GOOGLE_CLOUD_LOCATION
-
-# Vertex AI with ADC — explicit args required for google-genai v1.5
-client = genai.Client(
-    vertexai=True,
-    project=GOOGLE_CLOUD_PROJECT,
-    location=GOOGLE_CLOUD_LOCATION,
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from google.genai import errors
+from services.genai_clients import genai_clients
+from services.transcript_segments import format_segment
+from config import (
+    GEMINI_TEXT_MODEL,
+    TEXT_GEN_MAX_CONCURRENCY, TEXT_GEN_ROUTE_CONCURRENCY, TEXT_GEN_TIMEOUT_S,
+    TEXT_GEN_MAX_RETRIES, TEXT_GEN_BACKOFF_BASE_S, TEXT_GEN_BACKOFF_MAX_S,
 )
 
+logger = logging.getLogger(__name__)
 
-async def generate_text(prompt: str, system_instruction: str = "") -> str:
+
+class TextGenMetrics:
+    """In-process counters for text generation calls."""
+
+    LATENCY_BUCKETS_S = [0.5, 1, 2, 5, 10, 20, 30, 60]
+
+    def __init__(self):
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.latency_counts = [0] * (len(self.LATENCY_BUCKETS_S) + 1)
+
+    def observe_wait(self, seconds: float):
+        self.queue_wait_total += seconds
+        self.queue_wait_max = max(self.queue_wait_max, seconds)
+
+    def observe_latency(self, seconds: float):
+        self.latency_counts[bisect.bisect_left(self.LATENCY_BUCKETS_S, seconds)] += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b}s" for b in self.LATENCY_BUCKETS_S] + ["inf"]
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retries,
+            "avg_queue_wait_ms": round(self.queue_wait_total / self.requests * 1000, 1) if self.requests else 0.0,
+            "max_queue_wait_ms": round(self.queue_wait_max * 1000, 1),
+            "latency_histogram": dict(zip(labels, self.latency_counts)),
+        }
+
+
+metrics = TextGenMetrics()
+
+_global_slots = asyncio.Semaphore(TEXT_GEN_MAX_CONCURRENCY)
+_route_slots = {route: asyncio.Semaphore(limit) for route, limit in TEXT_GEN_ROUTE_CONCURRENCY.items()}
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Timeouts, throttling, server errors and dropped connections are worth retrying."""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if isinstance(exc, errors.ServerError):
+        return True
+    return isinstance(exc, errors.APIError) and exc.code == 429
+
+
+@asynccontextmanager
+async def _generation_slot(route: str):
+    """Hold a global and a per-route concurrency slot and record call metrics."""
+    route_slots = _route_slots.get(route)
+    queued_at = time.monotonic()
+    metrics.waiting += 1
+    try:
+        if route_slots:
+            await route_slots.acquire()
+        try:
+            await _global_slots.acquire()
+        except BaseException:
+            if route_slots:
+                route_slots.release()
+            raise
+    finally:
+        metrics.waiting -= 1
+
+    started = time.monotonic()
+    metrics.observe_wait(started - queued_at)
+    metrics.requests += 1
+    metrics.in_flight += 1
+    try:
+        yield
+    except Exception:
+        metrics.failures += 1
+        raise
+    finally:
+        metrics.in_flight -= 1
+        metrics.observe_latency(time.monotonic() - started)
+        _global_slots.release()
+        if route_slots:
+            route_slots.release()
+
+
+async def generate_text(prompt: str, system_instruction: str = "", route: str = "default") -> str:
     config = {}
     if system_instruction:
         config["system_instruction"] = system_instruction
 
-    response = client.models.generate_content(
-        model=GEMINI_TEXT_MODEL,
-        contents=prompt,
-        config=config if config else None,
-    )
-    return response.text
+    async with _generation_slot(route):
+        return await _generate_with_retry(prompt, config)
+
+
+async def stream_text(prompt: str, system_instruction: str = "", route: str = "default") -> AsyncIterator[str]:
+    """
+    Yield text chunks as the model produces them.
+    Opening the stream is retried like generate_text; once text has been yielded a
+    failure is raised to the caller, since the partial output can't be taken back.
+    """
+    config = {}
+    if system_instruction:
+        config["system_instruction"] = system_instruction
+
+    async with _generation_slot(route):
+        for attempt in range(TEXT_GEN_MAX_RETRIES + 1):
+            yielded = False
+            try:
+                stream = await asyncio.wait_for(
+                    genai_clients.get().aio.models.generate_content_stream(
+                        model=GEMINI_TEXT_MODEL,
+                        contents=prompt,
+                        config=config if config else None,
+                    ),
+                    timeout=TEXT_GEN_TIMEOUT_S,
+                )
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=TEXT_GEN_TIMEOUT_S)
+                    except StopAsyncIteration:
+                        return
+                    if chunk.text:
+                        yielded = True
+                        yield chunk.text
+            except Exception as e:
+                if yielded or attempt >= TEXT_GEN_MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = random.uniform(0, min(TEXT_GEN_BACKOFF_MAX_S, TEXT_GEN_BACKOFF_BASE_S * 2 ** attempt))
+                metrics.retries += 1
+                logger.warning(f"Text stream attempt {attempt + 1} failed ({e!r}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+
+async def _generate_with_retry(prompt: str, config: dict) -> str:
+    for attempt in range(TEXT_GEN_MAX_RETRIES + 1):
+        try:
+            response = await asyncio.wait_for(
+                genai_clients.get().aio.models.generate_content(
+                    model=GEMINI_TEXT_MODEL,
+                    contents=prompt,
+                    config=config if config else None,
+                ),
+                timeout=TEXT_GEN_TIMEOUT_S,
+            )
+            return response.text
+        except Exception as e:
+            if attempt >= TEXT_GEN_MAX_RETRIES or not _is_retryable(e):
+                raise
+            # Full-jitter exponential backoff
+            delay = random.uniform(0, min(TEXT_GEN_BACKOFF_MAX_S, TEXT_GEN_BACKOFF_BASE_S * 2 ** attempt))
+            metrics.retries += 1
+            logger.warning(f"Text generation attempt {attempt + 1} failed ({e!r}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+def _strip_code_fence(result: str) -> str:
+    """Clean up potential markdown code block wrapping."""
+    result = result.strip()
+    if result.startswith("```"):
+        lines = result.split("\n")
+        result = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
+    return result
+
+
+# Bump whenever the resume parsing prompt changes so cached parses are invalidated
+RESUME_PROMPT_VERSION = "1"
 
 
 async def parse_resume_with_ai(raw_text: str) -> dict:
@@ -46,13 +214,9 @@ Resume text:
 
 Return ONLY the JSON object, no extra text."""
 
-    result = await generate_text(prompt, system)
+    result = await generate_text(prompt, system, route="resume")
 
-    # Clean up potential markdown code block wrapping
-    result = result.strip()
-    if result.startswith("```"):
-        lines = result.split("\n")
-        result = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
+    result = _strip_code_fence(result)
 
     try:
         return json.loads(result)
@@ -67,31 +231,29 @@ Return ONLY the JSON object, no extra text."""
         }
 
 
-async def generate_feedback(transcript: list, emotion_data: list, interview_context: str) -> dict:
-    system = """You are an interview coach analyzing a mock interview performance.
-Return ONLY valid JSON with no markdown formatting, no code blocks, just raw JSON."""
-
-    emotion_summary = ""
-    if emotion_data:
-        stress_scores = [e.get("stress_score", 0) for e in emotion_data]
-        confidence_scores = [e.get("confidence_score", 0) for e in emotion_data]
-        dominant_emotions = [e.get("dominant_emotion", "neutral") for e in emotion_data]
-
-        avg_stress = sum(stress_scores) / len(stress_scores) if stress_scores else 0
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
-
-        from collections import Counter
-        emotion_counts = Counter(dominant_emotions)
-        most_common = emotion_counts.most_common(3)
+def _emotion_summary(summary: dict | None) -> str:
+    """Describe a session's emotion aggregates (see emotion_aggregates.load_emotion_summary)."""
+    if not summary:
+        return ""
+    most_common = Counter(summary["emotion_counts"]).most_common(3)
+    increasing = summary["count"] > 1 and summary["last"]["stress_score"] > summary["first"]["stress_score"]
 
-        emotion_summary = f"""
+    return f"""
 Emotion Analysis:
-- Average stress level: {avg_stress:.2f}/1.0
-- Average confidence level: {avg_confidence:.2f}/1.0
+- Average stress level: {summary['avg_stress']:.2f}/1.0
+- Average confidence level: {summary['avg_confidence']:.2f}/1.0
 - Most frequent emotions: {', '.join(f'{e}({c})' for e, c in most_common)}
-- Stress trend: {'increasing' if len(stress_scores) > 1 and stress_scores[-1] > stress_scores[0] else 'stable/decreasing'}
+- Stress trend: {'increasing' if increasing else 'stable/decreasing'}
 """
 
+
+def _feedback_prompt(transcript: list, emotion_summary: dict | None, interview_context: str) -> tuple[str, str]:
+    """Build the (system_instruction, prompt) pair for a feedback report."""
+    system = """You are an interview coach analyzing a mock interview performance.
+Return ONLY valid JSON with no markdown formatting, no code blocks, just raw JSON."""
+
+    emotion_text = _emotion_summary(emotion_summary)
+
     transcript_text = ""
     for entry in transcript:
         role = entry.get("role", "unknown")
@@ -104,10 +266,10 @@ Interview Context: {interview_context}
 
 Transcript:
 ---
-{transcript_text[:8000]}
+{transcript_text}
 ---
 
-{emotion_summary}
+{emotion_text}
 
 Return a JSON object with:
 - "overall_score": number 0-100
@@ -119,13 +281,12 @@ Return a JSON object with:
 - "question_breakdown": array of objects with "question", "response_quality" (good/fair/poor), "notes"
 
 Return ONLY the JSON object."""
+    return system, prompt
 
-    result = await generate_text(prompt, system)
 
-    result = result.strip()
-    if result.startswith("```"):
-        lines = result.split("\n")
-        result = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
+def parse_feedback_output(result: str) -> dict:
+    """Parse the model's feedback JSON, falling back to an empty report."""
+    result = _strip_code_fence(result)
 
     try:
         return json.loads(result)
@@ -140,3 +301,118 @@ Return ONLY the JSON object."""
             "question_breakdown": [],
             "raw_output": result,
         }
+
+
+async def generate_feedback(transcript: list, emotion_summary: dict | None, interview_context: str) -> dict:
+    system, prompt = _feedback_prompt(transcript, emotion_summary, interview_context)
+    result = await generate_text(prompt, system, route="feedback")
+    return parse_feedback_output(result)
+
+
+async def stream_feedback(transcript: list, emotion_summary: dict | None, interview_context: str) -> AsyncIterator[str]:
+    """Stream the raw feedback JSON text as it is generated."""
+    system, prompt = _feedback_prompt(transcript, emotion_summary, interview_context)
+    async for chunk in stream_text(prompt, system, route="feedback"):
+        yield chunk
+
+
+# ── Map-reduce feedback for long interviews ─────────
+
+_FEEDBACK_SCHEMA_FIELDS = """- "overall_score": number 0-100
+- "summary": 2-3 sentence overall assessment (string)
+- "strengths": array of objects with "area" and "detail" fields
+- "weaknesses": array of objects with "area" and "detail" fields
+- "suggestions": array of specific improvement tips (strings)
+- "emotion_summary": object with "avg_stress", "avg_confidence", "dominant_mood", "body_language_notes\""""
+
+
+def _unrated_evaluation(segment: dict) -> dict:
+    return {
+        "segment": segment["index"],
+        "question": segment["question"][:200],
+        "response_quality": "unrated",
+        "score": None,
+        "notes": "This answer could not be evaluated.",
+        "strengths": [],
+        "weaknesses": [],
+    }
+
+
+async def evaluate_segments(segments: list[dict], interview_context: str) -> list[dict]:
+    """Map step: evaluate a batch of question/answer segments, one evaluation per segment in order."""
+    system = """You are an interview coach evaluating individual answers from a mock interview.
+Return ONLY valid JSON with no markdown formatting, no code blocks, just raw JSON."""
+
+    segments_text = "\n".join(format_segment(segment) for segment in segments)
+    prompt = f"""Evaluate each numbered question/answer segment from this mock interview.
+
+Interview Context: {interview_context}
+
+Segments:
+---
+{segments_text}
+---
+
+Return a JSON object with:
+- "evaluations": array with one object per segment, in order, each with:
+  - "segment": the segment number (integer)
+  - "question": the question asked, in one sentence (string)
+  - "response_quality": "good", "fair" or "poor"
+  - "score": number 0-100
+  - "notes": 1-2 sentences about the answer (string)
+  - "strengths": short phrases (array of strings)
+  - "weaknesses": short phrases (array of strings)
+
+Return ONLY the JSON object."""
+
+    result = await generate_text(prompt, system, route="feedback")
+
+    by_segment = {}
+    try:
+        for evaluation in json.loads(_strip_code_fence(result)).get("evaluations", []):
+            by_segment[int(evaluation["segment"])] = evaluation
+    except (json.JSONDecodeError, AttributeError, KeyError, TypeError, ValueError):
+        logger.warning(f"Could not parse segment evaluations: {result[:200]!r}")
+
+    evaluations = []
+    for segment in segments:
+        evaluation = by_segment.get(segment["index"])
+        if evaluation is None:
+            evaluations.append(_unrated_evaluation(segment))
+        else:
+            evaluations.append({**evaluation, "segment": segment["index"]})
+    return evaluations
+
+
+def _reduce_prompt(evaluations: list[dict], emotion_summary: dict | None, interview_context: str) -> tuple[str, str]:
+    system = """You are an interview coach writing the final report for a mock interview.
+Return ONLY valid JSON with no markdown formatting, no code blocks, just raw JSON."""
+
+    compact = [
+        {k: e.get(k) for k in ("segment", "question", "response_quality", "score", "notes", "strengths", "weaknesses")}
+        for e in evaluations
+    ]
+    prompt = f"""Below are evaluations of every question/answer segment of a mock interview.
+Combine them into one feedback report covering the whole interview.
+
+Interview Context: {interview_context}
+
+Segment evaluations:
+---
+{json.dumps(compact, ensure_ascii=False)}
+---
+
+{_emotion_summary(emotion_summary)}
+
+Return a JSON object with:
+{_FEEDBACK_SCHEMA_FIELDS}
+
+Do not include a question breakdown. Return ONLY the JSON object."""
+    return system, prompt
+
+
+async def stream_feedback_reduce(evaluations: list[dict], emotion_summary: dict | None, interview_context: str) -> AsyncIterator[str]:
+    """Reduce step: stream the report JSON built from segment evaluations."""
+    system, prompt = _reduce_prompt(evaluations, emotion_summary, interview_context)
+    async for chunk in stream_text(prompt, system, route="feedback"):
+        yield chunk
@@ -0,0 +1,105 @@
+"""
+Process-wide google-genai clients.
+Every Live session and every text call used to go through its own genai.Client,
+so ADC credential lookup, token refresh, TLS setup and HTTP connection pools were
+repeated per interview. The registry keeps one client per (project, location,
+base URL), created on startup (or first use) and closed on shutdown.
+"""
+import logging
+import ssl
+import threading
+import time
+from google import genai
+from google.genai import types
+from config import GOOGLE_CLOUD_PROJECT, GOOGLE_CLOUD_LOCATION, GEMINI_LIVE_BASE_URL, GEMINI_LIVE_CA_FILE
+
+logger = logging.getLogger(__name__)
+
+
+def _proxy_http_options(base_url: str) -> types.HttpOptions:
+    """HTTP options for a base_url client, trusting GEMINI_LIVE_CA_FILE on top of the system CAs."""
+    if not GEMINI_LIVE_CA_FILE:
+        return types.HttpOptions(base_url=base_url)
+    if "async_client_args" not in types.HttpOptions.model_fields:
+        # Older SDKs connect with the default context, which honours SSL_CERT_FILE instead
+        logger.warning("This google-genai version can't take GEMINI_LIVE_CA_FILE; set SSL_CERT_FILE to the certificate")
+        return types.HttpOptions(base_url=base_url)
+    ctx = ssl.create_default_context()
+    ctx.load_verify_locations(cafile=GEMINI_LIVE_CA_FILE)
+    return types.HttpOptions(base_url=base_url, async_client_args={"ssl": ctx})
+
+
+class GenaiClientRegistry:
+    """Shared genai.Client instances keyed by (project, location, base URL)."""
+
+    def __init__(self):
+        self._clients: dict[tuple[str, str, str], genai.Client] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.lookups = 0
+        self.create_seconds = 0.0
+
+    def get(
+        self,
+        project: str = GOOGLE_CLOUD_PROJECT,
+        location: str = GOOGLE_CLOUD_LOCATION,
+        base_url: str = "",
+    ) -> genai.Client:
+        """
+        The shared Vertex AI client for a project/location, created on first use.
+        With a base_url, requests go there instead, without credentials (proxy mode).
+        """
+        key = (project, location, base_url)
+        self.lookups += 1
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                started = time.perf_counter()
+                if base_url:
+                    client = genai.Client(vertexai=True, http_options=_proxy_http_options(base_url))
+                else:
+                    # Vertex AI with ADC — explicit args required for google-genai v1.5
+                    client = genai.Client(vertexai=True, project=project, location=location)
+                self.create_seconds += time.perf_counter() - started
+                self.created += 1
+                self._clients[key] = client
+                target = base_url or f"{project or '<default project>'}/{location}"
+                logger.info(f"Created shared genai client for {target}")
+            return client
+
+    async def start(self):
+        """Create the clients up front so the first interview doesn't pay for them."""
+        self.get()
+        if GEMINI_LIVE_BASE_URL:
+            self.get(base_url=GEMINI_LIVE_BASE_URL)
+
+    async def close(self):
+        """Close every client's transports. Later get() calls create fresh clients."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            # Older SDK versions have no explicit close; their transports go with the client
+            try:
+                aclose = getattr(client.aio, "aclose", None)
+                if aclose:
+                    await aclose()
+                close = getattr(client, "close", None)
+                if close:
+                    close()
+            except Exception as e:
+                logger.warning(f"Error closing genai client: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "created": self.created,
+            "lookups": self.lookups,
+            "create_seconds_total": round(self.create_seconds, 4),
+        }
+
+
+genai_clients = GenaiClientRegistry()
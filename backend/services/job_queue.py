@@ -0,0 +1,271 @@
+"""
+In-process background job queue for feedback generation.
+Jobs are persisted in the feedback_jobs table so queued work survives a restart.
+Requests for the same session and transcript version are coalesced into one job.
+Running jobs publish report sections as they stream in, so clients can subscribe.
+"""
+import asyncio
+import logging
+import time
+from typing import AsyncIterator
+from datetime import datetime, timezone
+from config import FEEDBACK_JOB_WORKERS, FEEDBACK_WAIT_TIMEOUT_S, FEEDBACK_WAIT_POLL_S
+from database import SessionLocal
+from models import FeedbackJob, InterviewSession
+from services.feedback_service import FeedbackError, generate_session_feedback, transcript_version
+from services.transcript_store import load_transcript
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def job_to_dict(job: FeedbackJob, with_result: bool = False) -> dict:
+    data = {
+        "job_id": job.id,
+        "session_id": job.session_id,
+        "transcript_version": job.transcript_version,
+        "status": job.status,
+        "error": job.error or None,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+    if with_result:
+        data["result"] = job.result
+    return data
+
+
+class FeedbackJobQueue:
+    """Runs feedback jobs on a fixed number of asyncio workers."""
+
+    def __init__(self, workers: int = FEEDBACK_JOB_WORKERS):
+        self.workers = max(1, workers)
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._done: dict[int, asyncio.Event] = {}
+        self._waiters: dict[int, int] = {}
+        self._events: dict[int, list[tuple]] = {}
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._submit_lock = asyncio.Lock()
+
+    async def start(self):
+        """Re-queue unfinished jobs from a previous run and start the workers."""
+        self._queue = asyncio.Queue()
+        for job_id in await asyncio.to_thread(self._recover):
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Feedback job queue started with {self.workers} worker(s)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, session_id: int) -> dict:
+        """
+        Enqueue feedback generation for a session, or return the existing job for
+        the same transcript version. Raises FeedbackError if there is nothing to evaluate.
+        """
+        async with self._submit_lock:
+            job, created = await asyncio.to_thread(self._find_or_create, session_id)
+        if created:
+            self._queue.put_nowait(job["job_id"])
+        return job
+
+    def get(self, job_id: int, with_result: bool = False) -> dict | None:
+        db = SessionLocal()
+        try:
+            job = db.query(FeedbackJob).filter(FeedbackJob.id == job_id).first()
+            if not job:
+                return None
+            return job_to_dict(job, with_result)
+        finally:
+            db.close()
+
+    async def wait(self, job_id: int, timeout: float = FEEDBACK_WAIT_TIMEOUT_S) -> dict | None:
+        """
+        Wait until a job finishes and return it with its result. The status is re-read
+        every FEEDBACK_WAIT_POLL_S, so a job that isn't queued in this process (or is
+        finished by another one) is still noticed. After `timeout` the job is returned
+        as it stands, still queued or running.
+        """
+        deadline = time.monotonic() + timeout
+        # Registered before the status read, so a job finishing in between isn't missed
+        event = self._done.setdefault(job_id, asyncio.Event())
+        self._waiters[job_id] = self._waiters.get(job_id, 0) + 1
+        try:
+            while True:
+                job = await asyncio.to_thread(self.get, job_id, True)
+                remaining = deadline - time.monotonic()
+                if job is None or job["status"] not in ACTIVE_STATUSES or remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(event.wait(), min(remaining, FEEDBACK_WAIT_POLL_S))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._waiters[job_id] -= 1
+            if not self._waiters[job_id]:
+                del self._waiters[job_id]
+                if self._done.get(job_id) is event:
+                    del self._done[job_id]
+
+    async def subscribe(self, job_id: int, timeout: float = FEEDBACK_WAIT_TIMEOUT_S) -> AsyncIterator[tuple]:
+        """
+        Yield a job's streamed sections, replaying those already produced, then
+        ("done", feedback) or ("failed", error). Finished jobs yield only the last event.
+        Like wait(), the stored status is re-read every FEEDBACK_WAIT_POLL_S, so a job this
+        process never publishes (run by another process, or not queued here) still ends
+        the stream. After `timeout` it ends with ("timeout", job) instead.
+        """
+        deadline = time.monotonic() + timeout
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in self._events.get(job_id, []):
+            queue.put_nowait(event)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            while True:
+                job = await asyncio.to_thread(self.get, job_id, True)
+                if job is None:
+                    return
+                if job["status"] == "completed":
+                    yield ("done", job["result"])
+                    return
+                if job["status"] == "failed":
+                    yield ("failed", job["error"] or "Feedback generation failed")
+                    return
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        yield ("timeout", job)
+                        return
+                    try:
+                        event = await asyncio.wait_for(queue.get(), min(remaining, FEEDBACK_WAIT_POLL_S))
+                    except asyncio.TimeoutError:
+                        break  # nothing published for a while: re-read the stored status
+                    yield event
+                    if event[0] in ("done", "failed"):
+                        return
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "streaming": len(self._events),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+        }
+
+    def _publish(self, job_id: int, event: tuple):
+        self._events.setdefault(job_id, []).append(event)
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Feedback job {job_id} crashed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: int):
+        session_id = await asyncio.to_thread(self._mark_running, job_id)
+        if session_id is None:
+            return
+        self._events[job_id] = []
+        try:
+            result = await generate_session_feedback(session_id, on_event=lambda e: self._publish(job_id, e))
+            await asyncio.to_thread(self._finish, job_id, "completed", result, "")
+            self._publish(job_id, ("done", result))
+            logger.info(f"Feedback job {job_id} for session {session_id} completed")
+        except Exception as e:
+            logger.error(f"Feedback job {job_id} for session {session_id} failed: {e}")
+            await asyncio.to_thread(self._finish, job_id, "failed", None, str(e))
+            self._publish(job_id, ("failed", str(e)))
+        finally:
+            self._events.pop(job_id, None)
+            event = self._done.pop(job_id, None)
+            if event:
+                event.set()
+
+    # ── DB helpers (run in a thread) ────────────────
+    def _recover(self) -> list[int]:
+        db = SessionLocal()
+        try:
+            db.query(FeedbackJob).filter(FeedbackJob.status == "running").update({"status": "queued"})
+            db.commit()
+            return [
+                job_id for (job_id,) in db.query(FeedbackJob.id)
+                .filter(FeedbackJob.status == "queued")
+                .order_by(FeedbackJob.id)
+            ]
+        finally:
+            db.close()
+
+    def _find_or_create(self, session_id: int) -> tuple[dict, bool]:
+        db = SessionLocal()
+        try:
+            session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+            if not session:
+                raise FeedbackError("Session not found", status_code=404)
+            transcript = load_transcript(session, db)
+            if not transcript:
+                raise FeedbackError("No transcript available")
+
+            version = transcript_version(transcript)
+            existing = db.query(FeedbackJob).filter(
+                FeedbackJob.session_id == session_id,
+                FeedbackJob.transcript_version == version,
+                FeedbackJob.status != "failed",
+            ).order_by(FeedbackJob.id.desc()).first()
+            if existing:
+                return job_to_dict(existing), False
+
+            job = FeedbackJob(session_id=session_id, transcript_version=version, status="queued")
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            return job_to_dict(job), True
+        finally:
+            db.close()
+
+    def _mark_running(self, job_id: int) -> int | None:
+        db = SessionLocal()
+        try:
+            job = db.query(FeedbackJob).filter(FeedbackJob.id == job_id).first()
+            if not job or job.status not in ACTIVE_STATUSES:
+                return None
+            job.status = "running"
+            job.attempts = (job.attempts or 0) + 1
+            job.started_at = datetime.now(timezone.utc)
+            db.commit()
+            return job.session_id
+        finally:
+            db.close()
+
+    def _finish(self, job_id: int, status: str, result: dict | None, error: str):
+        db = SessionLocal()
+        try:
+            job = db.query(FeedbackJob).filter(FeedbackJob.id == job_id).first()
+            if job:
+                job.status = status
+                job.result = result
+                job.error = error
+                job.finished_at = datetime.now(timezone.utc)
+                db.commit()
+        finally:
+            db.close()
+
+
+feedback_jobs = FeedbackJobQueue()
@@ -0,0 +1,131 @@
+"""
+Incremental parser for a JSON object that arrives in chunks (e.g. streamed LLM output).
+Emits each top-level member as soon as its value closes, and each element of a
+top-level array as soon as that element closes, without re-scanning earlier text.
+Anything before the opening brace (such as a markdown code fence) is ignored.
+"""
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalJSONObjectParser:
+    """
+    Feed text chunks with feed(); each call returns the events completed by that chunk:
+      ("item", key, index, value)  — an element of the top-level array `key` closed
+      ("field", key, value)        — the top-level member `key` closed
+    `done` becomes True once the root object closes.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        # Position within the root object: key → colon → value → in_value → comma
+        self._expect = "key"
+        self._key: str | None = None
+        self._key_start = 0
+        self._value_start = 0
+        self._item_start: int | None = None
+        self._item_index = 0
+        self.done = False
+
+    def feed(self, chunk: str) -> list[tuple]:
+        events: list[tuple] = []
+        self._text += chunk
+        text = self._text
+        i = self._pos
+        while i < len(text) and not self.done:
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._expect == "key":
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._expect = "colon"
+                i += 1
+                continue
+
+            if not self._stack:
+                if ch == "{":
+                    self._stack.append(ch)
+                i += 1
+                continue
+
+            depth = len(self._stack)
+            in_top_array = depth == 2 and self._stack[1] == "["
+
+            if ch == '"':
+                self._in_string = True
+                if depth == 1 and self._expect == "key":
+                    self._key_start = i
+                else:
+                    self._begin_value(i, depth, in_top_array)
+            elif ch == ":" and depth == 1 and self._expect == "colon":
+                self._expect = "value"
+            elif ch in "{[":
+                self._begin_value(i, depth, in_top_array)
+                if depth == 1:
+                    self._item_start = None
+                    self._item_index = 0
+                self._stack.append(ch)
+            elif ch in "}]":
+                if in_top_array and ch == "]":
+                    self._end_item(text, i, events)
+                if depth == 1:
+                    # Root object closed; a trailing scalar value ends here
+                    if self._expect == "in_value":
+                        self._end_field(text[self._value_start:i], events)
+                    self.done = True
+                self._stack.pop()
+                if len(self._stack) == 1 and self._expect == "in_value":
+                    self._end_field(text[self._value_start:i + 1], events)
+            elif ch == ",":
+                if depth == 1:
+                    if self._expect == "in_value":
+                        self._end_field(text[self._value_start:i], events)
+                    self._expect = "key"
+                elif in_top_array:
+                    self._end_item(text, i, events)
+            elif not ch.isspace():
+                # Start of a number / true / false / null
+                self._begin_value(i, depth, in_top_array)
+            i += 1
+        self._pos = i
+        return events
+
+    def _begin_value(self, i: int, depth: int, in_top_array: bool):
+        if depth == 1 and self._expect == "value":
+            self._value_start = i
+            self._expect = "in_value"
+        elif in_top_array and self._item_start is None:
+            self._item_start = i
+
+    def _end_item(self, text: str, i: int, events: list):
+        if self._item_start is None:
+            return
+        raw = text[self._item_start:i]
+        self._item_start = None
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed array item in streamed JSON: {raw[:80]!r}")
+            return
+        events.append(("item", self._key, self._item_index, value))
+        self._item_index += 1
+
+    def _end_field(self, raw: str, events: list):
+        self._expect = "comma"
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed value for {self._key!r} in streamed JSON")
+            return
+        events.append(("field", self._key, value))
@@ -0,0 +1,175 @@
+"""
+Speculative Gemini Live connections.
+When an interview is created (or the setup page says it is about to start) the
+session's prompt is built and a GeminiLiveSession is connected in the background.
+The WebSocket handler then claims it instead of paying for the handshake while
+the candidate waits. Unclaimed sessions are closed after LIVE_PREWARM_TTL_S, and
+at most LIVE_PREWARM_MAX_SESSIONS are held open at once.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import LIVE_PREWARM_ENABLED, LIVE_PREWARM_TTL_S, LIVE_PREWARM_MAX_SESSIONS
+from models import InterviewSession, InterviewTopic
+from services.gemini_live import GeminiLiveSession
+from services.prompt_builder import build_session_prompt
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _WarmSession:
+    prompt: str
+    task: asyncio.Task  # resolves to the connected GeminiLiveSession
+    created_at: float
+
+
+class LivePrewarmManager:
+    """Holds pre-connected Live sessions by interview session id until claimed or expired."""
+
+    def __init__(
+        self,
+        ttl_s: float = LIVE_PREWARM_TTL_S,
+        max_sessions: int = LIVE_PREWARM_MAX_SESSIONS,
+        enabled: bool = LIVE_PREWARM_ENABLED,
+    ):
+        self.ttl = ttl_s
+        self.max_sessions = max_sessions
+        self.enabled = enabled
+        self._warm: dict[int, _WarmSession] = {}
+        self._closing: set[asyncio.Task] = set()
+        self._reaper: asyncio.Task | None = None
+
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.expired = 0
+        self.evicted = 0
+        self.failures = 0
+
+    def schedule(self, session_id: int, prompt: str):
+        """Start connecting a Live session for `prompt` unless one is already warm for it."""
+        if not self.enabled:
+            return
+        existing = self._warm.get(session_id)
+        if existing and existing.prompt == prompt:
+            return
+        if existing:
+            # The interview changed (e.g. resume added) since it was warmed
+            self.stale += 1
+            self._discard(self._warm.pop(session_id))
+        while len(self._warm) >= self.max_sessions:
+            oldest = next(iter(self._warm))
+            self.evicted += 1
+            self._discard(self._warm.pop(oldest))
+
+        self._warm[session_id] = _WarmSession(prompt, asyncio.create_task(self._connect(prompt)), time.monotonic())
+        self.started += 1
+        logger.info(f"Session {session_id}: pre-warming Gemini Live connection")
+
+    async def claim(self, session_id: int, prompt: str) -> GeminiLiveSession | None:
+        """
+        Take the warm session for an interview, waiting for it if it is still connecting.
+        Returns None (caller connects normally) if there is none, it failed, or it was
+        opened with a different prompt.
+        """
+        entry = self._warm.pop(session_id, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.prompt != prompt:
+            self.stale += 1
+            self._discard(entry)
+            return None
+        try:
+            live = await entry.task
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Session {session_id}: pre-warmed connection failed, connecting again: {e}")
+            return None
+        if not live.is_active:
+            # Dropped by the server while waiting; still release its client-side resources
+            self.failures += 1
+            self._discard(entry)
+            return None
+        self.hits += 1
+        logger.info(f"Session {session_id}: using pre-warmed Gemini Live connection")
+        return live
+
+    async def start(self):
+        self._reaper = asyncio.create_task(self._reap())
+        logger.info(f"Live pre-warm manager started (enabled={self.enabled}, ttl={self.ttl}s)")
+
+    async def stop(self):
+        if self._reaper:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        for session_id in list(self._warm):
+            self._discard(self._warm.pop(session_id))
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "warm": len(self._warm),
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "failures": self.failures,
+        }
+
+    @staticmethod
+    async def _connect(prompt: str) -> GeminiLiveSession:
+        live = GeminiLiveSession(prompt)
+        await live.connect()
+        return live
+
+    def _discard(self, entry: _WarmSession):
+        """Close (or stop connecting) an unclaimed session in the background."""
+        task = asyncio.create_task(self._close(entry))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close(entry: _WarmSession):
+        if not entry.task.done():
+            entry.task.cancel()
+        try:
+            live = await entry.task
+        except BaseException:
+            return
+        await live.disconnect()
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        for session_id, entry in list(self._warm.items()):
+            if entry.created_at < cutoff:
+                self.expired += 1
+                logger.info(f"Session {session_id}: pre-warmed connection expired unclaimed")
+                self._discard(self._warm.pop(session_id))
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(max(1.0, min(self.ttl / 4, 10.0)))
+            self._expire()
+
+
+live_prewarm = LivePrewarmManager()
+
+
+async def prewarm_session(session: InterviewSession, db: AsyncSession):
+    """Build an interview's prompt and start pre-warming its Live connection."""
+    if not live_prewarm.enabled:
+        return
+    topic = await db.get(InterviewTopic, session.topic_id) if session.topic_id else None
+    live_prewarm.schedule(session.id, build_session_prompt(session, topic))
@@ -135,3 +135,57 @@ def build_behavioral_prompt() -> str:
 - Acknowledge answers before moving on
 - **IMPORTANT: After asking a question, STOP and WAIT in silence for the candidate to respond. Do NOT keep talking. Do NOT rephrase or repeat unless explicitly told the candidate is silent.**
 """
+
+
+def build_session_prompt(session, topic=None) -> str:
+    """The system prompt for an InterviewSession (topic is its InterviewTopic, if any)."""
+    if session.session_type == "topic" and topic:
+        if topic.name == "Behavioral Interview":
+            return build_behavioral_prompt()
+        return build_topic_prompt(topic.name, topic.subtopics, session.difficulty)
+
+    if session.session_type == "custom":
+        return build_custom_prompt(
+            session.resume_structured or {},
+            session.job_description or "",
+            session.job_title or "",
+        )
+
+    # Fallback generic prompt
+    return build_topic_prompt("General Technical", ["Problem Solving", "Communication"], session.difficulty)
+
+
+def compact_transcript(transcript: list[dict], max_chars: int) -> str:
+    """The most recent turns that fit in max_chars, oldest first, noting how many were left out."""
+    lines = []
+    used = 0
+    for turn in reversed(transcript):
+        speaker = "Interviewer" if turn.get("role") == "interviewer" else "Candidate"
+        line = f"{speaker}: {turn.get('content', '').strip()}"
+        if used + len(line) > max_chars:
+            if not lines:
+                lines.append(line[:max_chars].rstrip() + "…")
+            break
+        lines.append(line)
+        used += len(line) + 1
+
+    text = "\n".join(reversed(lines))
+    omitted = len(transcript) - len(lines)
+    if omitted:
+        text = f"[{omitted} earlier turns omitted]\n{text}"
+    return text
+
+
+def build_resume_prompt(system_prompt: str, transcript: list[dict], max_chars: int = 6000) -> str:
+    """System prompt for a new Live session that picks up an interview already in progress."""
+    if not transcript:
+        return system_prompt
+    return f"""{system_prompt.rstrip()}
+
+## Interview In Progress
+The interview has already started and the connection was briefly interrupted. The conversation so far:
+
+{compact_transcript(transcript, max_chars)}
+
+Continue from exactly where it left off. Do NOT introduce yourself again and do not repeat questions the candidate has already answered.
+"""
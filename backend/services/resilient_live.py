@@ -0,0 +1,207 @@
+"""
+Gemini Live connection that survives upstream failures mid-interview.
+ResilientLiveSession has the same interface as GeminiLiveSession. When the upstream
+drops, a send fails, or the server announces go-away (connection lifetime limit), it
+opens a new connection and carries on:
+- with the last session resumption handle, so the server keeps the conversation, or
+- if there is none (or it is rejected), with the system prompt plus a compacted
+  transcript of the interview so far.
+Sends wait while reconnecting, so client audio accumulates in the handler's upstream
+ring buffer and is flushed to the new connection.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable
+from config import (
+    LIVE_RECONNECT_MAX_ATTEMPTS, LIVE_RECONNECT_BACKOFF_BASE_S, LIVE_RECONNECT_BACKOFF_MAX_S,
+    LIVE_RESUME_CONTEXT_CHARS,
+)
+from services.gemini_live import GeminiLiveSession
+from services.prompt_builder import build_resume_prompt
+
+logger = logging.getLogger(__name__)
+
+RESUME_CUE = "[The connection was briefly interrupted. Continue the interview from where it left off.]"
+
+
+class ResilientLiveSession:
+    """Reconnects its GeminiLiveSession transparently when the upstream goes away."""
+
+    def __init__(
+        self,
+        system_prompt: str,
+        transcript: Callable[[], list[dict]],
+        live: GeminiLiveSession | None = None,
+        on_reconnecting: Callable[[], Awaitable[None]] | None = None,
+        on_reconnected: Callable[[bool], Awaitable[None]] | None = None,
+        max_attempts: int = LIVE_RECONNECT_MAX_ATTEMPTS,
+    ):
+        """
+        `transcript` returns the interview's turns so far, for sessions that can't be resumed.
+        `live` is an already connected session to take over (e.g. a pre-warmed one).
+        on_reconnected receives True if the server-side session was resumed.
+        """
+        self.system_prompt = system_prompt
+        self._transcript = transcript
+        self._live = live
+        self._on_reconnecting = on_reconnecting
+        self._on_reconnected = on_reconnected
+        self.max_attempts = max_attempts
+        self._ready = asyncio.Event()
+        if live is not None and live.is_active:
+            self._ready.set()
+        self._reconnect_task: asyncio.Task | None = None
+        self._closing: set[asyncio.Task] = set()
+        self._closed = False
+        self._failed = False
+
+        self.reconnects = 0
+        self.resumed = 0
+        self.failed_attempts = 0
+        self.last_gap_ms = 0.0
+        self.max_gap_ms = 0.0
+
+    @property
+    def is_active(self) -> bool:
+        """True while connected or reconnecting; False once closed or out of attempts."""
+        return not self._closed and not self._failed
+
+    async def connect(self):
+        self._live = GeminiLiveSession(self.system_prompt)
+        await self._live.connect()
+        self._ready.set()
+        return True
+
+    async def send_audio(self, audio_data: bytes):
+        await self._send(lambda live: live.send_audio(audio_data))
+
+    async def send_text(self, text: str):
+        await self._send(lambda live: live.send_text(text))
+
+    async def _send(self, op: Callable[[GeminiLiveSession], Awaitable[None]]):
+        """Send on the current connection, waiting out (or starting) a reconnect and retrying."""
+        while self.is_active:
+            if not self._ready.is_set():
+                await self._ready.wait()
+                continue
+            live = self._live
+            await op(live)
+            if live.is_active:
+                return
+            await self._recover(live, "send failed")
+
+    async def receive_responses(self, on_audio=None, on_text=None, on_turn_complete=None, on_input_transcription=None):
+        """Relay responses like GeminiLiveSession.receive_responses, across reconnects."""
+        while self.is_active:
+            await self._ready.wait()
+            if not self.is_active:
+                return
+            live = self._live
+            await live.receive_responses(
+                on_audio=on_audio,
+                on_text=on_text,
+                on_turn_complete=on_turn_complete,
+                on_input_transcription=on_input_transcription,
+            )
+            if not self.is_active:
+                return
+            await self._recover(live, "go-away" if live.go_away else "receive ended")
+
+    async def _recover(self, dead: GeminiLiveSession, reason: str):
+        """Replace a dead connection once, however many senders/receivers noticed it."""
+        if self._live is dead and (self._reconnect_task is None or self._reconnect_task.done()):
+            self._ready.clear()
+            self._reconnect_task = asyncio.create_task(self._reconnect(dead, reason))
+        if self._reconnect_task and not self._reconnect_task.done():
+            # Shielded: a cancelled sender must not abort the reconnect for everyone else
+            await asyncio.shield(self._reconnect_task)
+
+    async def _reconnect(self, dead: GeminiLiveSession, reason: str):
+        started = time.monotonic()
+        logger.warning(f"Gemini Live connection lost ({reason}), reconnecting")
+        self._close_in_background(dead)
+        await self._notify(self._on_reconnecting)
+
+        handle = dead.resumption_handle
+        for attempt in range(self.max_attempts):
+            if self._closed:
+                return
+            if handle:
+                live = GeminiLiveSession(self.system_prompt, resumption_handle=handle)
+            else:
+                prompt = build_resume_prompt(self.system_prompt, self._transcript(), LIVE_RESUME_CONTEXT_CHARS)
+                live = GeminiLiveSession(prompt)
+            try:
+                await live.connect()
+            except Exception as e:
+                self.failed_attempts += 1
+                logger.warning(f"Gemini Live reconnect attempt {attempt + 1} failed: {e}")
+                # A rejected or expired handle won't work on retry either; fall back to the transcript
+                handle = None
+                delay = random.uniform(0, min(LIVE_RECONNECT_BACKOFF_MAX_S, LIVE_RECONNECT_BACKOFF_BASE_S * 2 ** attempt))
+                await asyncio.sleep(delay)
+                continue
+
+            if self._closed:
+                await live.disconnect()
+                return
+            resumed = handle is not None
+            if not resumed:
+                # A fresh session has the context but nothing prompting it to speak
+                await live.send_text(RESUME_CUE)
+            self._live = live
+            self.reconnects += 1
+            self.resumed += resumed
+            self.last_gap_ms = (time.monotonic() - started) * 1000
+            self.max_gap_ms = max(self.max_gap_ms, self.last_gap_ms)
+            logger.info(
+                f"Gemini Live reconnected in {self.last_gap_ms:.0f}ms "
+                f"({'resumed' if resumed else 'fresh session with transcript context'})"
+            )
+            self._ready.set()
+            await self._notify(self._on_reconnected, resumed)
+            return
+
+        logger.error(f"Gemini Live reconnect gave up after {self.max_attempts} attempts")
+        self._failed = True
+        self._ready.set()  # wake waiting senders so they see is_active is False
+
+    @staticmethod
+    async def _notify(callback: Callable[..., Awaitable[None]] | None, *args):
+        if callback is None:
+            return
+        try:
+            await callback(*args)
+        except Exception as e:
+            logger.error(f"Gemini Live reconnect callback failed: {e}")
+
+    def _close_in_background(self, live: GeminiLiveSession):
+        task = asyncio.create_task(live.disconnect())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def disconnect(self):
+        """Close the current connection and stop any reconnect in progress."""
+        self._closed = True
+        self._ready.set()
+        if self._reconnect_task and not self._reconnect_task.done():
+            self._reconnect_task.cancel()
+            try:
+                await self._reconnect_task
+            except BaseException:
+                pass
+        if self._live:
+            await self._live.disconnect()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "reconnects": self.reconnects,
+            "resumed": self.resumed,
+            "failed_attempts": self.failed_attempts,
+            "last_gap_ms": round(self.last_gap_ms, 1),
+            "max_gap_ms": round(self.max_gap_ms, 1),
+        }
@@ -0,0 +1,176 @@
+"""
+Content-addressed cache for AI resume parsing.
+Keys are a hash of the normalized resume text plus the prompt version. Lookups go
+through an in-memory LRU, then the resume_parse_cache table, and only then the LLM.
+Identical concurrent requests share a single in-flight parse.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from config import (
+    RESUME_CACHE_MEMORY_ENTRIES, RESUME_CACHE_MAX_ROWS, RESUME_CACHE_MAX_AGE_DAYS, RESUME_CACHE_TOUCH_INTERVAL_S,
+)
+from database import SessionLocal
+from models import ResumeParseCache
+from services.gemini_text import parse_resume_with_ai, RESUME_PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_resume_text(raw_text: str) -> str:
+    """Collapse formatting-only differences (unicode forms, whitespace runs)."""
+    text = unicodedata.normalize("NFKC", raw_text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(raw_text: str, prompt_version: str = RESUME_PROMPT_VERSION) -> str:
+    normalized = normalize_resume_text(raw_text)
+    return hashlib.sha256(f"{prompt_version}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+class ResumeParseCacheService:
+    """LRU + database cache with single-flight parsing."""
+
+    def __init__(
+        self,
+        memory_entries: int = RESUME_CACHE_MEMORY_ENTRIES,
+        max_rows: int = RESUME_CACHE_MAX_ROWS,
+        max_age_days: int = RESUME_CACHE_MAX_AGE_DAYS,
+        touch_interval_s: float = RESUME_CACHE_TOUCH_INTERVAL_S,
+    ):
+        self.memory_entries = memory_entries
+        self.max_rows = max_rows
+        self.max_age = timedelta(days=max_age_days)
+        self.touch_interval = touch_interval_s
+        self._lru: OrderedDict[str, dict] = OrderedDict()
+        self._touched: dict[str, float] = {}  # key -> when its row's last_used_at was last refreshed
+        self._touching: set[asyncio.Task] = set()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    async def get_or_parse(self, raw_text: str) -> dict:
+        """Return the structured resume, parsing with the LLM only on a cache miss."""
+        key = cache_key(raw_text)
+
+        cached = self._lru.get(key)
+        if cached is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            # Keep the row's last_used_at current, or age-based eviction would drop the hottest entries
+            if time.monotonic() - self._touched.get(key, 0.0) >= self.touch_interval:
+                self._touched[key] = time.monotonic()
+                task = asyncio.create_task(asyncio.to_thread(self._db_touch, key))
+                self._touching.add(task)
+                task.add_done_callback(self._touching.discard)
+            return copy.deepcopy(cached)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, raw_text))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one caller disconnecting doesn't cancel the parse for the others
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def _load(self, key: str, raw_text: str) -> dict:
+        result = await asyncio.to_thread(self._db_get, key)
+        if result is not None:
+            self.db_hits += 1
+        else:
+            self.misses += 1
+            result = await parse_resume_with_ai(raw_text)
+            # Don't persist parse failures; they should be retried next time
+            if "raw_parse" not in result:
+                await asyncio.to_thread(self._db_put, key, result)
+        self._remember(key, result)
+        return result
+
+    def _remember(self, key: str, result: dict):
+        self._lru[key] = result
+        self._lru.move_to_end(key)
+        # The DB read or write that produced the result just set last_used_at
+        self._touched[key] = time.monotonic()
+        while len(self._lru) > self.memory_entries:
+            evicted, _ = self._lru.popitem(last=False)
+            self._touched.pop(evicted, None)
+
+    def _db_get(self, key: str) -> dict | None:
+        db = SessionLocal()
+        try:
+            row = db.query(ResumeParseCache).filter(ResumeParseCache.key == key).first()
+            if not row:
+                return None
+            row.last_used_at = datetime.now(timezone.utc)
+            db.commit()
+            return row.result
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Resume cache read failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _db_touch(self, key: str):
+        db = SessionLocal()
+        try:
+            db.query(ResumeParseCache).filter(ResumeParseCache.key == key).update(
+                {"last_used_at": datetime.now(timezone.utc)}
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Resume cache touch failed: {e}")
+        finally:
+            db.close()
+
+    def _db_put(self, key: str, result: dict):
+        db = SessionLocal()
+        try:
+            db.merge(ResumeParseCache(
+                key=key,
+                prompt_version=RESUME_PROMPT_VERSION,
+                result=result,
+                size_bytes=len(json.dumps(result)),
+            ))
+            db.commit()
+            self._evict(db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Resume cache write failed: {e}")
+        finally:
+            db.close()
+
+    def _evict(self, db):
+        """Drop entries past the max age, then the least recently used beyond max_rows."""
+        cutoff = datetime.now(timezone.utc) - self.max_age
+        db.query(ResumeParseCache).filter(ResumeParseCache.last_used_at < cutoff).delete()
+        excess = db.query(ResumeParseCache).count() - self.max_rows
+        if excess > 0:
+            stale_keys = [
+                k for (k,) in db.query(ResumeParseCache.key)
+                .order_by(ResumeParseCache.last_used_at)
+                .limit(excess)
+            ]
+            db.query(ResumeParseCache).filter(ResumeParseCache.key.in_(stale_keys)).delete(synchronize_session=False)
+        db.commit()
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._lru),
+            "in_flight": len(self._in_flight),
+            "memory_hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+        }
+
+
+resume_cache = ResumeParseCacheService()
@@ -0,0 +1,210 @@
+"""
+Bounded-memory ingestion of resume PDF uploads.
+Request bodies are size-checked from Content-Length before the multipart form is
+parsed (check_upload_length); the spooled upload is then copied in chunks, hashed,
+and stored once per content hash under UPLOAD_DIR. Text extraction runs in a worker
+pool, split into page ranges for long documents, and is cached next to the PDF.
+Stored files are evicted at startup and on a timer, by the same age and count limits
+as the resume parse cache (see evict_uploads), and PDFs that fail to parse are not kept.
+"""
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+from config import (
+    UPLOAD_DIR, RESUME_MAX_UPLOAD_BYTES, RESUME_MULTIPART_OVERHEAD_BYTES, RESUME_UPLOAD_CHUNK_BYTES,
+    RESUME_EXTRACT_WORKERS, RESUME_PAGES_PER_TASK,
+    RESUME_CACHE_MAX_AGE_DAYS, RESUME_CACHE_MAX_ROWS, RESUME_UPLOAD_EVICT_INTERVAL_S,
+)
+from services.resume_parser import count_pages, extract_page_range
+
+logger = logging.getLogger(__name__)
+
+_pool: ProcessPoolExecutor | None = None
+_evictor: asyncio.Task | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=RESUME_EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def start():
+    """Start pruning stored uploads (immediately, then every RESUME_UPLOAD_EVICT_INTERVAL_S)."""
+    global _evictor
+    _evictor = asyncio.create_task(_evict_periodically())
+
+
+async def shutdown():
+    """Stop upload eviction and the extraction worker pool."""
+    global _pool, _evictor
+    if _evictor is not None:
+        _evictor.cancel()
+        try:
+            await _evictor
+        except asyncio.CancelledError:
+            pass
+        _evictor = None
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def check_upload_length(content_length: str | None, max_bytes: int = RESUME_MAX_UPLOAD_BYTES):
+    """
+    Reject an upload request from its Content-Length header, before the body is received.
+    Raises LookupError if the header is missing (e.g. a chunked body) and ValueError if
+    the body can't fit within max_bytes of file plus multipart overhead.
+    """
+    if content_length is None:
+        raise LookupError("Content-Length is required")
+    try:
+        length = int(content_length)
+    except ValueError:
+        raise ValueError("Invalid Content-Length")
+    if length > max_bytes + RESUME_MULTIPART_OVERHEAD_BYTES:
+        raise ValueError(f"File too large (max {max_bytes // (1024 * 1024)}MB)")
+
+
+async def store_upload(file: UploadFile, max_bytes: int = RESUME_MAX_UPLOAD_BYTES) -> tuple[str, str]:
+    """
+    Copy a parsed (already spooled) upload to UPLOAD_DIR in chunks, hashing as we go.
+    Returns (sha256, path). Raises ValueError if the file exceeds max_bytes.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise ValueError(f"File too large (max {max_bytes // (1024 * 1024)}MB)")
+
+    hasher = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    os.close(fd)
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            while chunk := await file.read(RESUME_UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"File too large (max {max_bytes // (1024 * 1024)}MB)")
+                hasher.update(chunk)
+                await out.write(chunk)
+
+        digest = hasher.hexdigest()
+        path = os.path.join(UPLOAD_DIR, f"{digest}.pdf")
+        if await aiofiles.os.path.exists(path):
+            # Seen this exact PDF before — keep the stored copy, marked as recently used
+            await aiofiles.os.remove(tmp_path)
+            await asyncio.to_thread(_touch, path)
+        else:
+            await aiofiles.os.replace(tmp_path, path)
+        return digest, path
+    except BaseException:
+        if await aiofiles.os.path.exists(tmp_path):
+            await aiofiles.os.remove(tmp_path)
+        raise
+
+
+async def extract_text(digest: str, path: str) -> str:
+    """Extract PDF text in the worker pool, using the cached result if present."""
+    text_path = os.path.join(UPLOAD_DIR, f"{digest}.txt")
+    if await aiofiles.os.path.exists(text_path):
+        await asyncio.to_thread(_touch, path, text_path)
+        async with aiofiles.open(text_path, "r", encoding="utf-8") as f:
+            return await f.read()
+
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        page_count = await loop.run_in_executor(pool, count_pages, path)
+        ranges = [(start, start + RESUME_PAGES_PER_TASK) for start in range(0, page_count, RESUME_PAGES_PER_TASK)]
+        chunks = await asyncio.gather(*[
+            loop.run_in_executor(pool, extract_page_range, path, start, end) for start, end in ranges
+        ])
+    except ValueError:
+        # Unparseable PDF: don't keep it around
+        await asyncio.to_thread(_remove_upload, digest)
+        raise
+    full_text = "\n".join(text for pages in chunks for text in pages if text)
+    logger.info(f"Extracted {len(full_text)} chars from PDF ({page_count} pages, {len(ranges)} task(s))")
+
+    # Write atomically so a concurrent reader never sees a partial cache file
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    os.close(fd)
+    async with aiofiles.open(tmp_path, "w", encoding="utf-8") as f:
+        await f.write(full_text)
+    await aiofiles.os.replace(tmp_path, text_path)
+    return full_text
+
+
+def _touch(*paths: str):
+    for path in paths:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_upload(digest: str, directory: str = UPLOAD_DIR):
+    for suffix in (".pdf", ".txt"):
+        try:
+            os.remove(os.path.join(directory, f"{digest}{suffix}"))
+        except FileNotFoundError:
+            pass
+
+
+def evict_uploads(max_age_s: float, max_files: int, directory: str = UPLOAD_DIR) -> int:
+    """
+    Delete stored PDFs (with their text) not used within max_age_s, then the least
+    recently used beyond max_files. Leftover partial uploads older than max_age_s go too.
+    Returns the number of PDFs removed.
+    """
+    cutoff = time.time() - max_age_s
+    pdfs: list[tuple[float, str]] = []
+    for entry in os.scandir(directory):
+        try:
+            used = entry.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if entry.name.endswith(".pdf"):
+            pdfs.append((used, entry.name[:-len(".pdf")]))
+        elif entry.name.endswith(".part") and used < cutoff:
+            os.remove(entry.path)
+
+    pdfs.sort()
+    excess = len(pdfs) - max_files
+    removed = 0
+    for used, digest in pdfs:
+        if used >= cutoff and removed >= excess:
+            break
+        _remove_upload(digest, directory)
+        removed += 1
+    if removed:
+        logger.info(f"Evicted {removed} stored resume upload(s)")
+    return removed
+
+
+async def _evict_periodically():
+    while True:
+        try:
+            await asyncio.to_thread(
+                evict_uploads, RESUME_CACHE_MAX_AGE_DAYS * 86400, RESUME_CACHE_MAX_ROWS,
+            )
+        except OSError as e:
+            logger.warning(f"Resume upload eviction failed: {e}")
+        await asyncio.sleep(RESUME_UPLOAD_EVICT_INTERVAL_S)
+
+
+async def ingest_pdf(file: UploadFile) -> str:
+    """Store an uploaded PDF (deduplicated by content hash) and return its text."""
+    digest, path = await store_upload(file)
+    return await extract_text(digest, path)
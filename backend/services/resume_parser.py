@@ -1,25 +1,26 @@
 """
 Resume PDF text extraction using PyPDF2.
 """
-import io
 from PyPDF2 import PdfReader
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    """Extract text content from a PDF file."""
+def count_pages(path: str) -> int:
+    """Number of pages in a PDF on disk."""
     try:
-        reader = PdfReader(io.BytesIO(file_bytes))
-        text_parts = []
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                text_parts.append(text)
-        full_text = "\n".join(text_parts)
-        logger.info(f"Extracted {len(full_text)} chars from PDF ({len(reader.pages)} pages)")
-        return full_text
+        return len(PdfReader(path).pages)
+    except Exception as e:
+        logger.error(f"PDF extraction error: {e}")
+        raise ValueError(f"Failed to parse PDF: {str(e)}")
+
+
+def extract_page_range(path: str, start: int, end: int) -> list[str]:
+    """Extract text for pages [start, end) of a PDF on disk. Runs in a worker process."""
+    try:
+        reader = PdfReader(path)
+        return [reader.pages[i].extract_text() or "" for i in range(start, min(end, len(reader.pages)))]
     except Exception as e:
         logger.error(f"PDF extraction error: {e}")
         raise ValueError(f"Failed to parse PDF: {str(e)}")
@@ -0,0 +1,184 @@
+"""
+Buffered bulk writer for emotion snapshots.
+Analyzed frames are queued in memory and inserted in batches (one transaction per
+flush) when the buffer reaches EMOTION_WRITE_BATCH_SIZE rows or every
+EMOTION_WRITE_FLUSH_MS, instead of one commit per frame. Per-session aggregates
+are updated in the same transaction. In "columnar" storage mode the snapshots
+themselves are appended to per-session float32 files instead (see emotion_series),
+and the aggregates are committed once the append has succeeded.
+"""
+import asyncio
+import logging
+import time
+from sqlalchemy import insert
+from config import (
+    EMOTION_WRITE_BATCH_SIZE, EMOTION_WRITE_FLUSH_MS, EMOTION_WRITE_MAX_BUFFER, EMOTION_STORAGE_MODE,
+)
+from database import SessionLocal
+from models import EmotionSnapshot
+from services.emotion_aggregates import apply_snapshot_rows
+from services import emotion_series
+
+logger = logging.getLogger(__name__)
+
+
+class EmotionSnapshotWriter:
+    """Per-process snapshot buffer with a background flush loop."""
+
+    def __init__(
+        self,
+        batch_size: int = EMOTION_WRITE_BATCH_SIZE,
+        flush_interval_ms: int = EMOTION_WRITE_FLUSH_MS,
+        max_buffer: int = EMOTION_WRITE_MAX_BUFFER,
+        storage_mode: str = EMOTION_STORAGE_MODE,
+    ):
+        self.storage_mode = storage_mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffer = max_buffer
+        self._buffer: list[dict] = []
+        # Columnar mode: rows already appended to their series file whose aggregate
+        # update failed; only the aggregate update is retried for them
+        self._unaggregated: list[dict] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.flushes = 0
+        self.failures = 0
+        self.max_depth = 0
+        self._flush_total = 0.0
+        self._flush_max = 0.0
+        self._last_flush = 0.0
+
+    def add(self, row: dict):
+        """Queue one snapshot (EmotionSnapshot column values). Never blocks."""
+        self._buffer.append(row)
+        if len(self._buffer) > self.max_buffer:
+            del self._buffer[0]
+            self.rows_dropped += 1
+        self.max_depth = max(self.max_depth, len(self._buffer))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def start(self):
+        # Bind the loop primitives to the loop the app is running on
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Emotion snapshot writer started (batch={self.batch_size}, "
+            f"interval={self.flush_interval}s, storage={self.storage_mode})"
+        )
+
+    async def stop(self):
+        """Stop the flush loop (letting a flush in progress finish) and write whatever is still buffered."""
+        if self._task:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def flush(self):
+        """Write all buffered rows now. Concurrent callers wait for the flush in progress."""
+        async with self._flush_lock:
+            if not self._buffer and not self._unaggregated:
+                return
+            rows, self._buffer = self._buffer, []
+            started = time.monotonic()
+            try:
+                retry = await asyncio.to_thread(self._insert, rows)
+            except Exception as e:
+                logger.error(f"Emotion snapshot flush of {len(rows)} row(s) failed: {e}")
+                retry = rows
+            elapsed = time.monotonic() - started
+            self.flushes += 1
+            self._flush_total += elapsed
+            self._flush_max = max(self._flush_max, elapsed)
+            self._last_flush = elapsed
+
+            self.rows_written += len(rows) - len(retry)
+            if retry:
+                # Put the rows back so the next flush retries them
+                self.failures += 1
+                self._buffer = (retry + self._buffer)[-self.max_buffer:]
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._buffer),
+            "max_queue_depth": self.max_depth,
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "unaggregated_rows": len(self._unaggregated),
+            "avg_flush_ms": round(self._flush_total / self.flushes * 1000, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(self._flush_max * 1000, 2),
+            "last_flush_ms": round(self._last_flush * 1000, 2),
+        }
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _insert(self, rows: list[dict]) -> list[dict]:
+        """Write a batch; returns the rows that weren't stored and should be retried."""
+        if self.storage_mode == "columnar":
+            return self._insert_columnar(rows)
+        db = SessionLocal()
+        try:
+            apply_snapshot_rows(db, rows)
+            db.execute(insert(EmotionSnapshot), rows)
+            db.commit()
+            return []
+        finally:
+            db.close()
+
+    def _insert_columnar(self, rows: list[dict]) -> list[dict]:
+        """
+        Append each session's rows to its series file, then commit the aggregates for
+        everything appended. Appended rows are never retried, so a failed commit can't
+        count them twice: they wait in _unaggregated for the next flush instead.
+        """
+        by_session: dict[int, list[dict]] = {}
+        for row in rows:
+            by_session.setdefault(row["session_id"], []).append(row)
+
+        retry: list[dict] = []
+        appended, self._unaggregated = self._unaggregated, []
+        for session_id, session_rows in by_session.items():
+            try:
+                session_rows = emotion_series.conform_rows(session_id, session_rows)
+                emotion_series.append_rows(session_id, session_rows)
+            except Exception as e:
+                logger.error(f"Emotion series append for session {session_id} failed: {e}")
+                retry += session_rows
+                continue
+            appended += session_rows
+
+        if appended:
+            db = SessionLocal()
+            try:
+                apply_snapshot_rows(db, appended)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.failures += 1
+                self._unaggregated = appended
+                logger.error(f"Emotion aggregate update for {len(appended)} row(s) failed: {e}")
+            finally:
+                db.close()
+        return retry
+
+
+snapshot_writer = EmotionSnapshotWriter()
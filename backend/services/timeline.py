@@ -0,0 +1,38 @@
+"""
+Largest-Triangle-Three-Buckets downsampling for the emotion timeline.
+Stress and confidence are downsampled together: each bucket keeps the point whose
+triangle with the previously kept point and the next bucket's mean has the largest
+area in (time, stress, confidence) space, so both series share one set of samples.
+"""
+import numpy as np
+
+
+def lttb_indices(t: np.ndarray, values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points to keep. t has shape (n,), values (n, k).
+    Returns all indices when n <= n_out; always keeps the first and last point.
+    """
+    n = len(t)
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 3:
+        raise ValueError("n_out must be at least 3")
+
+    # Normalize time so it weighs like the [0, 1] scores
+    span = t[-1] - t[0]
+    points = np.column_stack([(t - t[0]) / span if span > 0 else np.zeros(n), values])
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = points[0]
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        nxt_end = edges[i + 2] if i + 2 < len(edges) else n
+        c = points[end:nxt_end].mean(axis=0) if nxt_end > end else points[-1]
+        bucket = points[start:end]
+        areas = np.linalg.norm(np.cross(bucket - a, c - a), axis=1)
+        best = start + int(np.argmax(areas))
+        keep[i + 1] = best
+        a = points[best]
+    return keep
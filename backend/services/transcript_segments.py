@@ -0,0 +1,62 @@
+"""
+Splits an interview transcript into question/answer segments for chunked evaluation.
+A segment is an interviewer turn (consecutive interviewer turns are merged) plus
+every candidate turn that follows it, up to the next question.
+"""
+import hashlib
+
+
+def segment_transcript(transcript: list) -> list[dict]:
+    """Return segments as {"index", "question", "answer"}, in transcript order."""
+    segments: list[dict] = []
+    current = None
+    for entry in transcript:
+        role = entry.get("role", "unknown")
+        content = (entry.get("content") or "").strip()
+        if not content:
+            continue
+        if role == "interviewer":
+            # A follow-up before the candidate answered belongs to the same question
+            if current is None or current["answer"]:
+                current = {"index": len(segments), "question": "", "answer": ""}
+                segments.append(current)
+            current["question"] = f"{current['question']}\n{content}".strip()
+        else:
+            if current is None:
+                current = {"index": len(segments), "question": "", "answer": ""}
+                segments.append(current)
+            current["answer"] = f"{current['answer']}\n{content}".strip()
+    return segments
+
+
+def segment_key(segment: dict) -> str:
+    """Content hash of a segment, used to tell whether a stored evaluation still applies."""
+    return hashlib.sha256(f"{segment['question']}\n\n{segment['answer']}".encode("utf-8")).hexdigest()
+
+
+def format_segment(segment: dict) -> str:
+    return (
+        f"[Segment {segment['index']}]\n"
+        f"INTERVIEWER: {segment['question'] or '(no question)'}\n"
+        f"CANDIDATE: {segment['answer'] or '(no answer)'}\n"
+    )
+
+
+def pack_segments(segments: list[dict], max_chars: int) -> list[list[dict]]:
+    """
+    Group consecutive segments into chunks of at most max_chars formatted text.
+    A segment longer than max_chars gets a chunk of its own; nothing is truncated.
+    """
+    chunks: list[list[dict]] = []
+    current: list[dict] = []
+    size = 0
+    for segment in segments:
+        length = len(format_segment(segment))
+        if current and size + length > max_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(segment)
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
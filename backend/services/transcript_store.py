@@ -0,0 +1,112 @@
+"""
+Append-only transcript storage.
+Each turn is a row in transcript_turns, written as the interview runs, so a crash
+loses at most the turn in progress. Sessions recorded before this table existed
+still have their transcript in the InterviewSession.transcript JSON column;
+load_transcript serves both.
+"""
+import asyncio
+import logging
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import InterviewSession, TranscriptTurn
+
+logger = logging.getLogger(__name__)
+
+
+def load_transcript(session: InterviewSession, db: Session) -> list[dict]:
+    """The session transcript as [{role, content, timestamp}], oldest first."""
+    turns = db.query(
+        TranscriptTurn.role, TranscriptTurn.content, TranscriptTurn.timestamp
+    ).filter(TranscriptTurn.session_id == session.id).order_by(TranscriptTurn.seq).all()
+    if not turns:
+        return session.transcript or []
+    return [{"role": role, "content": content, "timestamp": timestamp} for role, content, timestamp in turns]
+
+
+def delete_transcript(session_id: int, db: Session):
+    db.query(TranscriptTurn).filter(TranscriptTurn.session_id == session_id).delete()
+
+
+def replace_transcript(session: InterviewSession, transcript: list, db: Session):
+    """Overwrite a session's transcript (for explicit edits through the API)."""
+    delete_transcript(session.id, db)
+    session.transcript = []
+    if transcript:
+        db.execute(insert(TranscriptTurn), [
+            {
+                "session_id": session.id,
+                "seq": seq,
+                "role": entry.get("role", "unknown"),
+                "content": entry.get("content", ""),
+                "timestamp": entry.get("timestamp", 0),
+            }
+            for seq, entry in enumerate(transcript)
+        ])
+
+
+class TranscriptWriter:
+    """
+    Buffers a live session's turns and inserts them in batches.
+    One flush runs at a time; turns appended meanwhile go out with the next one.
+    """
+
+    def __init__(self, session_id: int, next_seq: int = 0):
+        self.session_id = session_id
+        self._next_seq = next_seq
+        self._pending: list[dict] = []
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self.turns_written = 0
+
+    @classmethod
+    def resume(cls, session: InterviewSession, db: Session) -> "TranscriptWriter":
+        """
+        Continue numbering after any turns already stored for the session.
+        A legacy JSON transcript is queued so the first flush moves it into turns.
+        """
+        last = db.query(func.max(TranscriptTurn.seq)).filter(TranscriptTurn.session_id == session.id).scalar()
+        if last is not None:
+            return cls(session.id, last + 1)
+        writer = cls(session.id)
+        for entry in session.transcript or []:
+            writer.append(entry)
+        return writer
+
+    def append(self, entry: dict):
+        self._pending.append({
+            "session_id": self.session_id,
+            "seq": self._next_seq,
+            "role": entry.get("role", "unknown"),
+            "content": entry.get("content", ""),
+            "timestamp": entry.get("timestamp", 0),
+        })
+        self._next_seq += 1
+
+    def flush_soon(self):
+        """Start a background flush unless one is already running."""
+        if self._pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        async with self._lock:
+            while self._pending:
+                rows, self._pending = self._pending, []
+                try:
+                    await asyncio.to_thread(self._insert, rows)
+                    self.turns_written += len(rows)
+                except Exception as e:
+                    # Keep the rows so the next flush retries them
+                    self._pending = rows + self._pending
+                    logger.error(f"Session {self.session_id}: failed to write {len(rows)} transcript turn(s): {e}")
+                    return
+
+    @staticmethod
+    def _insert(rows: list[dict]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(TranscriptTurn), rows)
+            db.commit()
+        finally:
+            db.close()
@@ -0,0 +1,108 @@
+"""
+Background scoring of question/answer segments while an interview is running.
+A segment is evaluated as soon as the interviewer moves on to the next question and
+stored in turn_evaluations, so end-of-interview feedback only has to evaluate what
+is left and combine the results.
+"""
+import asyncio
+import logging
+from sqlalchemy.orm import Session
+from config import TURN_SCORING_CONCURRENCY
+from database import SessionLocal
+from models import TurnEvaluation
+from services.gemini_text import evaluate_segments
+from services.transcript_segments import segment_key
+
+logger = logging.getLogger(__name__)
+
+
+def store_turn_evaluations(session_id: int, segments: list[dict], evaluations: list[dict]):
+    """Upsert evaluations by segment index. Unrated ones are skipped so they get retried."""
+    db = SessionLocal()
+    try:
+        existing = {
+            row.segment_index: row for row in db.query(TurnEvaluation).filter(
+                TurnEvaluation.session_id == session_id,
+                TurnEvaluation.segment_index.in_([s["index"] for s in segments]),
+            )
+        }
+        for segment, evaluation in zip(segments, evaluations):
+            if evaluation.get("response_quality") == "unrated":
+                continue
+            row = existing.get(segment["index"])
+            if row is None:
+                row = TurnEvaluation(session_id=session_id, segment_index=segment["index"])
+                db.add(row)
+            row.segment_key = segment_key(segment)
+            row.evaluation = evaluation
+        db.commit()
+    finally:
+        db.close()
+
+
+def load_turn_evaluations(session_id: int) -> dict[int, tuple[str, dict]]:
+    """Return {segment_index: (segment_key, evaluation)} for a session."""
+    db = SessionLocal()
+    try:
+        rows = db.query(TurnEvaluation).filter(TurnEvaluation.session_id == session_id)
+        return {row.segment_index: (row.segment_key, row.evaluation) for row in rows}
+    finally:
+        db.close()
+
+
+def delete_turn_evaluations(session_id: int, db: Session):
+    db.query(TurnEvaluation).filter(TurnEvaluation.session_id == session_id).delete()
+
+
+class TurnScorer:
+    """Runs segment evaluations as background tasks with bounded concurrency."""
+
+    def __init__(self, concurrency: int = TURN_SCORING_CONCURRENCY):
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: dict[int, set[asyncio.Task]] = {}
+        self.scored = 0
+        self.failures = 0
+
+    def schedule(self, session_id: int, segments: list[dict], interview_context: str):
+        """Evaluate segments (in one LLM call) without blocking the caller."""
+        task = asyncio.create_task(self._score(session_id, segments, interview_context))
+        self._tasks.setdefault(session_id, set()).add(task)
+        task.add_done_callback(lambda t: self._forget(session_id, t))
+
+    async def wait_for_session(self, session_id: int):
+        """Wait for any scoring still in flight for a session."""
+        tasks = list(self._tasks.get(session_id, ()))
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def shutdown(self):
+        for tasks in self._tasks.values():
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": sum(len(tasks) for tasks in self._tasks.values()),
+            "segments_scored": self.scored,
+            "failures": self.failures,
+        }
+
+    async def _score(self, session_id: int, segments: list[dict], interview_context: str):
+        try:
+            async with self._slots:
+                evaluations = await evaluate_segments(segments, interview_context)
+            await asyncio.to_thread(store_turn_evaluations, session_id, segments, evaluations)
+            self.scored += len(segments)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Turn scoring failed for session {session_id}: {e}")
+
+    def _forget(self, session_id: int, task: asyncio.Task):
+        tasks = self._tasks.get(session_id)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self._tasks[session_id]
+
+
+turn_scorer = TurnScorer()
@@ -0,0 +1,108 @@
+"""
+Voice activity detection for upstream interview audio.
+Classifies 16kHz PCM in short frames using vectorized RMS energy and zero-crossing
+rate, drops silence, and keeps a short pre-roll so speech onsets aren't clipped.
+A hangover after speech lets Gemini's own end-of-speech detection still see silence.
+"""
+from collections import deque
+import numpy as np
+from config import (
+    AUDIO_SAMPLE_RATE_INPUT, AUDIO_SAMPLE_WIDTH,
+    VAD_FRAME_MS, VAD_ENERGY_THRESHOLD, VAD_ZCR_MAX, VAD_PREROLL_MS, VAD_HANGOVER_MS,
+)
+
+
+class VoiceActivityDetector:
+    """Stateful per-session VAD. Feed it raw PCM, forward what it returns."""
+
+    def __init__(
+        self,
+        frame_ms: int = VAD_FRAME_MS,
+        energy_threshold: float = VAD_ENERGY_THRESHOLD,
+        zcr_max: float = VAD_ZCR_MAX,
+        preroll_ms: int = VAD_PREROLL_MS,
+        hangover_ms: int = VAD_HANGOVER_MS,
+    ):
+        self.frame_samples = AUDIO_SAMPLE_RATE_INPUT * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * AUDIO_SAMPLE_WIDTH
+        self.energy_threshold = energy_threshold
+        self.zcr_max = zcr_max
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self._preroll: deque[bytes] = deque(maxlen=max(0, preroll_ms // frame_ms))
+        self._remainder = b""
+        self._hang = 0
+        self._noise_floor = energy_threshold / 3
+        self.in_speech = False
+
+        # Metrics
+        self.frames_in = 0
+        self.frames_speech = 0
+        self.frames_forwarded = 0
+
+    def process(self, pcm: bytes | memoryview) -> tuple[bytes, bool]:
+        """
+        Classify a chunk of PCM. Returns (audio to send upstream, whether any frame was speech).
+        Forwarded audio is speech plus its pre-roll and hangover; partial frames carry over.
+        """
+        data = self._remainder + bytes(pcm)
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = data[usable:]
+        if not usable:
+            return b"", False
+
+        frames = np.frombuffer(data, dtype=np.int16, count=usable // AUDIO_SAMPLE_WIDTH)
+        frames = frames.reshape(-1, self.frame_samples)
+        speech = self._classify(frames)
+
+        out = []
+        for i, is_speech in enumerate(speech):
+            frame = data[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            if is_speech:
+                if not self.in_speech:
+                    out.extend(self._preroll)
+                    self.frames_forwarded += len(self._preroll)
+                    self._preroll.clear()
+                    self.in_speech = True
+                self._hang = self.hangover_frames
+                out.append(frame)
+                self.frames_forwarded += 1
+            elif self.in_speech:
+                self._hang -= 1
+                out.append(frame)
+                self.frames_forwarded += 1
+                if self._hang <= 0:
+                    self.in_speech = False
+            else:
+                self._preroll.append(frame)
+
+        speech_frames = int(speech.sum())
+        self.frames_in += len(speech)
+        self.frames_speech += speech_frames
+        return b"".join(out), speech_frames > 0
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        """Vectorized per-frame speech decision."""
+        samples = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_samples - 1)
+
+        # Track the background level on quiet frames so steady room noise doesn't count
+        quiet = rms[rms < self.energy_threshold]
+        if quiet.size:
+            self._noise_floor = 0.95 * self._noise_floor + 0.05 * float(quiet.mean())
+        threshold = max(self.energy_threshold, self._noise_floor * 3)
+
+        loud = rms > threshold
+        # Noise-like (high ZCR) frames only count as speech if clearly loud
+        noisy = (zcr > self.zcr_max) & (rms < threshold * 2)
+        return loud & ~noisy
+
+    def stats(self) -> dict:
+        """Snapshot of VAD metrics."""
+        return {
+            "frames_in": self.frames_in,
+            "frames_speech": self.frames_speech,
+            "frames_forwarded": self.frames_forwarded,
+            "forwarded_ratio": round(self.frames_forwarded / self.frames_in, 3) if self.frames_in else 0.0,
+        }
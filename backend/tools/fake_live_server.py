@@ -0,0 +1,335 @@
+"""
+Local stand-in for the Gemini Live API, for load tests that shouldn't spend Vertex quota.
+
+Implements the subset of the BidiGenerateContent WebSocket protocol that
+GeminiLiveSession uses:
+- setup → setupComplete, plus sessionResumptionUpdate handles if resumption was requested
+- clientContent with turnComplete → an interviewer turn: 24kHz PCM in modelTurn chunks
+  (synthesized, or the candidate's last utterance echoed with --echo), outputTranscription
+  text, then turnComplete
+- realtimeInput audio → a simple energy detector. Speech followed by --end-silence-ms of
+  silence produces an inputTranscription and an interviewer turn; speech while a turn is
+  playing interrupts it (interrupted)
+- --go-away-after S sends goAway after S seconds, to exercise reconnects
+
+Each reply starts after --latency-ms ± --jitter-ms, and its audio is paced in real time.
+Every audio chunk begins with a 12-byte stamp (AUDIO_STAMP: magic + send time.time())
+so load tests can measure relay latency through the backend.
+
+The server speaks wss:// with a throwaway self-signed certificate for 127.0.0.1 and
+localhost (written to --cert/--key, or a temporary directory), since the SDK always
+connects with TLS. Point GEMINI_LIVE_CA_FILE at the certificate so only the Live
+client trusts it:
+
+    cd backend
+    python -m tools.fake_live_server --port 9100 --cert /tmp/fake_live.pem --key /tmp/fake_live.key
+    GEMINI_LIVE_BASE_URL=wss://127.0.0.1:9100 GEMINI_LIVE_CA_FILE=/tmp/fake_live.pem uvicorn main:app
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import datetime
+import ipaddress
+import os
+import random
+import ssl
+import struct
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+import websockets
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import AUDIO_SAMPLE_RATE_INPUT, AUDIO_SAMPLE_RATE_OUTPUT  # noqa: E402
+
+logger = logging.getLogger("fake_live_server")
+
+AUDIO_STAMP = struct.Struct("<4sd")  # magic, time.time() when the chunk was sent
+AUDIO_STAMP_MAGIC = b"FKLV"
+REPLY_TEXT = (
+    "Thanks, that makes sense. Could you walk me through how you would "
+    "approach the same problem if the data no longer fit in memory?"
+)
+
+
+@dataclass
+class FakeLiveOptions:
+    latency_ms: float = 300.0  # delay before each reply starts
+    jitter_ms: float = 100.0  # uniform ± on top of latency_ms
+    reply_ms: int = 3000  # length of a synthesized reply
+    chunk_ms: int = 40  # audio per modelTurn message
+    echo: bool = False  # reply with the candidate's last utterance instead of a tone
+    speech_rms: float = 300.0  # int16 RMS above which input counts as speech
+    end_silence_ms: int = 600  # silence that ends an utterance
+    go_away_after_s: float = 0.0  # 0 = never
+
+
+def synthesize_speech(duration_ms: int, rate: int = AUDIO_SAMPLE_RATE_OUTPUT) -> bytes:
+    """A voice-like tone (150Hz + harmonics, syllable-rate envelope) as s16le PCM."""
+    t = np.arange(rate * duration_ms // 1000) / rate
+    tone = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in (1, 2, 3))
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t)
+    return (tone * envelope * 6000).astype("<i2").tobytes()
+
+
+def _field(message: dict, camel: str, snake: str):
+    """Client messages arrive camelCase or snake_case depending on the SDK call used."""
+    return message.get(camel, message.get(snake))
+
+
+def _rms(pcm: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(pcm.astype(np.float32) ** 2))) if len(pcm) else 0.0
+
+
+def _upsample(pcm16k: bytes) -> bytes:
+    """16kHz → 24kHz by linear interpolation, for --echo."""
+    src = np.frombuffer(pcm16k, dtype="<i2").astype(np.float32)
+    if not len(src):
+        return b""
+    n = len(src) * AUDIO_SAMPLE_RATE_OUTPUT // AUDIO_SAMPLE_RATE_INPUT
+    out = np.interp(np.linspace(0, len(src) - 1, n), np.arange(len(src)), src)
+    return out.astype("<i2").tobytes()
+
+
+class FakeLiveStats:
+    def __init__(self):
+        self.active = 0
+        self.sessions = 0
+        self.turns = 0
+        self.interruptions = 0
+        self.audio_in_bytes = 0
+        self.audio_out_bytes = 0
+
+    def snapshot(self) -> dict:
+        return dict(vars(self))
+
+
+class FakeLiveSession:
+    """One client connection."""
+
+    def __init__(self, ws, options: FakeLiveOptions, stats: FakeLiveStats, reply_pcm: bytes):
+        self.ws = ws
+        self.options = options
+        self.stats = stats
+        self.reply_pcm = reply_pcm
+        self._reply: asyncio.Task | None = None
+        self._resumable = False
+        self._utterance = bytearray()  # candidate audio since the last reply, for --echo
+        self._speech_ms = 0.0
+        self._silence_ms = 0.0
+
+    async def run(self):
+        setup = json.loads(await self.ws.recv()).get("setup", {})
+        self._resumable = "sessionResumption" in setup
+        await self._send({"setupComplete": {}})
+        await self._issue_handle()
+        go_away = asyncio.create_task(self._go_away()) if self.options.go_away_after_s > 0 else None
+        try:
+            async for raw in self.ws:
+                message = json.loads(raw)
+                realtime_input = _field(message, "realtimeInput", "realtime_input")
+                client_content = _field(message, "clientContent", "client_content")
+                if realtime_input:
+                    await self._on_audio(realtime_input)
+                elif client_content and _field(client_content, "turnComplete", "turn_complete"):
+                    self._start_reply(self.reply_pcm)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in (self._reply, go_away):
+                if task:
+                    task.cancel()
+
+    async def _send(self, message: dict):
+        await self.ws.send(json.dumps(message))
+
+    async def _issue_handle(self):
+        if self._resumable:
+            await self._send({"sessionResumptionUpdate": {"newHandle": uuid.uuid4().hex, "resumable": True}})
+
+    async def _go_away(self):
+        await asyncio.sleep(self.options.go_away_after_s)
+        await self._send({"goAway": {"timeLeft": "10s"}})
+
+    async def _on_audio(self, realtime_input: dict):
+        blobs = _field(realtime_input, "mediaChunks", "media_chunks") or [realtime_input.get("audio") or {}]
+        for blob in blobs:
+            pcm = base64.urlsafe_b64decode(blob.get("data", ""))  # the SDK sends the URL-safe alphabet
+            self.stats.audio_in_bytes += len(pcm)
+            samples = np.frombuffer(pcm[: len(pcm) - len(pcm) % 2], dtype="<i2")
+            duration_ms = len(samples) * 1000 / AUDIO_SAMPLE_RATE_INPUT
+            if _rms(samples) >= self.options.speech_rms:
+                if self._reply and not self._reply.done():
+                    # Barge-in: the candidate talks over the interviewer
+                    self._reply.cancel()
+                    self._reply = None
+                    self.stats.interruptions += 1
+                    await self._send({"serverContent": {"interrupted": True}})
+                self._speech_ms += duration_ms
+                self._silence_ms = 0.0
+                self._utterance += pcm
+            elif self._speech_ms:
+                self._silence_ms += duration_ms
+                if self._silence_ms >= self.options.end_silence_ms:
+                    await self._end_utterance()
+
+    async def _end_utterance(self):
+        spoken = self._speech_ms
+        self._speech_ms = self._silence_ms = 0.0
+        await self._send({"serverContent": {"inputTranscription": {"text": f"(candidate spoke for {spoken / 1000:.1f}s)"}}})
+        reply = _upsample(bytes(self._utterance)) if self.options.echo else self.reply_pcm
+        self._utterance.clear()
+        self._start_reply(reply)
+
+    def _start_reply(self, pcm: bytes):
+        if self._reply and not self._reply.done():
+            self._reply.cancel()
+        self._reply = asyncio.create_task(self._play(pcm))
+
+    async def _play(self, pcm: bytes):
+        """Send one interviewer turn: audio chunks paced in real time, transcription, turnComplete."""
+        delay = self.options.latency_ms + random.uniform(-self.options.jitter_ms, self.options.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+        chunk_bytes = AUDIO_SAMPLE_RATE_OUTPUT * 2 * self.options.chunk_ms // 1000
+        chunks = [pcm[i:i + chunk_bytes] for i in range(0, len(pcm), chunk_bytes)] or [b""]
+        words = REPLY_TEXT.split()
+        per_chunk = max(1, -(-len(words) // len(chunks)))
+        started = time.monotonic()
+        try:
+            for i, chunk in enumerate(chunks):
+                stamped = AUDIO_STAMP.pack(AUDIO_STAMP_MAGIC, time.time()) + chunk
+                await self._send({"serverContent": {"modelTurn": {"parts": [
+                    {"inlineData": {"mimeType": f"audio/pcm;rate={AUDIO_SAMPLE_RATE_OUTPUT}",
+                                    "data": base64.b64encode(stamped).decode("ascii")}},
+                ]}}})
+                self.stats.audio_out_bytes += len(stamped)
+                text = " ".join(words[i * per_chunk:(i + 1) * per_chunk])
+                if text:
+                    await self._send({"serverContent": {"outputTranscription": {"text": text + " "}}})
+                # Real-time pacing, like the model speaking
+                await asyncio.sleep(max(0.0, started + (i + 1) * self.options.chunk_ms / 1000 - time.monotonic()))
+            await self._send({"serverContent": {"turnComplete": True}})
+            self.stats.turns += 1
+            await self._issue_handle()
+        except websockets.ConnectionClosed:
+            pass
+
+
+def write_self_signed_cert(cert_path: str, key_path: str, days: int = 7):
+    """Write a self-signed certificate and key for 127.0.0.1/localhost (PEM)."""
+    try:
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+    except ImportError:
+        raise RuntimeError("The fake Live server needs the 'cryptography' package to create its certificate")
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "fake-live-server")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=days))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+        ]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+        ))
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+
+
+async def serve(
+    host: str, port: int, options: FakeLiveOptions, cert_path: str, key_path: str,
+    stats: FakeLiveStats | None = None,
+):
+    """Start the fake server over TLS; returns the websockets server (close() + wait_closed() to stop)."""
+    stats = stats or FakeLiveStats()
+    reply_pcm = synthesize_speech(options.reply_ms)
+
+    async def handler(ws):
+        stats.active += 1
+        stats.sessions += 1
+        try:
+            await FakeLiveSession(ws, options, stats, reply_pcm).run()
+        finally:
+            stats.active -= 1
+
+    ssl_ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ssl_ctx.load_cert_chain(cert_path, key_path)
+    return await websockets.serve(handler, host, port, max_size=None, ssl=ssl_ctx)
+
+
+async def _main(args):
+    options = FakeLiveOptions(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        reply_ms=args.reply_ms,
+        chunk_ms=args.chunk_ms,
+        echo=args.echo,
+        end_silence_ms=args.end_silence_ms,
+        go_away_after_s=args.go_away_after,
+    )
+    cert_path, key_path = args.cert, args.key
+    if not cert_path or not key_path:
+        certdir = tempfile.mkdtemp(prefix="fake_live_")
+        cert_path = cert_path or os.path.join(certdir, "cert.pem")
+        key_path = key_path or os.path.join(certdir, "key.pem")
+    if not (os.path.exists(cert_path) and os.path.exists(key_path)):
+        write_self_signed_cert(cert_path, key_path)
+    stats = FakeLiveStats()
+    server = await serve(args.host, args.port, options, cert_path, key_path, stats)
+    logger.info(f"Fake Gemini Live server on wss://{args.host}:{args.port} ({options})")
+    logger.info(f"Certificate: {cert_path} (set GEMINI_LIVE_CA_FILE to this path)")
+    try:
+        while True:
+            await asyncio.sleep(args.stats_interval)
+            logger.info(f"stats {stats.snapshot()}")
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini Live API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--reply-ms", type=int, default=3000, help="length of synthesized replies")
+    parser.add_argument("--chunk-ms", type=int, default=40)
+    parser.add_argument("--echo", action="store_true", help="reply with the candidate's own audio")
+    parser.add_argument("--end-silence-ms", type=int, default=600)
+    parser.add_argument("--go-away-after", type=float, default=0.0, help="send goAway after this many seconds")
+    parser.add_argument("--stats-interval", type=float, default=10.0)
+    parser.add_argument("--cert", help="TLS certificate (PEM); a self-signed one is written here if missing")
+    parser.add_argument("--key", help="TLS private key (PEM); written with --cert if missing")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
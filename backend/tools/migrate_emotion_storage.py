@@ -0,0 +1,125 @@
+"""
+Move stored emotion snapshots between the two storage modes.
+
+    cd backend
+    python -m tools.migrate_emotion_storage --to columnar            # rows -> per-session float32 files
+    python -m tools.migrate_emotion_storage --to columnar --delete-rows
+    python -m tools.migrate_emotion_storage --to rows                # files -> emotion_snapshots rows
+
+Each session's aggregate row is built if missing, so summaries survive --delete-rows.
+Rows are streamed in chunks; files are written atomically. Set EMOTION_STORAGE_MODE
+to match once the migration is done.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+from sqlalchemy import func, insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import EMOTION_SERIES_DIR  # noqa: E402
+from database import SessionLocal, init_db  # noqa: E402
+from models import EmotionSnapshot  # noqa: E402
+from services import emotion_series  # noqa: E402
+from services.emotion_aggregates import ensure_aggregate  # noqa: E402
+
+
+def _sessions_with_rows(db, only: list[int] | None) -> list[tuple[int, int]]:
+    query = db.query(EmotionSnapshot.session_id, func.count(EmotionSnapshot.id)).group_by(EmotionSnapshot.session_id)
+    if only:
+        query = query.filter(EmotionSnapshot.session_id.in_(only))
+    return query.order_by(EmotionSnapshot.session_id).all()
+
+
+def to_columnar(only: list[int] | None, delete_rows: bool, chunk: int, force: bool):
+    db = SessionLocal()
+    try:
+        for session_id, count in _sessions_with_rows(db, only):
+            if emotion_series.read_series(session_id) is not None and not force:
+                print(f"session {session_id}: file exists, skipped (use --force to rewrite)")
+                continue
+            ensure_aggregate(session_id, db)
+            db.commit()
+
+            # The file takes the first row's scoring version; rows scored under another
+            # version are re-scored to it, so the header is true for every record
+            parts = []
+            batch = []
+            scoring_version = None
+            rows = db.query(
+                EmotionSnapshot.timestamp, EmotionSnapshot.emotions,
+                EmotionSnapshot.stress_score, EmotionSnapshot.confidence_score, EmotionSnapshot.scoring_version,
+            ).filter(EmotionSnapshot.session_id == session_id).order_by(EmotionSnapshot.timestamp).yield_per(chunk)
+            for timestamp, emotions, stress, confidence, version in rows:
+                scoring_version = scoring_version or version or 1
+                batch.append({"timestamp": timestamp, "emotions": emotions, "stress_score": stress,
+                              "confidence_score": confidence, "scoring_version": version})
+                if len(batch) >= chunk:
+                    parts.append(emotion_series.pack_rows(
+                        emotion_series.conform_rows(session_id, batch, version=scoring_version)))
+                    batch = []
+            if batch:
+                parts.append(emotion_series.pack_rows(
+                    emotion_series.conform_rows(session_id, batch, version=scoring_version)))
+            emotion_series.write_series(session_id, np.concatenate(parts), scoring_version=scoring_version)
+
+            if delete_rows:
+                db.query(EmotionSnapshot).filter(EmotionSnapshot.session_id == session_id).delete()
+                db.commit()
+            print(f"session {session_id}: {count} snapshot(s) -> {emotion_series.series_path(session_id)}")
+    finally:
+        db.close()
+
+
+def to_rows(only: list[int] | None, chunk: int):
+    if not os.path.isdir(EMOTION_SERIES_DIR):
+        print(f"{EMOTION_SERIES_DIR} does not exist, nothing to migrate")
+        return
+    session_ids = sorted(
+        int(name[:-4]) for name in os.listdir(EMOTION_SERIES_DIR)
+        if name.endswith(".f32") and name[:-4].isdigit()
+    )
+    db = SessionLocal()
+    try:
+        for session_id in session_ids:
+            if only and session_id not in only:
+                continue
+            if db.query(EmotionSnapshot.id).filter(EmotionSnapshot.session_id == session_id).first():
+                print(f"session {session_id}: already has rows, skipped")
+                continue
+            records = emotion_series.read_series(session_id)
+            scoring_version = emotion_series.series_scoring_version(session_id)
+            for start in range(0, len(records), chunk):
+                snapshots = emotion_series.records_to_snapshots(records[start:start + chunk])
+                db.execute(insert(EmotionSnapshot), [
+                    {**s, "session_id": session_id, "scoring_version": scoring_version} for s in snapshots
+                ])
+            ensure_aggregate(session_id, db)
+            db.commit()
+            del records
+            emotion_series.delete_series(session_id)
+            print(f"session {session_id}: file -> emotion_snapshots rows")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--to", choices=["columnar", "rows"], required=True)
+    parser.add_argument("--session", type=int, action="append", help="only migrate this session (repeatable)")
+    parser.add_argument("--delete-rows", action="store_true", help="delete emotion_snapshots rows after writing files")
+    parser.add_argument("--force", action="store_true", help="rewrite files that already exist")
+    parser.add_argument("--chunk", type=int, default=5000, help="rows per read/insert batch")
+    args = parser.parse_args()
+
+    init_db()
+    if args.to == "columnar":
+        to_columnar(args.session, args.delete_rows, args.chunk, args.force)
+    else:
+        to_rows(args.session, args.chunk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Re-score stored emotion snapshots with a weight set from services/emotion_scoring.
+
+    cd backend
+    python -m tools.rescore_emotions                    # to EMOTION_SCORING_VERSION
+    python -m tools.rescore_emotions --version 2 --chunk 20000
+    python -m tools.rescore_emotions --session 42 --force
+
+emotion_snapshots rows are walked in primary-key order, a chunk at a time: each
+chunk's probabilities are scored with one matmul and written back with a single
+executemany UPDATE, then committed. Only rows scored with a different version are
+touched unless --force is given, so an interrupted run can simply be restarted.
+Per-session float32 series files (columnar storage mode) are re-scored in place.
+Affected sessions get their aggregates rebuilt. Run it while no interviews are live.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import func, update
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import EMOTION_SCORING_VERSION, EMOTION_SERIES_DIR  # noqa: E402
+from database import SessionLocal, init_db  # noqa: E402
+from models import EmotionSnapshot  # noqa: E402
+from services import emotion_series  # noqa: E402
+from services.emotion_aggregates import rebuild_aggregate  # noqa: E402
+from services.emotion_scoring import emotions_matrix, score_matrix, weight_matrix  # noqa: E402
+
+
+def rescore_rows(version: int, only: list[int] | None, chunk: int, force: bool) -> tuple[int, set[int]]:
+    """Rewrite stress/confidence on emotion_snapshots rows; returns (rows updated, sessions touched)."""
+    db = SessionLocal()
+    updated, sessions, last_id = 0, set(), 0
+    try:
+        while True:
+            query = db.query(EmotionSnapshot.id, EmotionSnapshot.session_id, EmotionSnapshot.emotions).filter(
+                EmotionSnapshot.id > last_id
+            )
+            if not force:
+                query = query.filter(func.coalesce(EmotionSnapshot.scoring_version, 1) != version)
+            if only:
+                query = query.filter(EmotionSnapshot.session_id.in_(only))
+            batch = query.order_by(EmotionSnapshot.id).limit(chunk).all()
+            if not batch:
+                break
+
+            probs = emotions_matrix([emotions for _, _, emotions in batch])
+            scores = np.round(score_matrix(probs, version).astype(np.float64), 4).tolist()
+            db.execute(update(EmotionSnapshot), [
+                {"id": snapshot_id, "stress_score": stress, "confidence_score": confidence, "scoring_version": version}
+                for (snapshot_id, _, _), (stress, confidence) in zip(batch, scores)
+            ])
+            db.commit()
+            updated += len(batch)
+            sessions.update(session_id for _, session_id, _ in batch)
+            last_id = batch[-1][0]
+            print(f"  {updated} row(s) re-scored (through id {last_id})", end="\r", flush=True)
+        if updated:
+            print()
+
+        for session_id in sorted(sessions):
+            rebuild_aggregate(session_id, db)
+        db.commit()
+    finally:
+        db.close()
+    return updated, sessions
+
+
+def rescore_series(version: int, only: list[int] | None, force: bool) -> tuple[int, set[int]]:
+    """Rewrite the stress/confidence columns of series files; returns (records updated, sessions touched)."""
+    if not os.path.isdir(EMOTION_SERIES_DIR):
+        return 0, set()
+    session_ids = sorted(
+        int(name[:-4]) for name in os.listdir(EMOTION_SERIES_DIR)
+        if name.endswith(".f32") and name[:-4].isdigit()
+    )
+    db = SessionLocal()
+    updated, sessions = 0, set()
+    try:
+        for session_id in session_ids:
+            if only and session_id not in only:
+                continue
+            if emotion_series.series_scoring_version(session_id) == version and not force:
+                continue
+            records = np.array(emotion_series.read_series(session_id))
+            scores = np.round(score_matrix(records[:, emotion_series.EMOTION_COLS], version).astype(np.float64), 4)
+            records[:, [emotion_series.STRESS_COL, emotion_series.CONFIDENCE_COL]] = scores
+            emotion_series.write_series(session_id, records, scoring_version=version)
+
+            rebuild_aggregate(session_id, db, [
+                {"timestamp": float(r[emotion_series.TIMESTAMP_COL]), "dominant_emotion": dominant,
+                 "stress_score": float(r[emotion_series.STRESS_COL]),
+                 "confidence_score": float(r[emotion_series.CONFIDENCE_COL])}
+                for r, dominant in zip(records, emotion_series.dominant_emotions(records))
+            ])
+            db.commit()
+            updated += len(records)
+            sessions.add(session_id)
+    finally:
+        db.close()
+    return updated, sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", type=int, default=EMOTION_SCORING_VERSION, help="weight set to score with")
+    parser.add_argument("--session", type=int, action="append", help="only re-score this session (repeatable)")
+    parser.add_argument("--force", action="store_true", help="re-score snapshots already at --version")
+    parser.add_argument("--chunk", type=int, default=10000, help="rows per read/update batch")
+    args = parser.parse_args()
+
+    weight_matrix(args.version)  # fail fast on an unknown version
+    init_db()
+    started = time.perf_counter()
+    rows, row_sessions = rescore_rows(args.version, args.session, args.chunk, args.force)
+    records, file_sessions = rescore_series(args.version, args.session, args.force)
+    elapsed = time.perf_counter() - started
+    total = rows + records
+    rate = f", {total / elapsed:,.0f} snapshots/s" if total and elapsed > 0 else ""
+    print(
+        f"Re-scored {rows} row(s) and {records} file record(s) across "
+        f"{len(row_sessions | file_sessions)} session(s) to version {args.version} in {elapsed:.1f}s{rate}"
+    )
+
+
+if __name__ == "__main__":
+    main()
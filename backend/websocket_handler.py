@@ -8,12 +8,26 @@ import json
 import time
 import logging
 from fastapi import WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from models import InterviewSession, InterviewTopic, EmotionSnapshot
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import InterviewSession, InterviewTopic
 from services.gemini_live import GeminiLiveSession
-from services.prompt_builder import build_topic_prompt, build_custom_prompt, build_behavioral_prompt
-from services.emotion_analyzer import analyze_frame
-from database import SessionLocal
+from services.resilient_live import ResilientLiveSession
+from services.prompt_builder import build_session_prompt
+from services.live_prewarm import live_prewarm
+from services.emotion_executor import emotion_executor
+from services.snapshot_writer import snapshot_writer
+from services.audio_pipeline import UpstreamAudioPipeline
+from services.vad import VoiceActivityDetector
+from services.feedback_service import build_interview_context
+from services.transcript_segments import segment_transcript
+from services.turn_scoring import turn_scorer, delete_turn_evaluations
+from services.transcript_store import TranscriptWriter, load_transcript, delete_transcript
+from database import AsyncSessionLocal
+from config import VAD_ENABLED, TURN_SCORING_ENABLED, LIVE_RECONNECT_ENABLED, AUDIO_UPSTREAM_FLUSH_TIMEOUT_S
+from ws_protocol import (
+    CAP_BINARY_AUDIO, CAP_BINARY_FRAMES, UPLINK_AUDIO, UPLINK_FRAME,
+    pack_downlink_audio, parse_uplink,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,29 +35,37 @@ logger = logging.getLogger(__name__)
 class InterviewWebSocketHandler:
     """Handles a single interview WebSocket connection."""
 
-    def __init__(self, websocket: WebSocket, session_id: int):
+    def __init__(self, websocket: WebSocket, session_id: int, caps: set[str] | None = None):
         self.websocket = websocket
         self.session_id = session_id
-        self.gemini_session: GeminiLiveSession | None = None
+        self.caps = caps or set()
+        self.gemini_session: GeminiLiveSession | ResilientLiveSession | None = None
+        self.audio_pipeline: UpstreamAudioPipeline | None = None
+        self.vad = VoiceActivityDetector() if VAD_ENABLED else None
         self.transcript: list[dict] = []
+        self.transcript_writer: TranscriptWriter | None = None
         self.start_time: float = 0
         self.is_active = False
         self._current_ai_text = ""
         self._current_user_text = ""
         self._silence_timer: asyncio.Task | None = None
         self._user_spoke = False
+        self._audio_seq = 0  # downlink audio chunk counter
+        self._turn_id = 0  # bumped on every completed interviewer turn
+        self._interview_context = ""
+        self._scored_segments = 0  # transcript segments already handed to turn_scorer
 
     async def run(self):
         """Main handler loop."""
         await self.websocket.accept()
-        db = SessionLocal()
+        db = AsyncSessionLocal()
+        completed_session = None
+        pipeline_task = receive_task = None
         self._audio_chunk_count = 0
 
         try:
             # Load interview session from DB
-            session = db.query(InterviewSession).filter(
-                InterviewSession.id == self.session_id
-            ).first()
+            session = await db.get(InterviewSession, self.session_id)
 
             if not session:
                 await self._send_json({"type": "error", "message": "Session not found"})
@@ -55,20 +77,42 @@ class InterviewWebSocketHandler:
                 session.status = "created"
                 session.transcript = []
                 session.duration_seconds = 0
-                db.commit()
+                await db.run_sync(self._delete_stored_turns)
+                await db.commit()
+
+            # Turns already stored (e.g. before a dropped connection) are kept
+            self.transcript = await db.run_sync(lambda sync_db: load_transcript(session, sync_db))
+            self.transcript_writer = await db.run_sync(lambda sync_db: TranscriptWriter.resume(session, sync_db))
+            self._scored_segments = max(0, len(segment_transcript(self.transcript)) - 1)
 
             # Build system prompt
-            system_prompt = self._build_prompt(session, db)
+            topic = await db.get(InterviewTopic, session.topic_id) if session.topic_id else None
+            system_prompt = build_session_prompt(session, topic)
+            self._interview_context = await db.run_sync(
+                lambda sync_db: build_interview_context(session, sync_db, with_duration=False)
+            )
 
             # Update session status
             session.status = "active"
-            db.commit()
+            await db.commit()
 
             await self._send_json({"type": "status", "message": "Connecting to AI interviewer..."})
 
-            # Connect to Gemini Live
-            self.gemini_session = GeminiLiveSession(system_prompt)
-            await self.gemini_session.connect()
+            # Take over the connection opened when the interview was created, if there is one
+            live = await live_prewarm.claim(self.session_id, system_prompt)
+            if LIVE_RECONNECT_ENABLED:
+                # Reconnects on upstream failure or go-away without ending the interview
+                self.gemini_session = ResilientLiveSession(
+                    system_prompt,
+                    lambda: self.transcript,
+                    live=live,
+                    on_reconnecting=self._handle_upstream_reconnecting,
+                    on_reconnected=self._handle_upstream_reconnected,
+                )
+            else:
+                self.gemini_session = live or GeminiLiveSession(system_prompt)
+            if live is None:
+                await self.gemini_session.connect()
 
             self.start_time = time.time()
             self.is_active = True
@@ -76,6 +120,11 @@ class InterviewWebSocketHandler:
             await self._send_json({"type": "status", "message": "Connected! Interview starting..."})
             await self._send_json({"type": "ready"})
 
+            # Client audio is buffered and relayed to Gemini by its own task, so
+            # receiving from the client never waits on the upstream
+            self.audio_pipeline = UpstreamAudioPipeline(self.gemini_session.send_audio)
+            pipeline_task = asyncio.create_task(self.audio_pipeline.run())
+
             # Start receiving from Gemini in background
             receive_task = asyncio.create_task(
                 self.gemini_session.receive_responses(
@@ -105,45 +154,21 @@ class InterviewWebSocketHandler:
                         break
 
                     if "bytes" in message:
-                        # Raw PCM audio from client mic
-                        self._audio_chunk_count += 1
-                        if self._audio_chunk_count <= 3 or self._audio_chunk_count % 100 == 0:
-                            logger.info(f"Session {self.session_id}: audio chunk #{self._audio_chunk_count}, size={len(message['bytes'])} bytes")
-                        # User is sending audio — they are speaking, cancel re-prompt timer
-                        if not self._user_spoke:
-                            self._user_spoke = True
-                            if self._silence_timer and not self._silence_timer.done():
-                                self._silence_timer.cancel()
-                                logger.info(f"Session {self.session_id}: silence timer cancelled — user audio detected")
-                        await self.gemini_session.send_audio(message["bytes"])
+                        if CAP_BINARY_FRAMES in self.caps:
+                            self._handle_client_binary(message["bytes"])
+                        else:
+                            # Legacy clients send untagged raw PCM
+                            self._handle_client_audio(message["bytes"])
 
                     elif "text" in message:
                         data = json.loads(message["text"])
-                        await self._handle_client_message(data, db)
+                        await self._handle_client_message(data)
 
             except WebSocketDisconnect:
                 logger.info(f"Client disconnected from session {self.session_id}")
 
-            # Cleanup
-            self.is_active = False
-            if self._silence_timer and not self._silence_timer.done():
-                self._silence_timer.cancel()
-            receive_task.cancel()
-            try:
-                await receive_task
-            except asyncio.CancelledError:
-                pass
-
-            # Save final state
-            try:
-                elapsed = int(time.time() - self.start_time)
-                session.status = "completed"
-                session.duration_seconds = elapsed
-                session.transcript = self.transcript
-                db.commit()
-            except Exception:
-                db.rollback()
-                logger.error("Failed to save final session state")
+            # Final state is saved during teardown (the transcript is already stored turn by turn)
+            completed_session = session
 
         except Exception as e:
             logger.error(f"WebSocket handler error: {e}")
@@ -152,35 +177,132 @@ class InterviewWebSocketHandler:
             except Exception:
                 pass
         finally:
-            if self.gemini_session:
-                await self.gemini_session.disconnect()
-            db.close()
-
-    def _build_prompt(self, session: InterviewSession, db: Session) -> str:
-        """Build the appropriate system prompt based on interview type."""
-        if session.session_type == "topic" and session.topic_id:
-            topic = db.query(InterviewTopic).filter(
-                InterviewTopic.id == session.topic_id
-            ).first()
-            if topic:
-                if topic.name == "Behavioral Interview":
-                    return build_behavioral_prompt()
-                return build_topic_prompt(topic.name, topic.subtopics, session.difficulty)
-
-        if session.session_type == "custom":
-            return build_custom_prompt(
-                session.resume_structured or {},
-                session.job_description or "",
-                session.job_title or "",
-            )
+            # Shielded so a cancelled handler still releases the Gemini connection,
+            # marks the session completed and returns its DB connection
+            await asyncio.shield(self._teardown(db, completed_session, pipeline_task, receive_task))
+
+    async def _teardown(
+        self,
+        db: AsyncSession,
+        completed_session: InterviewSession | None,
+        pipeline_task: asyncio.Task | None,
+        receive_task: asyncio.Task | None,
+    ):
+        """Stop the relay, disconnect from Gemini and save the final state."""
+        try:
+            try:
+                await self._stop_relay(pipeline_task, receive_task)
+            finally:
+                if self.gemini_session:
+                    await self.gemini_session.disconnect()
+            await self._save_final_state(db, completed_session)
+        finally:
+            await db.close()
+
+    async def _stop_relay(self, pipeline_task: asyncio.Task | None, receive_task: asyncio.Task | None):
+        self.is_active = False
+        if self._silence_timer and not self._silence_timer.done():
+            self._silence_timer.cancel()
+        emotion_executor.close_session(self.session_id)
+        for task in (pipeline_task, receive_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.error(f"Session {self.session_id}: relay task failed: {e}")
+            if task is pipeline_task:
+                await self._flush_upstream_audio()
+        if self.audio_pipeline:
+            logger.info(f"Session {self.session_id}: upstream audio stats {self.audio_pipeline.stats()}")
+        if self.vad:
+            logger.info(f"Session {self.session_id}: VAD stats {self.vad.stats()}")
+        if isinstance(self.gemini_session, ResilientLiveSession):
+            logger.info(f"Session {self.session_id}: Gemini Live reconnect stats {self.gemini_session.stats()}")
+
+    async def _flush_upstream_audio(self):
+        """Send the candidate's last buffered speech before the receive task is stopped."""
+        if not (self.audio_pipeline and self.gemini_session and self.gemini_session.is_active):
+            return
+        try:
+            await asyncio.wait_for(self.audio_pipeline.flush(), AUDIO_UPSTREAM_FLUSH_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            logger.warning(f"Session {self.session_id}: timed out flushing upstream audio")
+        except Exception as e:
+            logger.error(f"Session {self.session_id}: failed to flush upstream audio: {e}")
+
+    async def _save_final_state(self, db: AsyncSession, completed_session: InterviewSession | None):
+        try:
+            if completed_session is not None:
+                self._score_completed_segments(final=True)
+            if self.transcript_writer:
+                await self.transcript_writer.flush()
+            await snapshot_writer.flush()
+        except Exception as e:
+            logger.error(f"Session {self.session_id}: failed to flush interview data: {e}")
+        if completed_session is None:
+            return
+        try:
+            completed_session.status = "completed"
+            completed_session.duration_seconds = int(time.time() - self.start_time)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.error("Failed to save final session state")
 
-        # Fallback generic prompt
-        return build_topic_prompt("General Technical", ["Problem Solving", "Communication"], session.difficulty)
+    def _delete_stored_turns(self, sync_db):
+        delete_transcript(self.session_id, sync_db)
+        delete_turn_evaluations(self.session_id, sync_db)
+
+    def _handle_client_binary(self, data: bytes):
+        """Dispatch a tagged binary message (see ws_protocol)."""
+        try:
+            kind, payload = parse_uplink(data)
+        except ValueError as e:
+            logger.warning(f"Session {self.session_id}: bad binary message: {e}")
+            return
+
+        if kind == UPLINK_AUDIO:
+            self._handle_client_audio(payload)
+        elif kind == UPLINK_FRAME:
+            # Inference runs in the emotion worker pool; this task only awaits it
+            asyncio.create_task(self._analyze_emotion_frame(payload.tobytes()))
+        else:
+            logger.warning(f"Session {self.session_id}: unknown binary message kind {kind}")
+
+    def _handle_client_audio(self, pcm: bytes | memoryview):
+        """Queue a chunk of raw PCM audio from the client mic for Gemini."""
+        self._audio_chunk_count += 1
+        if self._audio_chunk_count <= 3 or self._audio_chunk_count % 100 == 0:
+            logger.info(f"Session {self.session_id}: audio chunk #{self._audio_chunk_count}, size={len(pcm)} bytes")
+
+        # Drop silence before it goes upstream; only real speech counts as the user talking
+        has_speech = True
+        if self.vad:
+            pcm, has_speech = self.vad.process(pcm)
+
+        # User is speaking — cancel re-prompt timer
+        if has_speech and not self._user_spoke:
+            self._user_spoke = True
+            if self._silence_timer and not self._silence_timer.done():
+                self._silence_timer.cancel()
+                logger.info(f"Session {self.session_id}: silence timer cancelled — user speech detected")
+        if pcm:
+            self.audio_pipeline.push(pcm)
 
     async def _handle_gemini_audio(self, audio_data: bytes):
         """Forward Gemini audio to client."""
         try:
-            # Send as base64 in a JSON message
+            if CAP_BINARY_AUDIO in self.caps:
+                packet = pack_downlink_audio(self._audio_seq, self._turn_id, audio_data)
+                self._audio_seq += 1
+                await self._send_bytes(packet)
+                return
+
+            # Legacy clients: base64 in a JSON message
             audio_b64 = base64.b64encode(audio_data).decode("utf-8")
             await self._send_json({
                 "type": "audio",
@@ -206,11 +328,7 @@ class InterviewWebSocketHandler:
         """Handle Gemini turn completion."""
         # Save any accumulated user text first
         if self._current_user_text:
-            self.transcript.append({
-                "role": "candidate",
-                "content": self._current_user_text,
-                "timestamp": time.time() - self.start_time,
-            })
+            self._append_turn("candidate", self._current_user_text)
             try:
                 await self._send_json({"type": "turn_complete", "role": "candidate"})
             except Exception:
@@ -218,17 +336,52 @@ class InterviewWebSocketHandler:
             self._current_user_text = ""
 
         if self._current_ai_text:
-            self.transcript.append({
-                "role": "interviewer",
-                "content": self._current_ai_text,
-                "timestamp": time.time() - self.start_time,
-            })
+            self._append_turn("interviewer", self._current_ai_text)
             self._current_ai_text = ""
 
+        self.transcript_writer.flush_soon()
+        self._score_completed_segments()
+
         try:
-            await self._send_json({"type": "turn_complete", "role": "interviewer"})
+            await self._send_json({"type": "turn_complete", "role": "interviewer", "turn_id": self._turn_id})
         except Exception as e:
             logger.error(f"Error sending turn complete: {e}")
+        self._turn_id += 1
+
+    async def _handle_upstream_reconnecting(self):
+        """The Gemini connection dropped: close out the interrupted turn so it is kept as context."""
+        if self._current_ai_text or self._current_user_text:
+            await self._handle_turn_complete()
+        try:
+            await self._send_json({"type": "status", "message": "Reconnecting to AI interviewer..."})
+        except Exception:
+            pass
+
+    async def _handle_upstream_reconnected(self, resumed: bool):
+        logger.info(f"Session {self.session_id}: Gemini Live reconnected (resumed={resumed})")
+        try:
+            await self._send_json({"type": "status", "message": "Reconnected."})
+        except Exception:
+            pass
+
+    def _append_turn(self, role: str, content: str):
+        entry = {"role": role, "content": content, "timestamp": time.time() - self.start_time}
+        self.transcript.append(entry)
+        self.transcript_writer.append(entry)
+
+    def _score_completed_segments(self, final: bool = False):
+        """
+        Queue background scoring for question/answer segments that can no longer change.
+        A segment is complete once the next question starts; at the end, all are.
+        """
+        if not TURN_SCORING_ENABLED:
+            return
+        segments = segment_transcript(self.transcript)
+        complete = segments if final else segments[:-1]
+        pending = complete[self._scored_segments:]
+        if pending:
+            turn_scorer.schedule(self.session_id, pending, self._interview_context)
+            self._scored_segments = len(complete)
 
     async def _silence_reprompt(self):
         """Wait for user response; if silence persists, nudge Gemini to re-prompt."""
@@ -262,7 +415,7 @@ class InterviewWebSocketHandler:
         except Exception as e:
             logger.error(f"Error sending user transcription: {e}")
 
-    async def _handle_client_message(self, data: dict, db: Session):
+    async def _handle_client_message(self, data: dict):
         """Handle typed messages from the client."""
         msg_type = data.get("type", "")
 
@@ -270,11 +423,8 @@ class InterviewWebSocketHandler:
             # User transcript text (from speech recognition)
             content = data.get("content", "")
             if content:
-                self.transcript.append({
-                    "role": "candidate",
-                    "content": content,
-                    "timestamp": time.time() - self.start_time,
-                })
+                self._append_turn("candidate", content)
+                self.transcript_writer.flush_soon()
                 await self._send_json({
                     "type": "transcript",
                     "role": "candidate",
@@ -283,13 +433,16 @@ class InterviewWebSocketHandler:
                 })
 
         elif msg_type == "frame":
-            # Webcam frame for emotion analysis
+            # Legacy base64 data-URL webcam frame for emotion analysis
             image_data = data.get("data", "")
             if image_data:
-                # Analyze in background to not block
-                asyncio.create_task(
-                    self._analyze_emotion_frame(image_data, db)
-                )
+                try:
+                    jpeg = base64.b64decode(image_data.split(",", 1)[-1])
+                except ValueError:
+                    logger.warning(f"Session {self.session_id}: undecodable frame")
+                    return
+                # Inference runs in the emotion worker pool; this task only awaits it
+                asyncio.create_task(self._analyze_emotion_frame(jpeg))
 
         elif msg_type == "playback_complete":
             # Client finished playing all queued AI audio — now start silence timer
@@ -303,27 +456,25 @@ class InterviewWebSocketHandler:
             # Client ending interview
             self.is_active = False
 
-    async def _analyze_emotion_frame(self, base64_image: str, db: Session):
-        """Analyze a webcam frame for emotions and store result."""
-        # Use a separate DB session to avoid poisoning the main session on error
-        emotion_db = SessionLocal()
+    async def _analyze_emotion_frame(self, jpeg: bytes):
+        """Analyze a JPEG webcam frame for emotions and queue the result for storage."""
         try:
-            result = analyze_frame(base64_image)
+            # None means the frame was dropped because newer frames were queued
+            result = await emotion_executor.analyze(self.session_id, jpeg)
             if result:
                 timestamp = time.time() - self.start_time
 
-                # Save to DB
-                snapshot = EmotionSnapshot(
-                    session_id=self.session_id,
-                    timestamp=timestamp,
-                    source="face",
-                    emotions=result["emotions"],
-                    dominant_emotion=result["dominant_emotion"],
-                    stress_score=result["stress_score"],
-                    confidence_score=result["confidence_score"],
-                )
-                emotion_db.add(snapshot)
-                emotion_db.commit()
+                # Buffered; written to the DB in batches
+                snapshot_writer.add({
+                    "session_id": self.session_id,
+                    "timestamp": timestamp,
+                    "source": "face",
+                    "emotions": result["emotions"],
+                    "dominant_emotion": result["dominant_emotion"],
+                    "stress_score": result["stress_score"],
+                    "confidence_score": result["confidence_score"],
+                    "scoring_version": result["scoring_version"],
+                })
 
                 # Send to client
                 await self._send_json({
@@ -332,10 +483,7 @@ class InterviewWebSocketHandler:
                     "data": result,
                 })
         except Exception as e:
-            emotion_db.rollback()
             logger.error(f"Emotion analysis error: {e}")
-        finally:
-            emotion_db.close()
 
     async def _send_json(self, data: dict):
         """Send JSON message to client."""
@@ -343,3 +491,10 @@ class InterviewWebSocketHandler:
             await self.websocket.send_json(data)
         except Exception:
             pass
+
+    async def _send_bytes(self, data: bytes):
+        """Send binary message to client."""
+        try:
+            await self.websocket.send_bytes(data)
+        except Exception:
+            pass
@@ -0,0 +1,44 @@
+"""
+Binary message framing for the live interview WebSocket.
+Clients opt in at connect time with ?caps=<cap>,<cap>; clients that don't keep
+the original protocol (raw PCM binary messages + JSON text messages).
+"""
+import struct
+
+# Capabilities a client can request at connect time
+CAP_BINARY_FRAMES = "frames"  # tagged binary uplink: audio + JPEG webcam frames
+CAP_BINARY_AUDIO = "audio"  # binary downlink for model audio instead of base64 JSON
+
+# Uplink (client → server) binary message kinds
+UPLINK_AUDIO = 0x01  # 16kHz PCM s16le mono
+UPLINK_FRAME = 0x02  # JPEG webcam frame
+
+# kind (u8) + 3 pad bytes — keeps the PCM payload 16-bit aligned
+_UPLINK_HEADER = struct.Struct("<B3x")
+UPLINK_HEADER_SIZE = _UPLINK_HEADER.size
+
+# Downlink (server → client) binary message kinds
+DOWNLINK_AUDIO = 0x11  # 24kHz PCM s16le mono from the model
+
+# kind (u8) + flags (u8) + turn id (u16) + sequence number (u32), little-endian
+_DOWNLINK_HEADER = struct.Struct("<BBHI")
+DOWNLINK_HEADER_SIZE = _DOWNLINK_HEADER.size
+
+
+def parse_caps(raw: str) -> set[str]:
+    """Parse the comma-separated ?caps= query parameter."""
+    return {c.strip() for c in (raw or "").split(",") if c.strip()}
+
+
+def parse_uplink(data: bytes) -> tuple[int, memoryview]:
+    """Split a tagged binary message into (kind, payload) without copying the payload."""
+    view = memoryview(data)
+    if len(view) < UPLINK_HEADER_SIZE:
+        raise ValueError("Binary message shorter than header")
+    (kind,) = _UPLINK_HEADER.unpack_from(view)
+    return kind, view[UPLINK_HEADER_SIZE:]
+
+
+def pack_downlink_audio(seq: int, turn_id: int, pcm: bytes) -> bytes:
+    """Prefix a model audio chunk with the downlink header."""
+    return _DOWNLINK_HEADER.pack(DOWNLINK_AUDIO, 0, turn_id & 0xFFFF, seq & 0xFFFFFFFF) + pcm
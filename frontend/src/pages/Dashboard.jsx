@@ -3,22 +3,45 @@ import { Link } from 'react-router-dom'
 import './Dashboard.css'
 
 const API = 'http://localhost:8000'
+const PAGE_SIZE = 20
 
 export default function Dashboard() {
     const [sessions, setSessions] = useState([])
+    const [nextCursor, setNextCursor] = useState(null)
+    const [totals, setTotals] = useState({ count: 0 })
+    const [completedTotals, setCompletedTotals] = useState({ count: 0, avg_score: null, total_duration_seconds: 0 })
     const [loading, setLoading] = useState(true)
+    const [loadingMore, setLoadingMore] = useState(false)
+
+    const loadPage = async (cursor) => {
+        const params = new URLSearchParams({ limit: PAGE_SIZE })
+        if (cursor) params.set('cursor', cursor)
+        const res = await fetch(`${API}/api/interviews?${params}`)
+        const data = await res.json()
+        setSessions(prev => cursor ? [...prev, ...data] : data)
+        setNextCursor(res.headers.get('X-Next-Cursor'))
+    }
 
     useEffect(() => {
-        fetch(`${API}/api/interviews`)
-            .then(r => r.json())
-            .then(data => { setSessions(data); setLoading(false) })
-            .catch(() => setLoading(false))
+        Promise.all([
+            loadPage(null),
+            fetch(`${API}/api/interviews/count`).then(r => r.json()).then(setTotals),
+            fetch(`${API}/api/interviews/count?status=completed`).then(r => r.json()).then(setCompletedTotals),
+        ])
+            .catch(() => {})
+            .finally(() => setLoading(false))
     }, [])
 
-    const completedSessions = sessions.filter(s => s.status === 'completed')
-    const avgScore = completedSessions.length
-        ? Math.round(completedSessions.reduce((a, s) => a + (s.overall_score || 0), 0) / completedSessions.length)
-        : 0
+    const loadMore = async () => {
+        setLoadingMore(true)
+        try {
+            await loadPage(nextCursor)
+        } finally {
+            setLoadingMore(false)
+        }
+    }
+
+    const avgScore = Math.round(completedTotals.avg_score || 0)
 
     return (
         <div className="page-wrapper dashboard container">
@@ -34,12 +57,12 @@ export default function Dashboard() {
             <div className="stats-row animate-fadeInUp stagger-1">
                 <div className="stat-card glass-card">
                     <div className="stat-card-icon">📊</div>
-                    <div className="stat-card-value">{sessions.length}</div>
+                    <div className="stat-card-value">{totals.count}</div>
                     <div className="stat-card-label">Total Sessions</div>
                 </div>
                 <div className="stat-card glass-card">
                     <div className="stat-card-icon">✅</div>
-                    <div className="stat-card-value">{completedSessions.length}</div>
+                    <div className="stat-card-value">{completedTotals.count}</div>
                     <div className="stat-card-label">Completed</div>
                 </div>
                 <div className="stat-card glass-card">
@@ -50,9 +73,7 @@ export default function Dashboard() {
                 <div className="stat-card glass-card">
                     <div className="stat-card-icon">⏱️</div>
                     <div className="stat-card-value">
-                        {completedSessions.length
-                            ? Math.round(completedSessions.reduce((a, s) => a + s.duration_seconds, 0) / 60)
-                            : 0}m
+                        {Math.round(completedTotals.total_duration_seconds / 60)}m
                     </div>
                     <div className="stat-card-label">Total Practice</div>
                 </div>
@@ -73,7 +94,7 @@ export default function Dashboard() {
                 ) : (
                     <div className="sessions-list">
                         {sessions.map((session, i) => (
-                            <div key={session.id} className="session-card glass-card" style={{ animationDelay: `${i * 0.05}s` }}>
+                            <div key={session.id} className="session-card glass-card" style={{ animationDelay: `${(i % PAGE_SIZE) * 0.05}s` }}>
                                 <div className="session-card-left">
                                     <div className="session-type-badge">
                                         {session.session_type === 'topic' ? '📝' : '📄'}
@@ -113,6 +134,11 @@ export default function Dashboard() {
                                 </div>
                             </div>
                         ))}
+                        {nextCursor && (
+                            <button className="btn btn-secondary" onClick={loadMore} disabled={loadingMore}>
+                                {loadingMore ? 'Loading...' : 'Load more'}
+                            </button>
+                        )}
                     </div>
                 )}
             </div>
@@ -3,12 +3,14 @@ import { useParams, Link } from 'react-router-dom'
 import './FeedbackReport.css'
 
 const API = 'http://localhost:8000'
+const TIMELINE_POINTS = 120
 
 export default function FeedbackReport() {
     const { sessionId } = useParams()
     const [session, setSession] = useState(null)
     const [feedback, setFeedback] = useState(null)
     const [emotions, setEmotions] = useState([])
+    const [emotionSummary, setEmotionSummary] = useState(null)
     const [loading, setLoading] = useState(true)
     const [generating, setGenerating] = useState(false)
 
@@ -20,24 +22,20 @@ export default function FeedbackReport() {
         try {
             const [sessRes, emRes] = await Promise.all([
                 fetch(`${API}/api/interviews/${sessionId}`),
-                fetch(`${API}/api/interviews/${sessionId}/emotions`),
+                fetch(`${API}/api/interviews/${sessionId}/emotions/timeline?points=${TIMELINE_POINTS}`),
             ])
             const sessData = await sessRes.json()
             const emData = await emRes.json()
 
             setSession(sessData)
-            setEmotions(emData)
+            setEmotions(emData.points)
+            setEmotionSummary(emData.summary)
 
             if (sessData.feedback && Object.keys(sessData.feedback).length > 0) {
                 setFeedback(sessData.feedback)
-            } else {
-                // Try to fetch standalone feedback
-                try {
-                    const fbRes = await fetch(`${API}/api/feedback/${sessionId}`)
-                    if (fbRes.ok) {
-                        setFeedback(await fbRes.json())
-                    }
-                } catch { }
+            } else if (sessData.transcript?.length > 0) {
+                // Attach to the job queued at the end of the interview (or queue one)
+                generateFeedback()
             }
         } catch (err) {
             console.error('Failed to load data:', err)
@@ -46,19 +44,44 @@ export default function FeedbackReport() {
         }
     }
 
-    const generateFeedback = async () => {
+    const generateFeedback = () => {
         setGenerating(true)
-        try {
-            const res = await fetch(`${API}/api/feedback/${sessionId}`, { method: 'POST' })
-            if (res.ok) {
-                const data = await res.json()
-                setFeedback(data)
-            }
-        } catch (err) {
-            console.error('Feedback generation error:', err)
-        } finally {
+        // Sections arrive as they are generated; the server attaches this stream to the
+        // job queued at the end of the interview (or queues one)
+        const source = new EventSource(`${API}/api/feedback/${sessionId}/stream`)
+        const finish = () => {
+            source.close()
             setGenerating(false)
         }
+
+        source.addEventListener('field', (e) => {
+            const { key, value } = JSON.parse(e.data)
+            setFeedback(prev => ({ ...prev, [key]: value }))
+        })
+        source.addEventListener('item', (e) => {
+            const { key, index, value } = JSON.parse(e.data)
+            setFeedback(prev => {
+                const items = [...(prev?.[key] || [])]
+                items[index] = value
+                return { ...prev, [key]: items }
+            })
+        })
+        source.addEventListener('done', (e) => {
+            setFeedback(JSON.parse(e.data))
+            finish()
+        })
+        source.addEventListener('failed', (e) => {
+            console.error('Feedback generation failed:', JSON.parse(e.data).detail)
+            finish()
+        })
+        source.addEventListener('timeout', (e) => {
+            console.error('Feedback is still being generated:', JSON.parse(e.data).status)
+            finish()
+        })
+        source.onerror = (err) => {
+            console.error('Feedback stream error:', err)
+            finish()
+        }
     }
 
     if (loading) {
@@ -72,13 +95,9 @@ export default function FeedbackReport() {
     const score = feedback?.overall_score ?? session?.overall_score ?? 0
     const scoreColor = score >= 70 ? 'emerald' : score >= 50 ? 'amber' : 'rose'
 
-    // Compute emotion stats
-    const avgStress = emotions.length
-        ? (emotions.reduce((a, e) => a + e.stress_score, 0) / emotions.length).toFixed(2)
-        : 0
-    const avgConfidence = emotions.length
-        ? (emotions.reduce((a, e) => a + e.confidence_score, 0) / emotions.length).toFixed(2)
-        : 0
+    // Emotion stats come precomputed from the server-side aggregates
+    const avgStress = emotionSummary ? emotionSummary.avg_stress.toFixed(2) : 0
+    const avgConfidence = emotionSummary ? emotionSummary.avg_confidence.toFixed(2) : 0
 
     return (
         <div className="page-wrapper feedback-page container">
@@ -154,7 +173,7 @@ export default function FeedbackReport() {
                                     </div>
                                 </div>
                                 <div className="emotion-stat glass-card">
-                                    <div className="emotion-stat-value" style={{ color: 'var(--accent-blue)' }}>{emotions.length}</div>
+                                    <div className="emotion-stat-value" style={{ color: 'var(--accent-blue)' }}>{emotionSummary?.count ?? emotions.length}</div>
                                     <div className="emotion-stat-label">Data Points</div>
                                 </div>
                             </div>
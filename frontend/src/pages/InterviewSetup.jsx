@@ -206,6 +206,10 @@ export default function InterviewSetup() {
                     body: JSON.stringify({ resume_structured: resumeStructured }),
                 })
             }
+            if (mode === 'custom') {
+                // Topic sessions are pre-warmed on creation; custom ones once the resume is saved
+                fetch(`${API}/api/interviews/${session.id}/prewarm`, { method: 'POST' }).catch(() => {})
+            }
 
             navigate(`/interview/${session.id}`)
         } catch (err) {
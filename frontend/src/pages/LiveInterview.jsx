@@ -5,6 +5,16 @@ import './LiveInterview.css'
 const WS_URL = 'ws://localhost:8000'
 const API = 'http://localhost:8000'
 
+// Binary framing (see backend/ws_protocol.py)
+const WS_CAPS = 'frames,audio'
+// Uplink: 1-byte kind + 3 pad bytes
+const UPLINK_AUDIO = 0x01
+const UPLINK_FRAME = 0x02
+const UPLINK_HEADER_SIZE = 4
+// Downlink: kind (u8) + flags (u8) + turn id (u16) + sequence (u32)
+const DOWNLINK_AUDIO = 0x11
+const DOWNLINK_HEADER_SIZE = 8
+
 export default function LiveInterview() {
     const { sessionId } = useParams()
     const navigate = useNavigate()
@@ -47,18 +57,20 @@ export default function LiveInterview() {
     }, [status])
 
     // ── Audio Playback ──────────────────────────────
-    const playAudioChunk = useCallback(async (base64Data) => {
+    const decodeBase64Pcm = (base64Data) => {
+        const binaryStr = atob(base64Data)
+        const bytes = new Uint8Array(binaryStr.length)
+        for (let i = 0; i < binaryStr.length; i++) bytes[i] = binaryStr.charCodeAt(i)
+        return new Int16Array(bytes.buffer)
+    }
+
+    const playAudioChunk = useCallback(async (pcm16) => {
         if (!audioContextRef.current) {
             audioContextRef.current = new (window.AudioContext || window.webkitAudioContext)({ sampleRate: 24000 })
         }
         const ctx = audioContextRef.current
 
-        const binaryStr = atob(base64Data)
-        const bytes = new Uint8Array(binaryStr.length)
-        for (let i = 0; i < binaryStr.length; i++) bytes[i] = binaryStr.charCodeAt(i)
-
         // Convert PCM 16-bit to Float32
-        const pcm16 = new Int16Array(bytes.buffer)
         const float32 = new Float32Array(pcm16.length)
         for (let i = 0; i < pcm16.length; i++) float32[i] = pcm16[i] / 32768
 
@@ -96,7 +108,8 @@ export default function LiveInterview() {
     // ── WebSocket Connection ────────────────────────
     useEffect(() => {
         let cancelled = false
-        const ws = new WebSocket(`${WS_URL}/ws/interview/${sessionId}`)
+        const ws = new WebSocket(`${WS_URL}/ws/interview/${sessionId}?caps=${WS_CAPS}`)
+        ws.binaryType = 'arraybuffer'
         wsRef.current = ws
 
         ws.onopen = () => {
@@ -106,6 +119,18 @@ export default function LiveInterview() {
 
         ws.onmessage = (event) => {
             if (cancelled) return
+
+            // Binary downlink: model audio with a small header, played without base64 decoding
+            if (event.data instanceof ArrayBuffer) {
+                const view = new DataView(event.data)
+                if (event.data.byteLength > DOWNLINK_HEADER_SIZE && view.getUint8(0) === DOWNLINK_AUDIO) {
+                    aiTurnDoneRef.current = false
+                    const samples = (event.data.byteLength - DOWNLINK_HEADER_SIZE) >> 1
+                    playAudioChunk(new Int16Array(event.data, DOWNLINK_HEADER_SIZE, samples))
+                }
+                return
+            }
+
             const data = JSON.parse(event.data)
 
             switch (data.type) {
@@ -120,7 +145,7 @@ export default function LiveInterview() {
 
                 case 'audio':
                     aiTurnDoneRef.current = false
-                    playAudioChunk(data.data)
+                    playAudioChunk(decodeBase64Pcm(data.data))
                     break
 
                 case 'transcript':
@@ -260,7 +285,10 @@ export default function LiveInterview() {
                 // Resample from native rate to 16kHz
                 const ratio = targetSampleRate / nativeSampleRate
                 const newLength = Math.round(float32.length * ratio)
-                const pcm16 = new Int16Array(newLength)
+                // Write samples straight after the uplink header — no extra copy
+                const packet = new ArrayBuffer(UPLINK_HEADER_SIZE + newLength * 2)
+                new Uint8Array(packet)[0] = UPLINK_AUDIO
+                const pcm16 = new Int16Array(packet, UPLINK_HEADER_SIZE, newLength)
                 for (let i = 0; i < newLength; i++) {
                     const srcIdx = i / ratio
                     const idx = Math.floor(srcIdx)
@@ -270,7 +298,7 @@ export default function LiveInterview() {
                         : float32[idx]
                     pcm16[i] = Math.max(-32768, Math.min(32767, Math.round(sample * 32768)))
                 }
-                wsRef.current.send(pcm16.buffer)
+                wsRef.current.send(packet)
             }
 
             source.connect(processor)
@@ -302,10 +330,15 @@ export default function LiveInterview() {
         canvas.height = 240
         const ctx = canvas.getContext('2d')
         ctx.drawImage(video, 0, 0, 320, 240)
-        const dataUrl = canvas.toDataURL('image/jpeg', 0.6)
-        if (wsRef.current.readyState === WebSocket.OPEN) {
-            wsRef.current.send(JSON.stringify({ type: 'frame', data: dataUrl }))
-        }
+        // Send the JPEG as a tagged binary message instead of a base64 data URL
+        canvas.toBlob(async (blob) => {
+            if (!blob || wsRef.current?.readyState !== WebSocket.OPEN) return
+            const jpeg = new Uint8Array(await blob.arrayBuffer())
+            const packet = new Uint8Array(UPLINK_HEADER_SIZE + jpeg.length)
+            packet[0] = UPLINK_FRAME
+            packet.set(jpeg, UPLINK_HEADER_SIZE)
+            wsRef.current.send(packet.buffer)
+        }, 'image/jpeg', 0.6)
     }
 
     const stopMedia = () => {
@@ -328,9 +361,9 @@ export default function LiveInterview() {
         }
         setStatus('ended')
 
-        // Generate feedback
+        // Queue feedback generation; the report page polls the job
         try {
-            await fetch(`${API}/api/feedback/${sessionId}`, { method: 'POST' })
+            await fetch(`${API}/api/feedback/${sessionId}/jobs`, { method: 'POST' })
         } catch (err) {
             console.error('Feedback generation failed:', err)
         }